@@ -28,6 +28,27 @@ class ProductionConfig:
     MAX_CONTENT_LENGTH = int(os.getenv('MAX_FILE_SIZE', 100 * 1024 * 1024))  # 100MB par défaut
     UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', '/tmp/odg_uploads')
     
+    # File d'import asynchrone (workers et jobs en attente max)
+    IMPORT_MAX_WORKERS = int(os.getenv('IMPORT_MAX_WORKERS', 2))
+    IMPORT_QUEUE_SIZE = int(os.getenv('IMPORT_QUEUE_SIZE', 20))
+    
+    # Processus dédiés à la reprojection et à la réparation des géométries (0 = sur place)
+    GEOMETRY_POOL_MAX_WORKERS = int(os.getenv('GEOMETRY_POOL_MAX_WORKERS', min(4, os.cpu_count() or 1)))
+    
+    # Cache des fichiers analysés (partagé entre /preview et /upload)
+    UPLOAD_CACHE_DIR = os.getenv('UPLOAD_CACHE_DIR', '/var/odg/upload_cache')
+    UPLOAD_CACHE_MAX_MB = int(os.getenv('UPLOAD_CACHE_MAX_MB', 1024))
+    
+    # Uploads par morceaux (fichiers au-delà de MAX_CONTENT_LENGTH)
+    CHUNKED_UPLOAD_DIR = os.getenv('CHUNKED_UPLOAD_DIR', '/var/odg/chunked_uploads')
+    CHUNKED_UPLOAD_MAX_SIZE_MB = int(os.getenv('CHUNKED_UPLOAD_MAX_SIZE_MB', 5120))
+    CHUNKED_UPLOAD_CHUNK_SIZE_MB = int(os.getenv('CHUNKED_UPLOAD_CHUNK_SIZE_MB', 8))
+    
+    # Cache des réponses cartographiques (tuiles MVT, GeoJSON) : memory, disk ou none
+    RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'disk')
+    RESPONSE_CACHE_DIR = os.getenv('RESPONSE_CACHE_DIR', '/var/odg/response_cache')
+    RESPONSE_CACHE_MAX_MB = int(os.getenv('RESPONSE_CACHE_MAX_MB', 512))
+    
     # CORS - Domaines autorisés
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', '').split(',') if os.getenv('CORS_ORIGINS') else ['*']
     
@@ -62,6 +83,24 @@ class DevelopmentConfig:
     MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50MB
     UPLOAD_FOLDER = './uploads'
     
+    # File d'import asynchrone
+    IMPORT_MAX_WORKERS = int(os.getenv('IMPORT_MAX_WORKERS', 1))
+    IMPORT_QUEUE_SIZE = int(os.getenv('IMPORT_QUEUE_SIZE', 10))
+    GEOMETRY_POOL_MAX_WORKERS = int(os.getenv('GEOMETRY_POOL_MAX_WORKERS', 2))
+    
+    # Cache des fichiers analysés (dossier temporaire système par défaut)
+    UPLOAD_CACHE_DIR = os.getenv('UPLOAD_CACHE_DIR')
+    UPLOAD_CACHE_MAX_MB = int(os.getenv('UPLOAD_CACHE_MAX_MB', 256))
+    
+    # Uploads par morceaux (dossier temporaire système par défaut)
+    CHUNKED_UPLOAD_DIR = os.getenv('CHUNKED_UPLOAD_DIR')
+    CHUNKED_UPLOAD_MAX_SIZE_MB = int(os.getenv('CHUNKED_UPLOAD_MAX_SIZE_MB', 2048))
+    CHUNKED_UPLOAD_CHUNK_SIZE_MB = int(os.getenv('CHUNKED_UPLOAD_CHUNK_SIZE_MB', 8))
+    
+    # Cache des réponses cartographiques en mémoire
+    RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'memory')
+    RESPONSE_CACHE_MAX_MB = int(os.getenv('RESPONSE_CACHE_MAX_MB', 128))
+    
     # CORS permissif pour le développement
     CORS_ORIGINS = ['*']
     
@@ -149,6 +188,17 @@ SECRET_KEY=your-very-secret-key-here-change-this
 # Upload de fichiers
 MAX_FILE_SIZE=104857600
 UPLOAD_FOLDER=/var/odg/uploads
+IMPORT_MAX_WORKERS=2
+IMPORT_QUEUE_SIZE=20
+GEOMETRY_POOL_MAX_WORKERS=4
+UPLOAD_CACHE_DIR=/var/odg/upload_cache
+UPLOAD_CACHE_MAX_MB=1024
+CHUNKED_UPLOAD_DIR=/var/odg/chunked_uploads
+CHUNKED_UPLOAD_MAX_SIZE_MB=5120
+CHUNKED_UPLOAD_CHUNK_SIZE_MB=8
+RESPONSE_CACHE_BACKEND=disk
+RESPONSE_CACHE_DIR=/var/odg/response_cache
+RESPONSE_CACHE_MAX_MB=512
 
 # CORS - Domaines autorisés (séparés par des virgules)
 CORS_ORIGINS=https://your-domain.com,https://www.your-domain.com
@@ -14,7 +14,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from flask import Flask
 from src.models.mining_data import db
-from src.models.geospatial_layers import GeospatialLayer, LayerUploadHistory
+from src.models.geospatial_layers import GeospatialLayer, GeospatialFeature, LayerUploadHistory
 
 # Configuration du logging
 logging.basicConfig(
@@ -59,31 +59,45 @@ def check_postgis_extensions(app):
             logger.info("💡 Installez PostGIS avec : CREATE EXTENSION postgis;")
             return False
 
-def apply_migrations(app):
+# Migrations appliquées avant db.create_all() (tables géospatiales)
+MIGRATIONS = (
+    'create_geospatial_tables.sql',
+    'create_geospatial_features_table.sql',
+    'add_simplified_geometries.sql'
+)
+# Migrations portant sur des tables créées par db.create_all() (blockchain_transactions)
+POST_CREATE_MIGRATIONS = (
+    'add_pagination_indexes.sql',
+)
+
+def apply_migrations(app, names=MIGRATIONS):
     """Appliquer les migrations SQL"""
     logger.info("📋 Application des migrations...")
     
-    migration_file = os.path.join(
-        os.path.dirname(__file__), 
-        'src', 'migrations', 'create_geospatial_tables.sql'
-    )
+    migration_files = [
+        os.path.join(os.path.dirname(__file__), 'src', 'migrations', name)
+        for name in names
+    ]
     
-    if not os.path.exists(migration_file):
-        logger.error(f"❌ Fichier de migration non trouvé : {migration_file}")
-        return False
+    for migration_file in migration_files:
+        if not os.path.exists(migration_file):
+            logger.error(f"❌ Fichier de migration non trouvé : {migration_file}")
+            return False
     
     with app.app_context():
         try:
-            with open(migration_file, 'r', encoding='utf-8') as f:
-                migration_sql = f.read()
-            
-            # Diviser le SQL en commandes individuelles
-            commands = [cmd.strip() for cmd in migration_sql.split(';') if cmd.strip()]
-            
-            for i, command in enumerate(commands, 1):
-                if command:
-                    logger.info(f"📝 Exécution commande {i}/{len(commands)}")
-                    db.engine.execute(command)
+            for migration_file in migration_files:
+                logger.info(f"📄 Migration {os.path.basename(migration_file)}")
+                with open(migration_file, 'r', encoding='utf-8') as f:
+                    migration_sql = f.read()
+                
+                # Diviser le SQL en commandes individuelles
+                commands = [cmd.strip() for cmd in migration_sql.split(';') if cmd.strip()]
+                
+                for i, command in enumerate(commands, 1):
+                    if command:
+                        logger.info(f"📝 Exécution commande {i}/{len(commands)}")
+                        db.engine.execute(command)
             
             logger.info("✅ Migrations appliquées avec succès")
             return True
@@ -114,6 +128,7 @@ def verify_installation(app):
             # Vérifier les tables principales
             tables_to_check = [
                 'geospatial_layers',
+                'geospatial_features',
                 'layer_upload_history'
             ]
             
@@ -203,6 +218,7 @@ def main():
         ("Vérification PostGIS", lambda: check_postgis_extensions(app)),
         ("Application migrations", lambda: apply_migrations(app)),
         ("Création tables SQLAlchemy", lambda: create_tables(app)),
+        ("Migrations post-création", lambda: apply_migrations(app, POST_CREATE_MIGRATIONS)),
         ("Vérification installation", lambda: verify_installation(app)),
         ("Données d'exemple", lambda: create_sample_data(app))
     ]
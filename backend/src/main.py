@@ -6,7 +6,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from flask import Flask, send_from_directory
 from flask_cors import CORS
 from src.models.mining_data import db
-from src.models.geospatial_layers import GeospatialLayer, LayerUploadHistory
+from src.models.geospatial_layers import GeospatialLayer, GeospatialFeature, LayerUploadHistory
 from src.routes.user import user_bp
 from src.routes.webgis import webgis_bp
 from src.routes.blockchain import blockchain_bp
@@ -25,6 +25,17 @@ except ImportError:
         SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}")
         SQLALCHEMY_TRACK_MODIFICATIONS = False
         MAX_CONTENT_LENGTH = 100 * 1024 * 1024  # 100MB
+        IMPORT_MAX_WORKERS = int(os.getenv('IMPORT_MAX_WORKERS', 2))
+        IMPORT_QUEUE_SIZE = int(os.getenv('IMPORT_QUEUE_SIZE', 20))
+        GEOMETRY_POOL_MAX_WORKERS = int(os.getenv('GEOMETRY_POOL_MAX_WORKERS', min(4, os.cpu_count() or 1)))
+        UPLOAD_CACHE_DIR = os.getenv('UPLOAD_CACHE_DIR')
+        UPLOAD_CACHE_MAX_MB = int(os.getenv('UPLOAD_CACHE_MAX_MB', 500))
+        CHUNKED_UPLOAD_DIR = os.getenv('CHUNKED_UPLOAD_DIR')
+        CHUNKED_UPLOAD_MAX_SIZE_MB = int(os.getenv('CHUNKED_UPLOAD_MAX_SIZE_MB', 5120))
+        CHUNKED_UPLOAD_CHUNK_SIZE_MB = int(os.getenv('CHUNKED_UPLOAD_CHUNK_SIZE_MB', 8))
+        RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'memory')
+        RESPONSE_CACHE_DIR = os.getenv('RESPONSE_CACHE_DIR')
+        RESPONSE_CACHE_MAX_MB = int(os.getenv('RESPONSE_CACHE_MAX_MB', 128))
         CORS_ORIGINS = ['*']
 
 def create_app():
@@ -0,0 +1,24 @@
+-- Migration des index de pagination par curseur
+-- Version: 1.3
+-- Description: Index (date de création, id) parcourus par la pagination keyset
+--              de /layers, /upload-history et /blockchain/transactions
+--              (WHERE (created_at, id) < (...) ORDER BY created_at DESC, id DESC)
+
+CREATE INDEX IF NOT EXISTS idx_geospatial_layers_created_id
+    ON geospatial_layers (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_layer_upload_history_uploaded_id
+    ON layer_upload_history (uploaded_at, id);
+CREATE INDEX IF NOT EXISTS idx_blockchain_transactions_created_id
+    ON blockchain_transactions (created_at, id);
+
+-- created_at est nullable sur blockchain_transactions : une ligne sans date
+-- échapperait à la comparaison du curseur
+UPDATE blockchain_transactions SET created_at = COALESCE(timestamp, NOW())
+WHERE created_at IS NULL;
+
+-- Statistiques à jour pour les totaux estimés (EXPLAIN)
+ANALYZE geospatial_layers;
+ANALYZE layer_upload_history;
+ANALYZE blockchain_transactions;
+
+COMMIT;
@@ -0,0 +1,35 @@
+-- Migration PostGIS des géométries simplifiées par bande de zoom
+-- Version: 1.2
+-- Description: Versions simplifiées (ST_SimplifyPreserveTopology, tolérance d'un
+--              pixel au zoom maximal de la bande) servies par /geojson et /tiles
+--              aux zooms faibles. NULL lorsque la simplification ne retire aucun sommet.
+--              Bandes : zooms 0-5 (geom_z5), 6-9 (geom_z9), 10-12 (geom_z12)
+
+ALTER TABLE geospatial_features ADD COLUMN IF NOT EXISTS geom_z5 GEOMETRY(GEOMETRY, 4326);
+ALTER TABLE geospatial_features ADD COLUMN IF NOT EXISTS geom_z9 GEOMETRY(GEOMETRY, 4326);
+ALTER TABLE geospatial_features ADD COLUMN IF NOT EXISTS geom_z12 GEOMETRY(GEOMETRY, 4326);
+
+ALTER TABLE geospatial_layers ADD COLUMN IF NOT EXISTS geom_z5 GEOMETRY(GEOMETRY, 4326);
+ALTER TABLE geospatial_layers ADD COLUMN IF NOT EXISTS geom_z9 GEOMETRY(GEOMETRY, 4326);
+ALTER TABLE geospatial_layers ADD COLUMN IF NOT EXISTS geom_z12 GEOMETRY(GEOMETRY, 4326);
+
+-- Reprise des données existantes (tolérance = 360 / (256 * 2^zoom) degrés)
+UPDATE geospatial_features SET
+    geom_z5 = (SELECT CASE WHEN ST_NPoints(s.g) < ST_NPoints(geom) THEN s.g END
+               FROM (SELECT ST_SimplifyPreserveTopology(geom, 360.0 / (256 * 2 ^ 5)) AS g) AS s),
+    geom_z9 = (SELECT CASE WHEN ST_NPoints(s.g) < ST_NPoints(geom) THEN s.g END
+               FROM (SELECT ST_SimplifyPreserveTopology(geom, 360.0 / (256 * 2 ^ 9)) AS g) AS s),
+    geom_z12 = (SELECT CASE WHEN ST_NPoints(s.g) < ST_NPoints(geom) THEN s.g END
+                FROM (SELECT ST_SimplifyPreserveTopology(geom, 360.0 / (256 * 2 ^ 12)) AS g) AS s)
+WHERE geom_z5 IS NULL AND geom_z9 IS NULL AND geom_z12 IS NULL;
+
+UPDATE geospatial_layers SET
+    geom_z5 = (SELECT CASE WHEN ST_NPoints(s.g) < ST_NPoints(geom) THEN s.g END
+               FROM (SELECT ST_SimplifyPreserveTopology(geom, 360.0 / (256 * 2 ^ 5)) AS g) AS s),
+    geom_z9 = (SELECT CASE WHEN ST_NPoints(s.g) < ST_NPoints(geom) THEN s.g END
+               FROM (SELECT ST_SimplifyPreserveTopology(geom, 360.0 / (256 * 2 ^ 9)) AS g) AS s),
+    geom_z12 = (SELECT CASE WHEN ST_NPoints(s.g) < ST_NPoints(geom) THEN s.g END
+                FROM (SELECT ST_SimplifyPreserveTopology(geom, 360.0 / (256 * 2 ^ 12)) AS g) AS s)
+WHERE geom IS NOT NULL AND geom_z5 IS NULL AND geom_z9 IS NULL AND geom_z12 IS NULL;
+
+COMMIT;
@@ -0,0 +1,76 @@
+-- Migration PostGIS pour le stockage par feature des couches ODG
+-- Version: 1.1
+-- Description: Une ligne par géométrie importée (attributs JSONB, emprise),
+--              au lieu d'une unique MultiGeometry par couche
+
+CREATE TABLE IF NOT EXISTS geospatial_features (
+    id BIGSERIAL PRIMARY KEY,
+    layer_id INTEGER NOT NULL REFERENCES geospatial_layers(id) ON DELETE CASCADE,
+    
+    -- Position de la feature dans le fichier source
+    feature_index INTEGER NOT NULL,
+    geometry_type VARCHAR(30) NOT NULL,
+    
+    -- Géométrie spatiale (PostGIS) - WGS84
+    geom GEOMETRY(GEOMETRY, 4326) NOT NULL,
+    
+    -- Attributs d'origine de la feature
+    properties JSONB NOT NULL DEFAULT '{}',
+    
+    -- Emprise de la feature
+    min_x DOUBLE PRECISION,
+    min_y DOUBLE PRECISION,
+    max_x DOUBLE PRECISION,
+    max_y DOUBLE PRECISION,
+    
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL
+);
+
+-- Index pour les performances
+CREATE INDEX IF NOT EXISTS idx_geospatial_features_layer_id ON geospatial_features(layer_id);
+CREATE INDEX IF NOT EXISTS idx_geospatial_features_layer_index ON geospatial_features(layer_id, feature_index);
+
+-- Index spatial (GIST pour PostGIS)
+CREATE INDEX IF NOT EXISTS idx_geospatial_features_geom ON geospatial_features USING GIST (geom);
+
+-- Reprise des couches existantes : une feature par composante de la géométrie
+-- agrégée. L'ancien import rangeait les attributs des features, dans l'ordre
+-- des composantes, dans la liste properties des métadonnées de la couche :
+-- chaque composante reprend l'élément de même rang (chemin ST_Dump).
+INSERT INTO geospatial_features (
+    layer_id, feature_index, geometry_type, geom, properties, min_x, min_y, max_x, max_y
+)
+SELECT
+    parts.layer_id,
+    parts.feature_index,
+    GeometryType(parts.geom),
+    parts.geom,
+    CASE
+        WHEN jsonb_typeof(parts.legacy_properties -> parts.feature_index) = 'object'
+        THEN parts.legacy_properties -> parts.feature_index
+        ELSE '{}'::jsonb
+    END,
+    ST_XMin(parts.geom),
+    ST_YMin(parts.geom),
+    ST_XMax(parts.geom),
+    ST_YMax(parts.geom)
+FROM (
+    SELECT
+        dumps.layer_id,
+        -- Géométrie simple : chemin vide, une seule feature de rang 0
+        (COALESCE((dumps.dump).path[1], 1) - 1)::INTEGER AS feature_index,
+        (dumps.dump).geom AS geom,
+        dumps.legacy_properties
+    FROM (
+        SELECT
+            l.id AS layer_id,
+            ST_Dump(l.geom) AS dump,
+            -- Colonne layer_metadata (modèle SQLAlchemy) ou metadata (schéma SQL initial)
+            COALESCE(to_jsonb(l) -> 'layer_metadata', to_jsonb(l) -> 'metadata') -> 'properties' AS legacy_properties
+        FROM geospatial_layers l
+        WHERE l.geom IS NOT NULL
+        AND NOT EXISTS (SELECT 1 FROM geospatial_features f WHERE f.layer_id = l.id)
+    ) AS dumps
+) AS parts;
+
+COMMIT;
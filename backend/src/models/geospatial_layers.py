@@ -1,5 +1,7 @@
 from geoalchemy2 import Geometry
+from geoalchemy2.shape import to_shape
 from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred
 from datetime import datetime
 import json
 
@@ -50,6 +52,12 @@ class GeospatialLayer(db.Model):
     # Géométrie spatiale (PostGIS)
     geom = db.Column(Geometry('GEOMETRY', srid=4326))  # WGS84
     
+    # Géométries simplifiées par bande de zoom (services/geometry_simplification),
+    # chargées uniquement à la demande
+    geom_z5 = deferred(db.Column(Geometry('GEOMETRY', srid=4326, spatial_index=False)))
+    geom_z9 = deferred(db.Column(Geometry('GEOMETRY', srid=4326, spatial_index=False)))
+    geom_z12 = deferred(db.Column(Geometry('GEOMETRY', srid=4326, spatial_index=False)))
+    
     # Statistiques calculées
     area_km2 = db.Column(db.Float)  # Superficie en km² (pour polygones)
     length_km = db.Column(db.Float)  # Longueur en km (pour lignes)
@@ -62,6 +70,11 @@ class GeospatialLayer(db.Model):
     # Relations (pour futures extensions)
     created_by_user_id = db.Column(db.Integer, nullable=True)  # ID utilisateur créateur
     
+    # Pagination par curseur (services/keyset_pagination)
+    __table_args__ = (
+        db.Index('idx_geospatial_layers_created_id', 'created_at', 'id'),
+    )
+    
     def __repr__(self):
         return f'<GeospatialLayer {self.name} ({self.geometry_type})>'
     
@@ -88,16 +101,20 @@ class GeospatialLayer(db.Model):
             'createdByUserId': self.created_by_user_id
         }
     
-    def to_geojson_feature(self):
-        """Conversion en Feature GeoJSON pour l'affichage cartographique"""
-        from geoalchemy2.shape import to_shape
+    def to_geojson_feature(self, geom=None):
+        """Conversion en Feature GeoJSON pour l'affichage cartographique
         
-        if not self.geom:
+        geom remplace la géométrie stockée (ex: géométrie découpée à l'emprise affichée)."""
+        
+        geom = geom if geom is not None else self.geom
+        if geom is None:
             return None
         
         try:
             # Conversion de la géométrie PostGIS en Shapely puis GeoJSON
-            geom_shape = to_shape(self.geom)
+            geom_shape = to_shape(geom)
+            if geom_shape.is_empty:
+                return None
             
             # Utiliser __geo_interface__ pour une conversion robuste
             geometry = geom_shape.__geo_interface__
@@ -125,6 +142,24 @@ class GeospatialLayer(db.Model):
             logging.getLogger(__name__).error(f"Erreur conversion GeoJSON pour couche {self.id}: {str(e)}")
             return None
     
+    def to_geojson_feature_collection(self):
+        """Conversion en FeatureCollection GeoJSON, une Feature par géométrie importée"""
+        features = [
+            feature.to_geojson_feature()
+            for feature in self.features.order_by(GeospatialFeature.feature_index)
+        ]
+        features = [feature for feature in features if feature]
+        
+        # Couches antérieures au stockage par feature : géométrie agrégée
+        if not features:
+            layer_feature = self.to_geojson_feature()
+            features = [layer_feature] if layer_feature else []
+        
+        return {
+            'type': 'FeatureCollection',
+            'features': features
+        }
+    
     @classmethod
     def get_by_status(cls, status):
         """Récupère les couches par statut"""
@@ -145,7 +180,6 @@ class GeospatialLayer(db.Model):
     
     def update_statistics(self):
         """Met à jour les statistiques calculées (superficie, longueur)"""
-        from geoalchemy2.shape import to_shape
         from geoalchemy2.functions import ST_Area, ST_Length
         
         if not self.geom:
@@ -217,6 +251,100 @@ class GeospatialLayer(db.Model):
         }
 
 
+class GeospatialFeature(db.Model):
+    """
+    Feature individuelle d'une couche géospatiale
+    Une ligne par géométrie importée, avec ses attributs d'origine
+    """
+    __tablename__ = 'geospatial_features'
+    
+    id = db.Column(db.BigInteger, primary_key=True)
+    layer_id = db.Column(
+        db.Integer,
+        db.ForeignKey('geospatial_layers.id', ondelete='CASCADE'),
+        nullable=False,
+        index=True
+    )
+    feature_index = db.Column(db.Integer, nullable=False)  # Position dans le fichier source
+    geometry_type = db.Column(db.String(30), nullable=False)  # 'POINT', 'MULTIPOLYGON', ...
+    
+    # Géométrie (index GIST créé par GeoAlchemy2) et attributs d'origine
+    geom = db.Column(Geometry('GEOMETRY', srid=4326), nullable=False)
+    properties = db.Column(JSONB, nullable=False, default=dict, server_default='{}')
+    
+    # Géométries simplifiées par bande de zoom (services/geometry_simplification),
+    # chargées uniquement à la demande
+    geom_z5 = deferred(db.Column(Geometry('GEOMETRY', srid=4326, spatial_index=False)))
+    geom_z9 = deferred(db.Column(Geometry('GEOMETRY', srid=4326, spatial_index=False)))
+    geom_z12 = deferred(db.Column(Geometry('GEOMETRY', srid=4326, spatial_index=False)))
+    
+    # Emprise de la feature (WGS84)
+    min_x = db.Column(db.Float)
+    min_y = db.Column(db.Float)
+    max_x = db.Column(db.Float)
+    max_y = db.Column(db.Float)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, server_default=db.func.now(), nullable=False)
+    
+    # Relations
+    layer = db.relationship(
+        'GeospatialLayer',
+        backref=db.backref('features', lazy='dynamic', passive_deletes=True)
+    )
+    
+    __table_args__ = (
+        db.Index('idx_geospatial_features_layer_index', 'layer_id', 'feature_index'),
+    )
+    
+    def __repr__(self):
+        return f'<GeospatialFeature {self.layer_id}/{self.feature_index} ({self.geometry_type})>'
+    
+    @property
+    def bbox(self):
+        if self.min_x is None:
+            return None
+        return [self.min_x, self.min_y, self.max_x, self.max_y]
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'layerId': self.layer_id,
+            'featureIndex': self.feature_index,
+            'geometryType': self.geometry_type,
+            'properties': self.properties,
+            'bbox': self.bbox
+        }
+    
+    def to_geojson_feature(self, geom=None):
+        """Conversion en Feature GeoJSON avec les attributs d'origine
+        
+        geom remplace la géométrie stockée (ex: géométrie découpée à l'emprise affichée)."""
+        
+        geom = geom if geom is not None else self.geom
+        if geom is None:
+            return None
+        
+        try:
+            geom_shape = to_shape(geom)
+            if geom_shape.is_empty:
+                return None
+            return {
+                'type': 'Feature',
+                'id': self.id,
+                'bbox': self.bbox,
+                'geometry': geom_shape.__geo_interface__,
+                'properties': {
+                    **(self.properties or {}),
+                    'layerId': self.layer_id,
+                    'featureIndex': self.feature_index
+                }
+            }
+        except Exception as e:
+            import logging
+            logging.getLogger(__name__).error(f"Erreur conversion GeoJSON pour feature {self.id}: {str(e)}")
+            return None
+
+
 class LayerUploadHistory(db.Model):
     """
     Historique des uploads de couches géospatiales
@@ -250,6 +378,11 @@ class LayerUploadHistory(db.Model):
     # Relations
     layer = db.relationship('GeospatialLayer', backref='upload_history')
     
+    # Pagination par curseur (services/keyset_pagination)
+    __table_args__ = (
+        db.Index('idx_layer_upload_history_uploaded_id', 'uploaded_at', 'id'),
+    )
+    
     def __repr__(self):
         return f'<LayerUploadHistory {self.original_filename} ({self.upload_status})>'
     
@@ -106,6 +106,11 @@ class BlockchainTransaction(db.Model):
     deposit = db.relationship('MiningDeposit', backref=db.backref('blockchain_transactions', lazy=True))
     operator = db.relationship('Operator', backref=db.backref('blockchain_transactions', lazy=True))
     
+    # Pagination par curseur (services/keyset_pagination)
+    __table_args__ = (
+        db.Index('idx_blockchain_transactions_created_id', 'created_at', 'id'),
+    )
+    
     def to_dict(self):
         metadata = json.loads(self.metadata_json) if self.metadata_json else {}
         deposit_data = self.deposit.to_dict() if self.deposit else None
@@ -6,6 +6,9 @@ from src.models.mining_data import (
     MiningDeposit,
     Operator,
 )
+from sqlalchemy.orm import joinedload
+from src.services.json_streaming import iter_json_object, streaming_response
+from src.services.keyset_pagination import paginate_request
 from datetime import datetime
 import json
 import hashlib
@@ -14,6 +17,9 @@ import string
 
 blockchain_bp = Blueprint('blockchain', __name__)
 
+# Lignes lues par aller-retour pour les réponses envoyées au fil de l'eau
+STREAM_BATCH_SIZE = 500
+
 def generate_transaction_hash():
     """Génère un hash de transaction simulé"""
     random_string = ''.join(random.choices(string.ascii_letters + string.digits, k=32))
@@ -27,10 +33,17 @@ def generate_address():
 @blockchain_bp.route('/transactions', methods=['GET'])
 @cross_origin()
 def get_transactions():
-    """Récupère toutes les transactions blockchain"""
+    """
+    Récupère les transactions blockchain, les plus récentes d'abord
+    
+    Query params:
+    - cursor: Curseur de la page suivante (pagination.next_cursor)
+    - per_page: Éléments par page (défaut: 20, max: 100)
+    - with_total: Ajouter une estimation du nombre total de transactions (défaut: false)
+    - page: Numéro de page (pagination par OFFSET, conservée pour compatibilité)
+    - status, material_type: Filtres
+    """
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
         status = request.args.get('status')
         material_type = request.args.get('material_type')
         
@@ -41,19 +54,20 @@ def get_transactions():
         if material_type:
             query = query.filter_by(material_type=material_type)
         
-        transactions = query.order_by(BlockchainTransaction.created_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        try:
+            transactions, pagination = paginate_request(
+                query, BlockchainTransaction.created_at, BlockchainTransaction.id, request.args
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
         
         return jsonify({
             'success': True,
-            'data': [tx.to_dict() for tx in transactions.items],
-            'pagination': {
-                'page': page,
-                'pages': transactions.pages,
-                'per_page': per_page,
-                'total': transactions.total
-            }
+            'data': [tx.to_dict() for tx in transactions],
+            'pagination': pagination
         })
     except Exception as e:
         return jsonify({
@@ -180,42 +194,46 @@ def confirm_transaction(transaction_id):
 def get_certificates():
     """Récupère les certificats de traçabilité"""
     try:
-        transactions = BlockchainTransaction.query.filter_by(status='confirmed').all()
-        
-        certificates = []
-        for tx in transactions:
-            metadata = json.loads(tx.metadata_json) if tx.metadata_json else {}
-            deposit = tx.deposit
-            operator = tx.operator
-
-            certificate = {
-                'id': f"CERT-{tx.id:06d}",
-                'transactionHash': tx.transaction_hash,
-                'materialType': tx.material_type,
-                'quantity': tx.quantity,
-                'unit': tx.unit,
-                'origin': metadata.get('origin') or (deposit.name if deposit else 'Unknown'),
-                'destination': metadata.get('destination') or (operator.name if operator else 'Unknown'),
-                'certificationDate': tx.timestamp.isoformat(),
-                'status': 'Valid',
-                'qrCode': f"https://blockchain.odg.com/cert/CERT-{tx.id:06d}",
-                'metadata': metadata,
-                'deposit': deposit.to_dict() if deposit else None,
-                'operator': operator.to_dict() if operator else None,
-            }
-            certificates.append(certificate)
+        transactions = (
+            BlockchainTransaction.query
+            .filter_by(status='confirmed')
+            .options(joinedload(BlockchainTransaction.deposit), joinedload(BlockchainTransaction.operator))
+            .order_by(BlockchainTransaction.id)
+            .yield_per(STREAM_BATCH_SIZE)
+        )
         
-        return jsonify({
-            'success': True,
-            'data': certificates,
-            'count': len(certificates)
-        })
+        # Certificats sérialisés un à un et envoyés au fil de l'eau
+        certificates = (_certificate(tx) for tx in transactions)
+        chunks = iter_json_object({'success': True}, 'data', certificates, tail=lambda count: {'count': count})
+        return streaming_response(chunks)
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+def _certificate(tx):
+    """Certificat de traçabilité d'une transaction confirmée"""
+    metadata = json.loads(tx.metadata_json) if tx.metadata_json else {}
+    deposit = tx.deposit
+    operator = tx.operator
+
+    return {
+        'id': f"CERT-{tx.id:06d}",
+        'transactionHash': tx.transaction_hash,
+        'materialType': tx.material_type,
+        'quantity': tx.quantity,
+        'unit': tx.unit,
+        'origin': metadata.get('origin') or (deposit.name if deposit else 'Unknown'),
+        'destination': metadata.get('destination') or (operator.name if operator else 'Unknown'),
+        'certificationDate': tx.timestamp.isoformat(),
+        'status': 'Valid',
+        'qrCode': f"https://blockchain.odg.com/cert/CERT-{tx.id:06d}",
+        'metadata': metadata,
+        'deposit': deposit.to_dict() if deposit else None,
+        'operator': operator.to_dict() if operator else None,
+    }
+
 @blockchain_bp.route('/supply-chain/<material_type>', methods=['GET'])
 @cross_origin()
 def get_supply_chain(material_type):
@@ -2,19 +2,41 @@
 Routes API pour l'import de données géospatiales ODG
 """
 
+import io
 import os
 import json
+import time
+import shutil
 import tempfile
 from datetime import datetime
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, send_file
 from flask_cors import cross_origin
 from werkzeug.utils import secure_filename
 
-from src.models.geospatial_layers import GeospatialLayer, LayerUploadHistory, db
+from src.models.geospatial_layers import GeospatialLayer, GeospatialFeature, LayerUploadHistory, db
 from src.services.geospatial_import import GeospatialImportService, FileValidator
+from src.services.geojson_builder import (
+    feature_collections_json, layer_features_json, iter_features, iter_layer_features, iter_collection_features,
+    stream_feature_collection, feature_row_statements, layer_row_statements, collection_row_statements
+)
+from src.services.binary_formats import (
+    BINARY_FORMATS, binary_format, encode_flatgeobuf, encode_stream, format_filename, format_mimetype
+)
+from src.services.geojson_output import apply_output_options, parse_output_options
+from src.services.json_streaming import iter_json_object, streaming_response
+from src.services.vector_tiles import MVT_MIMETYPE, TILE_SOURCES, build_vector_tile, tile_data_version
+from src.services.response_cache import get_response_cache, layer_versions
+from src.services.http_validators import data_validators, is_not_modified, not_modified_response, with_validators
+from src.services.import_jobs import get_import_job_queue
+from src.services.keyset_pagination import paginate_request
+from src.services.upload_cache import UploadCache, get_upload_cache
+from src.services.chunked_uploads import ChunkedUploadError, get_chunked_upload_store
 
 geospatial_import_bp = Blueprint('geospatial_import', __name__)
 
+# Niveau de zoom maximal accepté par /geojson et /tiles
+MAX_ZOOM = 22
+
 @geospatial_import_bp.route('/upload', methods=['POST'])
 @cross_origin()
 def upload_geospatial_file():
@@ -27,6 +49,22 @@ def upload_geospatial_file():
     - description: Description (optionnel)
     - layer_type: Type de couche (deposit, infrastructure, zone, custom)
     - status: Statut (actif, en_développement, exploration, terminé)
+    - async: Import en arrière-plan (défaut: true). Avec async=false,
+      l'import est exécuté dans la requête comme auparavant.
+    - streaming: Forcer (true) ou désactiver (false) l'import par lots.
+      Par défaut, activé automatiquement pour les fichiers volumineux.
+    - bulk_load: Forcer (true) ou désactiver (false) le chargement via COPY.
+      Par défaut, activé au-delà de BULK_LOAD_THRESHOLD_BYTES.
+    - raster_decimation: TIFF, facteur de sous-échantillonnage entier avant
+      vectorisation (défaut: 1)
+    - raster_class_breaks: TIFF, seuils de classification séparés par des
+      virgules (ex: "10,50,100") ; une classe par intervalle
+    - raster_block_size: TIFF, taille des fenêtres de vectorisation en pixels
+    - allow_duplicate: Réimporter un fichier identique (même SHA-256) à un
+      import existant. Par défaut, la couche existante est renvoyée (200).
+    
+    En mode asynchrone, la réponse (202) contient l'identifiant du job
+    (ID de l'historique d'upload) à suivre via GET /upload-history/<id>.
     """
     try:
         # Vérification de la présence du fichier
@@ -46,35 +84,13 @@ def upload_geospatial_file():
                 'error': validation_message
             }), 400
         
-        # Récupération des paramètres
-        layer_config = {
-            'name': request.form.get('name', '').strip(),
-            'description': request.form.get('description', '').strip(),
-            'layer_type': request.form.get('layer_type', 'custom'),
-            'status': request.form.get('status', 'actif')
-        }
-        
-        # Validation des paramètres obligatoires
-        if not layer_config['name']:
-            return jsonify({
-                'success': False,
-                'error': 'Le nom de la couche est obligatoire'
-            }), 400
-        
-        # Validation des valeurs
-        valid_layer_types = ['deposit', 'infrastructure', 'zone', 'custom']
-        valid_statuses = ['actif', 'en_développement', 'exploration', 'terminé']
-        
-        if layer_config['layer_type'] not in valid_layer_types:
-            return jsonify({
-                'success': False,
-                'error': f'Type de couche invalide. Valeurs acceptées: {", ".join(valid_layer_types)}'
-            }), 400
-        
-        if layer_config['status'] not in valid_statuses:
+        # Récupération et validation des paramètres
+        try:
+            layer_config = _build_layer_config(request.form)
+        except ValueError as e:
             return jsonify({
                 'success': False,
-                'error': f'Statut invalide. Valeurs acceptées: {", ".join(valid_statuses)}'
+                'error': str(e)
             }), 400
         
         # Sauvegarde temporaire du fichier
@@ -82,7 +98,24 @@ def upload_geospatial_file():
         temp_dir = tempfile.mkdtemp(prefix='odg_upload_')
         temp_file_path = os.path.join(temp_dir, filename)
         
+        started = time.perf_counter()
         file.save(temp_file_path)
+        saved = time.perf_counter()
+        
+        # Fichier identique déjà importé : réponse immédiate avec la couche existante
+        layer_config['content_hash'] = UploadCache.hash_file(temp_file_path)
+        layer_config['upload_timings'] = {
+            'upload_write': saved - started,
+            'hash': time.perf_counter() - saved
+        }
+        duplicate_response = _existing_layer_response(layer_config)
+        if duplicate_response is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return duplicate_response
+        
+        run_async = request.form.get('async', 'true').lower() != 'false'
+        if run_async:
+            return _enqueue_import(temp_file_path, temp_dir, layer_config)
         
         # Import du fichier
         import_service = GeospatialImportService()
@@ -118,11 +151,327 @@ def upload_geospatial_file():
             'error': f'Erreur serveur: {str(e)}'
         }), 500
 
+def _build_layer_config(values):
+    """Configuration de la couche à partir du formulaire d'upload (ou du JSON
+    d'ouverture d'un upload par morceaux). Lève ValueError si invalide."""
+    layer_config = {
+        'name': str(values.get('name') or '').strip(),
+        'description': str(values.get('description') or '').strip(),
+        'layer_type': values.get('layer_type', 'custom'),
+        'status': values.get('status', 'actif')
+    }
+    
+    for option in ('streaming', 'bulk_load'):
+        if values.get(option) is not None:
+            layer_config[option] = _as_bool(values.get(option))
+    layer_config['allow_duplicate'] = _as_bool(values.get('allow_duplicate', False))
+    
+    raster_options = _parse_raster_options(values)
+    if raster_options:
+        layer_config['raster_options'] = raster_options
+    
+    # Validation des paramètres obligatoires
+    if not layer_config['name']:
+        raise ValueError('Le nom de la couche est obligatoire')
+    
+    # Validation des valeurs
+    valid_layer_types = ['deposit', 'infrastructure', 'zone', 'custom']
+    valid_statuses = ['actif', 'en_développement', 'exploration', 'terminé']
+    
+    if layer_config['layer_type'] not in valid_layer_types:
+        raise ValueError(f'Type de couche invalide. Valeurs acceptées: {", ".join(valid_layer_types)}')
+    
+    if layer_config['status'] not in valid_statuses:
+        raise ValueError(f'Statut invalide. Valeurs acceptées: {", ".join(valid_statuses)}')
+    
+    return layer_config
+
+def _as_bool(value):
+    """Booléen transmis en formulaire ('true'/'false') ou en JSON"""
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() == 'true'
+
+def _existing_layer_response(layer_config):
+    """Réponse 200 avec la couche existante si le même fichier a déjà été importé"""
+    if layer_config.get('allow_duplicate'):
+        return None
+    existing_layer = GeospatialImportService.find_imported_layer(layer_config['content_hash'])
+    if existing_layer is None:
+        return None
+    data = {'duplicate': True, 'layer': existing_layer.to_dict()}
+    return _raw_json_response(
+        '{"success": true, "message": ' + json.dumps(f"Fichier déjà importé: couche existante '{existing_layer.name}'")
+        + ', "data": ' + _with_raw_json(data, 'geojson', layer_features_json([existing_layer.id]).get(existing_layer.id)) + '}'
+    )
+
+def _parse_raster_options(values):
+    """Options de vectorisation des TIFF transmises dans le formulaire d'upload"""
+    options = {}
+    try:
+        if values.get('raster_decimation'):
+            options['decimation'] = int(values['raster_decimation'])
+        if values.get('raster_block_size'):
+            options['block_size'] = int(values['raster_block_size'])
+        class_breaks = values.get('raster_class_breaks')
+        if isinstance(class_breaks, list):
+            options['class_breaks'] = [float(v) for v in class_breaks]
+        elif class_breaks:
+            options['class_breaks'] = [float(v) for v in class_breaks.split(',') if v.strip()]
+    except (TypeError, ValueError):
+        raise ValueError('Options raster invalides (raster_decimation, raster_block_size, raster_class_breaks)')
+    
+    if options.get('decimation', 1) < 1 or options.get('block_size', 1) < 1:
+        raise ValueError('raster_decimation et raster_block_size doivent être positifs')
+    return options
+
+def _enqueue_import(file_path, temp_dir, layer_config, keep_on_reject=False):
+    """Crée l'historique d'upload (statut 'pending') et planifie l'import
+    
+    keep_on_reject : conserver temp_dir si la file est saturée (upload par
+    morceaux, dont le fichier assemblé permet de réessayer)."""
+    upload_record = LayerUploadHistory(
+        original_filename=os.path.basename(file_path),
+        file_size_bytes=os.path.getsize(file_path),
+        file_format=GeospatialImportService.detect_format(file_path) or 'UNKNOWN',
+        upload_status='pending'
+    )
+    db.session.add(upload_record)
+    db.session.commit()
+    
+    job_queue = get_import_job_queue(current_app.config)
+    accepted = job_queue.submit(
+        current_app._get_current_object(),
+        upload_record.id,
+        file_path,
+        layer_config,
+        cleanup_dir=temp_dir
+    )
+    
+    if not accepted:
+        upload_record.upload_status = 'error'
+        upload_record.error_message = "File d'import saturée, réessayez plus tard"
+        upload_record.processed_at = datetime.now()
+        db.session.commit()
+        if not keep_on_reject:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        return jsonify({
+            'success': False,
+            'error': "Trop d'imports en cours, réessayez dans quelques instants"
+        }), 503
+    
+    return jsonify({
+        'success': True,
+        'message': 'Import planifié',
+        'data': {
+            'jobId': upload_record.id,
+            'status': upload_record.upload_status,
+            'upload': upload_record.to_dict()
+        }
+    }), 202
+
+@geospatial_import_bp.route('/uploads', methods=['POST'])
+@cross_origin()
+def create_chunked_upload():
+    """
+    Ouvre un upload par morceaux (fichiers au-delà de MAX_CONTENT_LENGTH)
+    
+    JSON:
+    - filename: Nom du fichier (l'extension détermine le format)
+    - size: Taille totale en octets
+    - sha256: Empreinte du fichier complet (optionnel, vérifiée à la fin)
+    - name, description, layer_type, status et options d'import comme /upload
+    
+    Protocole:
+    1. POST /uploads -> uploadId, chunkSize conseillé
+    2. PUT /uploads/<id>/chunks, corps brut du morceau, en-têtes
+       Upload-Offset (offset du morceau) et Content-SHA256 (empreinte du morceau)
+    3. En cas de coupure : GET /uploads/<id> pour connaître l'offset à reprendre
+    4. POST /uploads/<id>/complete -> import planifié (202, jobId)
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        filename = secure_filename(data.get('filename') or '')
+        if not filename or not GeospatialImportService.detect_format(filename):
+            return jsonify({
+                'success': False,
+                'error': f"Format de fichier non supporté. Extensions acceptées: {', '.join(FileValidator.get_supported_extensions())}"
+            }), 400
+        
+        try:
+            layer_config = _build_layer_config(data)
+            size = int(data.get('size', 0))
+        except (TypeError, ValueError) as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        store = get_chunked_upload_store(current_app.config)
+        layer_config['max_file_size'] = store.max_file_size
+        session = store.create(filename, size, layer_config, sha256=data.get('sha256'))
+        
+        return jsonify({
+            'success': True,
+            'data': _chunked_upload_status(session, store)
+        }), 201
+        
+    except ChunkedUploadError as e:
+        return _chunked_upload_error(e)
+    except Exception as e:
+        current_app.logger.error(f"Erreur création upload par morceaux: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': f'Erreur serveur: {str(e)}'
+        }), 500
+
+@geospatial_import_bp.route('/uploads/<upload_id>', methods=['GET'])
+@cross_origin()
+def get_chunked_upload(upload_id):
+    """État d'un upload par morceaux (offset à partir duquel reprendre)"""
+    try:
+        store = get_chunked_upload_store(current_app.config)
+        return jsonify({
+            'success': True,
+            'data': _chunked_upload_status(store.get(upload_id), store)
+        })
+    except ChunkedUploadError as e:
+        return _chunked_upload_error(e)
+
+@geospatial_import_bp.route('/uploads/<upload_id>/chunks', methods=['PUT'])
+@cross_origin()
+def upload_chunk(upload_id):
+    """
+    Écrit un morceau, lu en flux depuis le corps de la requête
+    
+    En-têtes:
+    - Upload-Offset: Offset du morceau (doit être égal à l'offset courant, sinon 409)
+    - Content-SHA256: Empreinte hexadécimale du morceau (obligatoire, sinon 400)
+    """
+    try:
+        offset_header = request.headers.get('Upload-Offset', request.args.get('offset'))
+        try:
+            offset = int(offset_header)
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': 'En-tête Upload-Offset manquant ou invalide'
+            }), 400
+        
+        store = get_chunked_upload_store(current_app.config)
+        session = store.write_chunk(
+            upload_id,
+            offset,
+            request.stream,
+            checksum=request.headers.get('Content-SHA256')
+        )
+        return jsonify({
+            'success': True,
+            'data': _chunked_upload_status(session, store)
+        })
+        
+    except ChunkedUploadError as e:
+        return _chunked_upload_error(e)
+    except Exception as e:
+        current_app.logger.error(f"Erreur écriture morceau {upload_id}: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': f'Erreur serveur: {str(e)}'
+        }), 500
+
+@geospatial_import_bp.route('/uploads/<upload_id>/complete', methods=['POST'])
+@cross_origin()
+def complete_chunked_upload(upload_id):
+    """
+    Assemble le fichier reçu et le transmet au pipeline d'import (202)
+    
+    Le fichier est réservé pour le job avant sa mise en file : un second
+    appel reçoit 409 (avec le jobId une fois connu). Si la file d'import est
+    saturée (503), la réservation est annulée et l'appel peut être renouvelé
+    sans renvoyer le fichier.
+    """
+    try:
+        store = get_chunked_upload_store(current_app.config)
+        layer_config = store.get(upload_id)['layerConfig']
+        started = time.perf_counter()
+        # Empreinte calculée en une seule lecture, vérification comprise
+        file_path, content_hash = store.assemble(upload_id)
+        
+        layer_config['content_hash'] = content_hash
+        layer_config['upload_timings'] = {'hash': time.perf_counter() - started}
+        duplicate_response = _existing_layer_response(layer_config)
+        if duplicate_response is not None:
+            store.delete(upload_id)
+            return duplicate_response
+        
+        # Réservation sous le verrou de la session : un seul job par upload
+        job_path, job_dir = store.claim(upload_id)
+        try:
+            response, status = _enqueue_import(job_path, job_dir, layer_config, keep_on_reject=True)
+        except Exception:
+            store.unclaim(upload_id, job_path)
+            raise
+        if status == 202:
+            store.record_job(upload_id, response.get_json()['data']['jobId'])
+        else:
+            store.unclaim(upload_id, job_path)
+        return response, status
+        
+    except ChunkedUploadError as e:
+        return _chunked_upload_error(e)
+    except Exception as e:
+        current_app.logger.error(f"Erreur finalisation upload {upload_id}: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': f'Erreur serveur: {str(e)}'
+        }), 500
+
+@geospatial_import_bp.route('/uploads/<upload_id>', methods=['DELETE'])
+@cross_origin()
+def delete_chunked_upload(upload_id):
+    """Abandonne un upload par morceaux"""
+    try:
+        store = get_chunked_upload_store(current_app.config)
+        store.get(upload_id)
+        store.delete(upload_id)
+        return jsonify({
+            'success': True,
+            'message': 'Upload annulé'
+        })
+    except ChunkedUploadError as e:
+        return _chunked_upload_error(e)
+
+def _chunked_upload_status(session, store):
+    return {
+        'uploadId': session['uploadId'],
+        'filename': session['filename'],
+        'size': session['size'],
+        'offset': session['offset'],
+        'complete': session['offset'] == session['size'],
+        'chunkSize': store.chunk_size,
+        'updatedAt': session['updatedAt']
+    }
+
+def _chunked_upload_error(error):
+    body = {
+        'success': False,
+        'error': str(error)
+    }
+    if error.offset is not None:
+        body['offset'] = error.offset
+    if error.job_id is not None:
+        body['jobId'] = error.job_id
+    return jsonify(body), error.status_code
+
 @geospatial_import_bp.route('/preview', methods=['POST'])
 @cross_origin()
 def preview_geospatial_file():
     """Prévisualisation d'un fichier géospatial sans création de couche.
-    Retourne uniquement des métadonnées pour alimenter l'aperçu côté frontend."""
+    Retourne uniquement des métadonnées pour alimenter l'aperçu côté frontend.
+    
+    Form data / query params:
+    - mode: 'auto' (défaut), 'fast' (métadonnées du format, échantillon de
+      features) ou 'full' (lecture complète, amorce le cache d'upload)"""
     try:
         if 'file' not in request.files:
             return jsonify({
@@ -146,8 +495,9 @@ def preview_geospatial_file():
 
         file.save(temp_file_path)
 
+        mode = request.form.get('mode') or request.args.get('mode', 'auto')
         import_service = GeospatialImportService()
-        success, message, preview_data = import_service.preview_file(temp_file_path)
+        success, message, preview_data = import_service.preview_file(temp_file_path, mode=mode)
 
         # Nettoyage
         import_service.cleanup()
@@ -186,18 +536,29 @@ def get_geospatial_layers():
     - layer_type: Filtrer par type
     - status: Filtrer par statut
     - search: Recherche textuelle
-    - page: Numéro de page (défaut: 1)
-    - per_page: Éléments par page (défaut: 20)
+    - cursor: Curseur de la page suivante (pagination.next_cursor de la réponse précédente)
+    - per_page: Éléments par page (défaut: 20, max: 100)
+    - with_total: Ajouter une estimation du nombre total de couches (défaut: false)
+    - page: Numéro de page (pagination par OFFSET, conservée pour compatibilité)
     - include_geojson: Inclure les géométries GeoJSON (défaut: false)
+    - features: GeoJSON par feature (FeatureCollection) plutôt qu'agrégé (défaut: false)
+    - precision: Nombre de décimales des coordonnées (0 à 15)
+    - fields: Propriétés des features à conserver, séparées par virgule
     """
     try:
         # Paramètres de requête
         layer_type = request.args.get('layer_type')
         status = request.args.get('status')
         search = request.args.get('search', '').strip()
-        page = request.args.get('page', 1, type=int)
-        per_page = min(request.args.get('per_page', 20, type=int), 100)  # Max 100
         include_geojson = request.args.get('include_geojson', 'false').lower() == 'true'
+        by_feature = request.args.get('features', 'false').lower() == 'true'
+        try:
+            precision, fields = parse_output_options(request.args)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
         
         # Construction de la requête
         query = GeospatialLayer.query.filter_by(is_visible=True)
@@ -216,31 +577,31 @@ def get_geospatial_layers():
                 )
             )
         
-        # Pagination
-        layers_paginated = query.order_by(GeospatialLayer.created_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        # Pagination par curseur sur (created_at, id)
+        try:
+            layers, pagination = paginate_request(query, GeospatialLayer.created_at, GeospatialLayer.id, request.args)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
         
-        # Formatage des résultats
-        layers_data = []
-        for layer in layers_paginated.items:
-            layer_dict = layer.to_dict()
-            if include_geojson:
-                layer_dict['geojson'] = layer.to_geojson_feature()
-            layers_data.append(layer_dict)
+        if not include_geojson:
+            return jsonify({
+                'success': True,
+                'data': [layer.to_dict() for layer in layers],
+                'pagination': pagination
+            })
         
-        return jsonify({
-            'success': True,
-            'data': layers_data,
-            'pagination': {
-                'page': page,
-                'pages': layers_paginated.pages,
-                'per_page': per_page,
-                'total': layers_paginated.total,
-                'has_next': layers_paginated.has_next,
-                'has_prev': layers_paginated.has_prev
-            }
-        })
+        # GeoJSON construit par PostGIS (une requête pour la page), inséré tel quel
+        geojson = _layers_geojson([layer.id for layer in layers], by_feature, precision, fields)
+        layers_data = ','.join(
+            _with_raw_json(layer.to_dict(), 'geojson', geojson.get(layer.id))
+            for layer in layers
+        )
+        return _raw_json_response(
+            '{"success": true, "data": [' + layers_data + '], "pagination": ' + json.dumps(pagination) + '}'
+        )
         
     except Exception as e:
         current_app.logger.error(f"Erreur récupération couches: {str(e)}")
@@ -252,15 +613,93 @@ def get_geospatial_layers():
 @geospatial_import_bp.route('/layers/<int:layer_id>', methods=['GET'])
 @cross_origin()
 def get_geospatial_layer(layer_id):
-    """Récupère une couche géospatiale spécifique"""
+    """
+    Récupère une couche géospatiale spécifique
+    
+    Query params:
+    - features: GeoJSON par feature (FeatureCollection) plutôt qu'agrégé (défaut: false)
+    - precision: Nombre de décimales des coordonnées (0 à 15)
+    - fields: Propriétés des features à conserver, séparées par virgule
+    """
+    try:
+        precision, fields = parse_output_options(request.args)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     try:
         layer = GeospatialLayer.query.get_or_404(layer_id)
+        by_feature = request.args.get('features', 'false').lower() == 'true'
+        
+        geojson = _layers_geojson([layer.id], by_feature, precision, fields).get(layer.id)
+        return _raw_json_response(
+            '{"success": true, "data": {"layer": ' + json.dumps(layer.to_dict())
+            + ', "geojson": ' + (geojson or 'null') + '}}'
+        )
         
+    except Exception as e:
         return jsonify({
-            'success': True,
-            'data': {
-                'layer': layer.to_dict(),
-                'geojson': layer.to_geojson_feature()
+            'success': False,
+            'error': f'Couche non trouvée: {str(e)}'
+        }), 404
+
+def _layers_geojson(layer_ids, by_feature, precision=None, fields=None):
+    """GeoJSON en texte par couche : FeatureCollection par feature ou Feature agrégée"""
+    if by_feature:
+        return feature_collections_json(layer_ids, precision, fields)
+    return layer_features_json(layer_ids, precision, fields)
+
+def _with_raw_json(data, key, raw_json):
+    """Sérialise data en ajoutant key associé à un texte JSON déjà construit"""
+    return json.dumps(data)[:-1] + ', ' + json.dumps(key) + ': ' + (raw_json or 'null') + '}'
+
+def _raw_json_response(body, status=200):
+    return current_app.response_class(body, status=status, mimetype='application/json')
+
+@geospatial_import_bp.route('/layers/<int:layer_id>/features', methods=['GET'])
+@cross_origin()
+def get_layer_features(layer_id):
+    """
+    Récupère les features individuelles d'une couche (GeoJSON)
+    
+    Query params:
+    - page: Numéro de page (défaut: 1)
+    - per_page: Éléments par page (défaut: 100, max: 1000)
+    - precision: Nombre de décimales des coordonnées (0 à 15)
+    - fields: Propriétés à conserver, séparées par virgule
+    """
+    try:
+        precision, fields = parse_output_options(request.args)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    try:
+        GeospatialLayer.query.get_or_404(layer_id)
+        page = request.args.get('page', 1, type=int)
+        per_page = min(request.args.get('per_page', 100, type=int), 1000)
+        
+        features_paginated = GeospatialFeature.query.filter_by(layer_id=layer_id).order_by(
+            GeospatialFeature.feature_index
+        ).paginate(page=page, per_page=per_page, error_out=False)
+        
+        features = [
+            apply_output_options(feature.to_geojson_feature(), precision, fields)
+            for feature in features_paginated.items
+        ]
+        
+        return jsonify({
+            'type': 'FeatureCollection',
+            'features': [feature for feature in features if feature],
+            'pagination': {
+                'page': page,
+                'pages': features_paginated.pages,
+                'per_page': per_page,
+                'total': features_paginated.total,
+                'has_next': features_paginated.has_next,
+                'has_prev': features_paginated.has_prev
             }
         })
         
@@ -270,6 +709,37 @@ def get_geospatial_layer(layer_id):
             'error': f'Couche non trouvée: {str(e)}'
         }), 404
 
+@geospatial_import_bp.route('/layers/<int:layer_id>/features/<int:feature_id>', methods=['GET'])
+@cross_origin()
+def get_layer_feature(layer_id, feature_id):
+    """
+    Récupère une feature spécifique d'une couche
+    
+    Query params:
+    - precision: Nombre de décimales des coordonnées (0 à 15)
+    - fields: Propriétés à conserver, séparées par virgule
+    """
+    try:
+        precision, fields = parse_output_options(request.args)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    try:
+        feature = GeospatialFeature.query.filter_by(layer_id=layer_id, id=feature_id).first_or_404()
+        
+        return jsonify({
+            'success': True,
+            'data': apply_output_options(feature.to_geojson_feature(), precision, fields)
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Feature non trouvée: {str(e)}'
+        }), 404
+
 @geospatial_import_bp.route('/layers/<int:layer_id>', methods=['PUT'])
 @cross_origin()
 def update_geospatial_layer(layer_id):
@@ -312,6 +782,7 @@ def update_geospatial_layer(layer_id):
             layer.style_config = data['style_config']
         
         db.session.commit()
+        get_response_cache().invalidate_layer(layer.id)
         
         return jsonify({
             'success': True,
@@ -336,6 +807,7 @@ def delete_geospatial_layer(layer_id):
         # Suppression logique (marquer comme invisible)
         layer.is_visible = False
         db.session.commit()
+        get_response_cache().invalidate_layer(layer.id)
         
         return jsonify({
             'success': True,
@@ -355,14 +827,37 @@ def export_geospatial_layer(layer_id, format):
     """
     Exporte une couche géospatiale
     
-    Formats supportés: geojson, kml, csv
+    Formats supportés: geojson, fgb (FlatGeobuf), parquet (GeoParquet), arrow (Arrow IPC), kml, csv
+    
+    Query params:
+    - precision: Nombre de décimales des coordonnées (0 à 15, geojson uniquement)
+    - fields: Propriétés à conserver, séparées par virgule
     """
+    try:
+        precision, fields = parse_output_options(request.args)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     try:
         layer = GeospatialLayer.query.get_or_404(layer_id)
         
         if format.lower() == 'geojson':
-            geojson = layer.to_geojson_feature()
-            return jsonify(geojson)
+            # Features sérialisées par PostGIS et envoyées au fil de l'eau
+            features = iter_collection_features(layer.id, precision, fields)
+            chunks = iter_json_object({'type': 'FeatureCollection'}, 'features', features, raw=True)
+            return streaming_response(chunks)
+        
+        elif binary_format(format):
+            cache = get_response_cache()
+            versions = layer_versions(GeospatialLayer.query.filter_by(id=layer.id))
+            cache_key = cache.make_key(request.path, request.args.to_dict(flat=False), versions)
+            return _binary_response(
+                binary_format(format), collection_row_statements(layer.id, fields),
+                secure_filename(layer.name) or f'layer_{layer.id}',
+                cache, cache_key, cache.layer_tags([layer.id]), as_attachment=True
+            )
         
         elif format.lower() == 'kml':
             # TODO: Implémenter l'export KML
@@ -393,26 +888,48 @@ def export_geospatial_layer(layer_id, format):
 @geospatial_import_bp.route('/upload-history', methods=['GET'])
 @cross_origin()
 def get_upload_history():
-    """Récupère l'historique des uploads"""
+    """
+    Récupère l'historique des uploads
+    
+    Query params:
+    - cursor: Curseur de la page suivante (pagination.next_cursor)
+    - per_page: Éléments par page (défaut: 20, max: 100)
+    - with_total: Ajouter une estimation du nombre total d'uploads (défaut: false)
+    - page: Numéro de page (pagination par OFFSET, conservée pour compatibilité)
+    - format: Filtre par format de fichier (ex: SHP, CSV)
+    - status: Filtre par statut (pending, processing, success, error)
+    
+    fileMetadata.profile détaille chaque import : durée par étape
+    (upload_write, hash, archive_open, parse, standardize, validate,
+    geometry_build, db_insert, commit), temps cumulés des workers
+    géométriques (reproject, repair) et pic mémoire tracemalloc.
+    """
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = min(request.args.get('per_page', 20, type=int), 100)
+        file_format = request.args.get('format')
+        status = request.args.get('status')
         
-        history_paginated = LayerUploadHistory.query.order_by(
-            LayerUploadHistory.uploaded_at.desc()
-        ).paginate(page=page, per_page=per_page, error_out=False)
+        query = LayerUploadHistory.query
+        if file_format:
+            query = query.filter(LayerUploadHistory.file_format == file_format.upper())
+        if status:
+            query = query.filter(LayerUploadHistory.upload_status == status)
+        
+        try:
+            records, pagination = paginate_request(
+                query, LayerUploadHistory.uploaded_at, LayerUploadHistory.id, request.args
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
         
-        history_data = [record.to_dict() for record in history_paginated.items]
+        history_data = [record.to_dict() for record in records]
         
         return jsonify({
             'success': True,
             'data': history_data,
-            'pagination': {
-                'page': page,
-                'pages': history_paginated.pages,
-                'per_page': per_page,
-                'total': history_paginated.total
-            }
+            'pagination': pagination
         })
         
     except Exception as e:
@@ -421,6 +938,52 @@ def get_upload_history():
             'error': f'Erreur récupération historique: {str(e)}'
         }), 500
 
+@geospatial_import_bp.route('/upload-history/<int:upload_id>', methods=['GET'])
+@cross_origin()
+def get_upload_status(upload_id):
+    """
+    Suivi d'un job d'import (statut pending/processing/success/error)
+    
+    Une fois l'import réussi, la couche créée est incluse dans la réponse.
+    Pour une archive multi-couches, 'datasets' détaille le résultat de chaque
+    jeu de données et 'layers' liste toutes les couches créées.
+    """
+    try:
+        upload_record = LayerUploadHistory.query.get_or_404(upload_id)
+        
+        data = {
+            'jobId': upload_record.id,
+            'status': upload_record.upload_status,
+            'upload': upload_record.to_dict()
+        }
+        # GeoJSON de la couche construit par PostGIS (ST_AsGeoJSON)
+        geojson = None
+        if upload_record.upload_status == 'success' and upload_record.layer:
+            data['layer'] = upload_record.layer.to_dict()
+            geojson = layer_features_json([upload_record.layer_id]).get(upload_record.layer_id)
+        
+        # Archive multi-couches : résultat de chaque jeu de données
+        datasets = (upload_record.file_metadata or {}).get('datasets')
+        if datasets:
+            data['datasets'] = datasets
+            layer_ids = [d['layerId'] for d in datasets if d.get('layerId')]
+            data['layers'] = [
+                layer.to_dict()
+                for layer in GeospatialLayer.query.filter(GeospatialLayer.id.in_(layer_ids)).order_by(GeospatialLayer.id)
+            ]
+        
+        if 'layer' in data:
+            data = _with_raw_json(data, 'geojson', geojson)
+        else:
+            data = json.dumps(data)
+        return _raw_json_response('{"success": true, "data": ' + data + '}')
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Upload non trouvé: {str(e)}'
+        }), 404
+
 @geospatial_import_bp.route('/supported-formats', methods=['GET'])
 @cross_origin()
 def get_supported_formats():
@@ -432,7 +995,10 @@ def get_supported_formats():
                 'formats': GeospatialImportService.SUPPORTED_FORMATS,
                 'extensions': FileValidator.get_supported_extensions(),
                 'max_file_size_mb': GeospatialImportService.MAX_FILE_SIZE / (1024 * 1024),
-                'max_features': GeospatialImportService.MAX_FEATURES
+                'max_features': None,
+                'streaming_threshold_mb': GeospatialImportService.STREAMING_THRESHOLD_BYTES / (1024 * 1024),
+                'streaming_batch_size': GeospatialImportService.STREAMING_BATCH_SIZE,
+                'bulk_load_threshold_mb': GeospatialImportService.BULK_LOAD_THRESHOLD_BYTES / (1024 * 1024)
             }
         })
     except Exception as e:
@@ -452,48 +1018,92 @@ def get_all_geojson():
     - layer_type: Filtrer par type
     - status: Filtrer par statut
     - ids: Liste d'IDs séparés par virgule
+    - features: Une Feature par géométrie importée plutôt qu'une par couche (défaut: false)
+    - bbox: Emprise affichée "minLon,minLat,maxLon,maxLat" (WGS84) ; seules les
+      géométries qui l'intersectent sont renvoyées (index GIST, opérateur &&)
+    - zoom: Niveau de zoom de la carte ; les géométries sont simplifiées à la
+      taille d'un pixel (versions précalculées jusqu'au zoom 12) et, en mode
+      features, celles plus petites qu'un pixel sont omises
+    - clip: Découper les géométries à l'emprise bbox (défaut: false)
+    - precision: Nombre de décimales des coordonnées (0 à 15) ; 6 suffisent à
+      l'affichage (environ 10 cm) et allègent nettement la réponse
+    - fields: Propriétés à conserver, séparées par virgule (défaut: toutes)
+    - format: geojson (défaut), fgb (FlatGeobuf indexé, requêtes Range acceptées),
+      parquet (GeoParquet) ou arrow (Arrow IPC) ; les formats binaires
+      transportent les géométries en WKB, precision ne s'y applique pas
+    
+    Les Features sont sérialisées par PostGIS et la réponse est envoyée au fil
+    de l'eau ; metadata (total_features, bbox, generated_at) figure en fin de document.
+    Réponse conditionnelle : ETag/Last-Modified issus de geospatial_layers,
+    304 si If-None-Match ou If-Modified-Since est à jour.
     """
     try:
         # Paramètres de filtrage
         layer_type = request.args.get('layer_type')
         status = request.args.get('status')
         ids = request.args.get('ids')
+        by_feature = request.args.get('features', 'false').lower() == 'true'
+        clip = _as_bool(request.args.get('clip', 'false'))
+        try:
+            bbox = _parse_bbox(request.args.get('bbox'))
+            zoom = _parse_zoom(request.args.get('zoom'))
+            precision, fields = parse_output_options(request.args)
+            output_format = _parse_output_format(request.args.get('format'))
+        except ValueError as e:
+            return jsonify({
+                'type': 'FeatureCollection',
+                'features': [],
+                'error': str(e)
+            }), 400
+        envelope = db.func.ST_MakeEnvelope(*bbox, 4326) if bbox else None
         
-        # Construction de la requête
-        query = GeospatialLayer.query.filter_by(is_visible=True)
+        # 304 sans charger de géométrie si aucune couche n'a changé
+        etag, last_modified = data_validators([GeospatialLayer], request.args.to_dict(flat=False))
+        if is_not_modified(etag, last_modified):
+            return not_modified_response(etag, last_modified)
         
-        if layer_type:
-            query = query.filter_by(layer_type=layer_type)
+        # Construction de la requête
+        query = _visible_layers_query(layer_type, status, ids)
         
-        if status:
-            query = query.filter_by(status=status)
+        if envelope is not None:
+            query = query.filter(
+                GeospatialLayer.geom.intersects(envelope),
+                db.func.ST_Intersects(GeospatialLayer.geom, envelope)
+            )
         
-        if ids:
-            id_list = [int(id.strip()) for id in ids.split(',') if id.strip().isdigit()]
-            if id_list:
-                query = query.filter(GeospatialLayer.id.in_(id_list))
+        # Réponse en cache si aucune des couches sélectionnées n'a changé
+        cache = get_response_cache()
+        versions = layer_versions(query)
+        cache_key = cache.make_key(request.path, request.args.to_dict(flat=False), versions)
+        tags = cache.layer_tags((layer_id for layer_id, _ in versions), collection=True)
         
-        layers = query.all()
+        # Formats binaires : géométries WKB encodées sans passer par le GeoJSON
+        if output_format:
+            if by_feature:
+                statements = feature_row_statements(query, envelope, clip, zoom, fields)
+            else:
+                statements = layer_row_statements(query, envelope, clip, zoom, fields)
+            response = _binary_response(
+                output_format, statements, 'odg_layers', cache, cache_key, tags,
+                etag=etag, last_modified=last_modified
+            )
+            return with_validators(response, etag, last_modified)
         
-        # Construction de la FeatureCollection
-        features = []
-        for layer in layers:
-            try:
-                geojson_feature = layer.to_geojson_feature()
-                if geojson_feature:
-                    features.append(geojson_feature)
-            except Exception as e:
-                current_app.logger.warning(f"Erreur conversion GeoJSON pour couche {layer.id}: {str(e)}")
-                continue
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return with_validators(streaming_response([cached]), etag, last_modified)
         
-        return jsonify({
-            'type': 'FeatureCollection',
-            'features': features,
-            'metadata': {
-                'total_features': len(features),
-                'generated_at': datetime.utcnow().isoformat()
-            }
-        })
+        # FeatureCollection construite par PostGIS et envoyée au fil de l'eau
+        if by_feature:
+            features = iter_features(query, envelope, clip, zoom, precision, fields)
+        else:
+            features = iter_layer_features(query, envelope, clip, zoom, precision, fields)
+        metadata = {
+            'bbox': list(bbox) if bbox else None,
+            'generated_at': datetime.utcnow().isoformat()
+        }
+        chunks = _cached_stream(stream_feature_collection(features, metadata), cache, cache_key, tags)
+        return with_validators(streaming_response(chunks), etag, last_modified)
         
     except Exception as e:
         current_app.logger.error(f"Erreur récupération GeoJSON: {str(e)}")
@@ -503,6 +1113,142 @@ def get_all_geojson():
             'error': str(e)
         }), 500
 
+def _cached_stream(chunks, cache, cache_key, tags):
+    """Transmet les morceaux et met la réponse complète en cache à la fin de l'envoi"""
+    body = []
+    for chunk in chunks:
+        body.append(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        yield chunk
+    cache.set(cache_key, b''.join(body), tags)
+
+def _binary_response(output_format, statements, basename, cache, cache_key, tags,
+                     as_attachment=False, etag=None, last_modified=None):
+    """Réponse FlatGeobuf (fichier complet, requêtes Range acceptées) ou GeoParquet / Arrow (au fil de l'eau)"""
+    mimetype = format_mimetype(output_format)
+    download_name = format_filename(basename, output_format)
+    data = cache.get(cache_key)
+    
+    if output_format == 'fgb':
+        # L'index spatial est écrit en tête : fichier complet avant envoi
+        if data is None:
+            data = encode_flatgeobuf(statements, basename)
+            cache.set(cache_key, data, tags)
+        return send_file(
+            io.BytesIO(data), mimetype=mimetype, as_attachment=as_attachment,
+            download_name=download_name, conditional=True,
+            etag=etag or cache_key, last_modified=last_modified
+        )
+    
+    if data is not None:
+        chunks = [data]
+    else:
+        chunks = _cached_stream(encode_stream(output_format, statements), cache, cache_key, tags)
+    response = streaming_response(chunks, mimetype, compress=output_format != 'parquet')
+    disposition = 'attachment' if as_attachment else 'inline'
+    response.headers['Content-Disposition'] = f'{disposition}; filename="{download_name}"'
+    return response
+
+@geospatial_import_bp.route('/tiles/<int:z>/<int:x>/<int:y>.mvt', methods=['GET'])
+@cross_origin()
+def get_vector_tile(z, x, y):
+    """
+    Tuile vectorielle Mapbox (MVT) des couches géospatiales et des données WebGIS
+    
+    Une couche MVT par source : geospatial, deposits, exploitation_areas, infrastructure
+    
+    Query params:
+    - sources: Sources incluses, séparées par virgule (défaut: toutes)
+    - layer_type: Filtrer les couches géospatiales par type
+    - status: Filtrer les couches géospatiales par statut
+    - ids: Liste d'IDs de couches géospatiales séparés par virgule
+    """
+    try:
+        if not 0 <= z <= MAX_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            return jsonify({
+                'success': False,
+                'error': f'Tuile invalide: {z}/{x}/{y}'
+            }), 400
+        
+        sources = request.args.get('sources')
+        sources = [source.strip() for source in sources.split(',') if source.strip()] if sources else TILE_SOURCES
+        unknown = [source for source in sources if source not in TILE_SOURCES]
+        if unknown:
+            return jsonify({
+                'success': False,
+                'error': f"Sources inconnues: {', '.join(unknown)}. Sources disponibles: {', '.join(TILE_SOURCES)}"
+            }), 400
+        
+        query = _visible_layers_query(
+            request.args.get('layer_type'), request.args.get('status'), request.args.get('ids')
+        )
+        
+        # Cache indexé sur la version des couches de la tuile
+        cache = get_response_cache()
+        versions, tags = tile_data_version(z, x, y, query, sources)
+        cache_key = cache.make_key(request.path, request.args.to_dict(flat=False), versions)
+        tile = cache.get(cache_key)
+        if tile is None:
+            tile = build_vector_tile(z, x, y, query, sources)
+            cache.set(cache_key, tile, tags)
+        return current_app.response_class(tile, mimetype=MVT_MIMETYPE)
+        
+    except Exception as e:
+        current_app.logger.error(f"Erreur tuile {z}/{x}/{y}: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': f'Erreur serveur: {str(e)}'
+        }), 500
+
+def _visible_layers_query(layer_type=None, status=None, ids=None):
+    """Couches visibles filtrées par type, statut et liste d'IDs ("1,2,3")"""
+    query = GeospatialLayer.query.filter_by(is_visible=True)
+    
+    if layer_type:
+        query = query.filter_by(layer_type=layer_type)
+    
+    if status:
+        query = query.filter_by(status=status)
+    
+    if ids:
+        id_list = [int(id.strip()) for id in ids.split(',') if id.strip().isdigit()]
+        if id_list:
+            query = query.filter(GeospatialLayer.id.in_(id_list))
+    
+    return query
+
+def _parse_bbox(value):
+    """Emprise "minLon,minLat,maxLon,maxLat" bornée au domaine WGS84, ou None"""
+    if not value:
+        return None
+    try:
+        min_x, min_y, max_x, max_y = (float(part) for part in value.split(','))
+    except ValueError:
+        raise ValueError("bbox invalide: attendu minLon,minLat,maxLon,maxLat")
+    if min_x >= max_x or min_y >= max_y:
+        raise ValueError("bbox invalide: les minimums doivent être inférieurs aux maximums")
+    return (max(min_x, -180.0), max(min_y, -90.0), min(max_x, 180.0), min(max_y, 90.0))
+
+def _parse_output_format(value):
+    """Format binaire demandé ('fgb', 'parquet', 'arrow'), None pour GeoJSON"""
+    if value is None or value.lower() in ('', 'geojson', 'json'):
+        return None
+    output_format = binary_format(value)
+    if output_format is None:
+        raise ValueError(f"format invalide: attendu geojson, {', '.join(BINARY_FORMATS)}")
+    return output_format
+
+def _parse_zoom(value):
+    """Niveau de zoom entier borné à MAX_ZOOM, ou None"""
+    if value is None or value == '':
+        return None
+    try:
+        zoom = int(value)
+    except ValueError:
+        raise ValueError("zoom invalide: entier attendu")
+    if not 0 <= zoom <= MAX_ZOOM:
+        raise ValueError(f"zoom invalide: attendu entre 0 et {MAX_ZOOM}")
+    return zoom
+
 @geospatial_import_bp.route('/statistics', methods=['GET'])
 @cross_origin()
 def get_geospatial_statistics():
@@ -551,3 +1297,38 @@ def get_geospatial_statistics():
             'success': False,
             'error': f'Erreur statistiques: {str(e)}'
         }), 500
+
+@geospatial_import_bp.route('/cache/stats', methods=['GET'])
+@cross_origin()
+def get_cache_statistics():
+    """Compteurs des caches (réponses cartographiques, fichiers analysés) pour leur dimensionnement"""
+    try:
+        return jsonify({
+            'success': True,
+            'data': {
+                'responseCache': get_response_cache().stats(),
+                'uploadCache': get_upload_cache().stats()
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Erreur statistiques cache: {str(e)}'
+        }), 500
+
+@geospatial_import_bp.route('/import-queue', methods=['GET'])
+@cross_origin()
+def get_import_queue_status():
+    """État de la file d'import (workers, jobs en cours et en attente) pour son dimensionnement"""
+    try:
+        return jsonify({
+            'success': True,
+            'data': get_import_job_queue(current_app.config).stats()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Erreur état de la file d\'import: {str(e)}'
+        }), 500
@@ -1,10 +1,17 @@
 from flask import Blueprint, jsonify, request
 from flask_cors import cross_origin
 from src.models.mining_data import db, MiningDeposit, ExploitationArea, Infrastructure
+from src.services.response_cache import get_response_cache
+from src.services.http_validators import data_validators, is_not_modified, not_modified_response, with_validators
+from src.services.geojson_output import apply_output_options, parse_output_options
+from src.services.json_streaming import iter_json_object, streaming_response
 import json
 
 webgis_bp = Blueprint('webgis', __name__)
 
+# Lignes lues par aller-retour pour les réponses envoyées au fil de l'eau
+STREAM_BATCH_SIZE = 1000
+
 @webgis_bp.route('/deposits', methods=['GET'])
 @cross_origin()
 def get_deposits():
@@ -70,6 +77,7 @@ def create_deposit():
         
         db.session.add(deposit)
         db.session.commit()
+        get_response_cache().invalidate_source('deposits')
         
         return jsonify({
             'success': True,
@@ -117,6 +125,7 @@ def create_exploitation_area():
         
         db.session.add(area)
         db.session.commit()
+        get_response_cache().invalidate_source('exploitation_areas')
         
         return jsonify({
             'success': True,
@@ -164,6 +173,7 @@ def create_infrastructure():
         
         db.session.add(infra)
         db.session.commit()
+        get_response_cache().invalidate_source('infrastructure')
         
         return jsonify({
             'success': True,
@@ -179,13 +189,29 @@ def create_infrastructure():
 @webgis_bp.route('/geojson/deposits', methods=['GET'])
 @cross_origin()
 def get_deposits_geojson():
-    """Récupère les gisements au format GeoJSON"""
+    """
+    Récupère les gisements au format GeoJSON
+    
+    Query params:
+    - precision: Nombre de décimales des coordonnées (0 à 15)
+    - fields: Propriétés à conserver, séparées par virgule
+    """
+    try:
+        precision, fields = parse_output_options(request.args)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     try:
-        deposits = MiningDeposit.query.all()
+        # 304 sans charger les données si la table n'a pas changé
+        etag, last_modified = data_validators([MiningDeposit], request.args.to_dict(flat=False))
+        if is_not_modified(etag, last_modified):
+            return not_modified_response(etag, last_modified)
         
-        features = []
-        for deposit in deposits:
-            feature = {
+        # Features sérialisées une à une et envoyées au fil de l'eau
+        features = (
+            apply_output_options({
                 "type": "Feature",
                 "geometry": {
                     "type": "Point",
@@ -200,15 +226,12 @@ def get_deposits_geojson():
                     "status": deposit.status,
                     "description": deposit.description
                 }
-            }
-            features.append(feature)
-        
-        geojson = {
-            "type": "FeatureCollection",
-            "features": features
-        }
+            }, precision, fields)
+            for deposit in MiningDeposit.query.order_by(MiningDeposit.id).yield_per(STREAM_BATCH_SIZE)
+        )
         
-        return jsonify(geojson)
+        chunks = iter_json_object({"type": "FeatureCollection"}, "features", features)
+        return with_validators(streaming_response(chunks), etag, last_modified)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -218,8 +241,26 @@ def get_deposits_geojson():
 @webgis_bp.route('/geojson/exploitation-areas', methods=['GET'])
 @cross_origin()
 def get_exploitation_areas_geojson():
-    """Récupère les zones d'exploitation au format GeoJSON"""
+    """
+    Récupère les zones d'exploitation au format GeoJSON
+    
+    Query params:
+    - precision: Nombre de décimales des coordonnées (0 à 15)
+    - fields: Propriétés à conserver, séparées par virgule
+    """
     try:
+        precision, fields = parse_output_options(request.args)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    try:
+        # 304 sans charger les données si la table n'a pas changé
+        etag, last_modified = data_validators([ExploitationArea], request.args.to_dict(flat=False))
+        if is_not_modified(etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        
         areas = ExploitationArea.query.all()
         
         features = []
@@ -240,14 +281,14 @@ def get_exploitation_areas_geojson():
                     "extractedVolume": area.extracted_volume
                 }
             }
-            features.append(feature)
+            features.append(apply_output_options(feature, precision, fields))
         
         geojson = {
             "type": "FeatureCollection",
             "features": features
         }
         
-        return jsonify(geojson)
+        return with_validators(jsonify(geojson), etag, last_modified)
     except Exception as e:
         return jsonify({
             'success': False,
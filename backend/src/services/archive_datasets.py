@@ -0,0 +1,51 @@
+"""
+Jeux de données contenus dans une archive multi-couches (ZIP, RAR)
+
+Une archive peut contenir plusieurs shapefiles, GeoJSON ou KML : chacun
+devient une couche distincte, lue par lots comme un fichier isolé
+(GeospatialImportService._import_archive_datasets).
+"""
+
+import os
+import logging
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+DATASET_EXTENSIONS = {
+    '.shp': 'SHP',
+    '.geojson': 'GEOJSON',
+    '.json': 'GEOJSON',
+    '.kml': 'KML'
+}
+SHAPEFILE_REQUIRED_COMPANIONS = ('.shx', '.dbf')
+SHAPEFILE_EXTENSIONS = ('.shp', '.shx', '.dbf', '.prj', '.cpg', '.qix', '.sbn', '.sbx')
+
+
+def list_archive_datasets(members: List[str]) -> List[Tuple[str, str]]:
+    """(membre, format) de chaque jeu de données lisible du listing d'une archive"""
+    available = {member.lower() for member in members}
+    datasets = []
+    for member in members:
+        name = os.path.basename(member)
+        if not name or name.startswith('.') or '__MACOSX' in member:
+            continue
+        file_format = DATASET_EXTENSIONS.get(os.path.splitext(name)[1].lower())
+        if file_format is None:
+            continue
+        if file_format == 'SHP':
+            missing = [ext for ext in SHAPEFILE_REQUIRED_COMPANIONS if (member[:-4] + ext).lower() not in available]
+            if missing:
+                logger.warning(f"Shapefile {member} ignoré, fichiers manquants: {', '.join(missing)}")
+                continue
+        datasets.append((member, file_format))
+    return datasets
+
+
+def dataset_members(member: str, file_format: str, members: List[str]) -> List[str]:
+    """Fichiers de l'archive nécessaires à la lecture d'un jeu de données"""
+    if file_format != 'SHP':
+        return [member]
+    base = member[:-4].lower()
+    return [m for m in members if m[:-4].lower() == base and m[-4:].lower() in SHAPEFILE_EXTENSIONS]
+
@@ -0,0 +1,265 @@
+"""
+Formats binaires de sortie des géométries pour ODG
+
+- FlatGeobuf (.fgb) : index spatial R-tree en tête de fichier, lisible par
+  requêtes HTTP Range (le client ne télécharge que l'emprise affichée)
+- GeoParquet (.parquet) : colonnes compressées pour les téléchargements
+  analytiques (GeoPandas, DuckDB, QGIS)
+- Arrow IPC (.arrow, format stream) : tableaux colonnes directement
+  exploitables par les clients Arrow/GeoArrow
+
+Les géométries sont lues en WKB depuis PostGIS (ST_AsBinary) et ne sont
+jamais décodées en Python ; les propriétés deviennent des colonnes dont le
+type est déduit en SQL (jsonb_typeof). GeoParquet et Arrow sont produits
+par lots et envoyés au fil de l'eau ; FlatGeobuf, dont l'index exige toutes
+les features, est écrit par GDAL (pyogrio) dans un fichier temporaire.
+"""
+
+import io
+import os
+import json
+import shutil
+import logging
+import tempfile
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+import pyogrio
+from sqlalchemy import select, func, case, cast, true, union_all, Numeric, Text
+
+from src.models.geospatial_layers import db
+from src.services.geojson_builder import STREAM_BATCH_SIZE, stream_rows
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    logger.info("Module pyarrow non disponible - formats GeoParquet, Arrow et FlatGeobuf désactivés")
+
+# format -> (type MIME, extension) ; les alias désignent le même encodeur
+BINARY_FORMATS = {
+    'fgb': ('application/flatgeobuf', '.fgb'),
+    'parquet': ('application/vnd.apache.parquet', '.parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', '.arrow'),
+}
+FORMAT_ALIASES = {
+    'flatgeobuf': 'fgb',
+    'geoparquet': 'parquet',
+    'geoarrow': 'arrow',
+}
+
+GEOMETRY_COLUMN = 'geometry'
+# Lignes par groupe Parquet (les lots lus en base sont regroupés)
+PARQUET_ROW_GROUP_SIZE = 64 * 1024
+PARQUET_COMPRESSION = 'zstd'
+# Géométries stockées en EPSG:4326, coordonnées dans l'ordre longitude, latitude
+CRS = 'EPSG:4326'
+
+
+def binary_format(name: Optional[str]) -> Optional[str]:
+    """Nom canonique d'un format binaire ('fgb', 'parquet', 'arrow'), ou None"""
+    if not name:
+        return None
+    name = name.lower()
+    name = FORMAT_ALIASES.get(name, name)
+    return name if name in BINARY_FORMATS else None
+
+
+def format_mimetype(name: str) -> str:
+    return BINARY_FORMATS[name][0]
+
+
+def format_filename(basename: str, name: str) -> str:
+    return basename + BINARY_FORMATS[name][1]
+
+
+def encode_stream(name: str, statements: List[Any]) -> Iterator[bytes]:
+    """Fichier GeoParquet ou Arrow IPC produit par morceaux à partir des requêtes de lignes"""
+    _require_pyarrow()
+    schema, columns = _arrow_schema(statements, name)
+    batches = _record_batches(statements, schema, columns)
+    if name == 'parquet':
+        return _parquet_chunks(schema, batches)
+    if name == 'arrow':
+        return _arrow_chunks(schema, batches)
+    raise ValueError(f"Format non diffusable: {name}")
+
+
+def encode_flatgeobuf(statements: List[Any], layer_name: str) -> bytes:
+    """Fichier FlatGeobuf complet (index spatial compris) écrit par GDAL"""
+    _require_pyarrow()
+    schema, columns = _arrow_schema(statements, 'fgb')
+    reader = pa.RecordBatchReader.from_batches(schema, _record_batches(statements, schema, columns))
+    temp_dir = tempfile.mkdtemp(prefix='odg_fgb_')
+    try:
+        path = os.path.join(temp_dir, 'export.fgb')
+        pyogrio.write_arrow(
+            reader, path, layer=layer_name, driver='FlatGeobuf',
+            geometry_name=GEOMETRY_COLUMN, geometry_type='Unknown', crs=CRS,
+            layer_options={'SPATIAL_INDEX': 'YES'}
+        )
+        with open(path, 'rb') as f:
+            return f.read()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def property_types(statements: List[Any]) -> List[Tuple[str, str]]:
+    """(clé, type) des propriétés des lignes : 'integer', 'number', 'boolean' ou 'string'
+
+    Une seule requête d'agrégat sur les propriétés (les géométries des
+    sous-requêtes ne sont pas calculées). Les valeurs d'une clé aux types
+    JSON mélangés, objets et tableaux compris, sont sérialisées en texte."""
+    properties = union_all(*(
+        select(stmt.order_by(None).subquery().c.properties.label('properties'))
+        for stmt in statements
+    )).subquery()
+    entries = func.jsonb_each(properties.c.properties).table_valued('key', 'value').render_derived()
+    json_type = func.jsonb_typeof(entries.c.value)
+    number = cast(cast(entries.c.value, Text), Numeric)
+    stmt = (
+        select(
+            entries.c.key,
+            func.array_agg(json_type.distinct()),
+            # Entier si toutes les valeurs numériques sont entières et tiennent sur 64 bits
+            func.bool_and(case(
+                (json_type == 'number', (number % 1 == 0) & (func.abs(number) < 2 ** 63)),
+                else_=None
+            ))
+        )
+        .select_from(properties)
+        .join(entries, true())
+        .group_by(entries.c.key)
+        .order_by(entries.c.key)
+    )
+    columns = []
+    for key, json_types, integral in db.session.execute(stmt):
+        kinds = set(json_types) - {'null'}
+        if kinds == {'number'}:
+            columns.append((key, 'integer' if integral else 'number'))
+        elif kinds == {'boolean'}:
+            columns.append((key, 'boolean'))
+        else:
+            columns.append((key, 'string'))
+    return columns
+
+
+def _arrow_schema(statements: List[Any], name: str):
+    """Schéma Arrow : colonnes attributaires puis géométrie WKB (GeoArrow / GeoParquet)"""
+    arrow_types = {
+        'integer': pa.int64(),
+        'number': pa.float64(),
+        'boolean': pa.bool_(),
+        'string': pa.string(),
+    }
+    columns = [(key, kind) for key, kind in property_types(statements) if key != GEOMETRY_COLUMN]
+    fields = [pa.field(key, arrow_types[kind]) for key, kind in columns]
+    fields.append(pa.field(GEOMETRY_COLUMN, pa.binary(), metadata={
+        'ARROW:extension:name': 'geoarrow.wkb',
+        'ARROW:extension:metadata': json.dumps({'crs': 'OGC:CRS84', 'crs_type': 'authority_code'}),
+    }))
+    metadata = None
+    if name == 'parquet':
+        metadata = {'geo': json.dumps({
+            'version': '1.1.0',
+            'primary_column': GEOMETRY_COLUMN,
+            'columns': {GEOMETRY_COLUMN: {'encoding': 'WKB', 'geometry_types': []}},
+        })}
+    return pa.schema(fields, metadata=metadata), columns
+
+
+def _record_batches(statements: List[Any], schema, columns: List[Tuple[str, str]]) -> Iterator[Any]:
+    """Lots Arrow de STREAM_BATCH_SIZE lignes"""
+    batch = []
+    for row in stream_rows(statements):
+        batch.append(row)
+        if len(batch) >= STREAM_BATCH_SIZE:
+            yield _record_batch(batch, schema, columns)
+            batch = []
+    if batch:
+        yield _record_batch(batch, schema, columns)
+
+
+def _record_batch(rows: List[Any], schema, columns: List[Tuple[str, str]]):
+    properties = [row.properties or {} for row in rows]
+    arrays = [
+        pa.array([_column_value(values.get(key), kind) for values in properties], type=schema.field(key).type)
+        for key, kind in columns
+    ]
+    arrays.append(pa.array([bytes(row.geometry) for row in rows], type=pa.binary()))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _column_value(value: Any, kind: str) -> Any:
+    if value is None:
+        return None
+    if kind == 'integer':
+        return int(value)
+    if kind == 'string' and not isinstance(value, str):
+        return json.dumps(value, default=str)
+    return value
+
+
+def _parquet_chunks(schema, batches: Iterable[Any]) -> Iterator[bytes]:
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression=PARQUET_COMPRESSION)
+    pending = []
+    rows = 0
+    for batch in batches:
+        pending.append(batch)
+        rows += batch.num_rows
+        if rows >= PARQUET_ROW_GROUP_SIZE:
+            writer.write_table(pa.Table.from_batches(pending, schema=schema))
+            pending = []
+            rows = 0
+            yield sink.drain()
+    if pending:
+        writer.write_table(pa.Table.from_batches(pending, schema=schema))
+    writer.close()
+    yield sink.drain()
+
+
+def _arrow_chunks(schema, batches: Iterable[Any]) -> Iterator[bytes]:
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(sink, schema)
+    yield sink.drain()
+    for batch in batches:
+        writer.write_batch(batch)
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def _require_pyarrow():
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("Module pyarrow requis pour les formats binaires")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Fichier en écriture seule dont le contenu est récupéré au fur et à mesure"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        """Octets écrits depuis le précédent appel"""
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
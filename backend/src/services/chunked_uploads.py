@@ -0,0 +1,326 @@
+"""
+Uploads par morceaux (reprise possible) pour ODG
+
+Un fichier volumineux est envoyé en plusieurs requêtes PUT dont le corps brut
+est écrit directement sur disque, à l'offset attendu. Chaque morceau est
+accompagné de son empreinte SHA-256 : un morceau corrompu est rejeté et
+l'offset reste inchangé. Après une coupure réseau, le client interroge
+l'offset courant et reprend à partir de celui-ci.
+
+Chaque session est un dossier contenant le fichier partiel (data.part) et
+l'état de la session (session.json). À la finalisation, le fichier assemblé
+est réservé (claim) sous le verrou de la session : il est déplacé dans un
+dossier de job (job_*) confié à l'import, et la session, marquée transmise,
+refuse tout nouvel appel à /complete (409, avec le jobId une fois connu). Si
+la file d'import est saturée, unclaim remet le fichier dans la session et
+/complete peut être rappelé sans renvoyer le fichier.
+
+Les opérations d'une session sont sérialisées par un verrou flock sur
+<session>/.lock, partagé entre les workers (gunicorn) et les threads.
+"""
+
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Optional, BinaryIO, Tuple
+
+from werkzeug.utils import secure_filename
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+    logger.info("Module fcntl non disponible - verrou des sessions d'upload limité au processus")
+
+
+class ChunkedUploadError(Exception):
+    """Erreur de protocole (offset, empreinte, taille) renvoyée au client"""
+
+    def __init__(self, message: str, status_code: int = 400, offset: Optional[int] = None,
+                 job_id: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.offset = offset
+        self.job_id = job_id
+
+
+class ChunkedUploadStore:
+    """Sessions d'upload par morceaux stockées sur disque"""
+
+    DEFAULT_MAX_FILE_SIZE = 5 * 1024 * 1024 * 1024  # 5GB
+    DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024  # 8MB, sous MAX_CONTENT_LENGTH
+    SESSION_TTL_SECONDS = 48 * 3600
+    READ_BUFFER_SIZE = 1024 * 1024
+    # Dossiers des fichiers confiés à un job d'import (supprimés par le job)
+    JOB_DIR_PREFIX = 'job_'
+
+    def __init__(self, base_dir: str, max_file_size: int = DEFAULT_MAX_FILE_SIZE,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.base_dir = base_dir
+        self.max_file_size = max_file_size
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self._session_locks: Dict[str, threading.Lock] = {}
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def create(self, filename: str, size: int, layer_config: Dict[str, Any],
+               sha256: Optional[str] = None) -> Dict[str, Any]:
+        """Ouvre une session d'upload pour un fichier de taille connue"""
+        if size <= 0:
+            raise ChunkedUploadError("Taille de fichier invalide")
+        if size > self.max_file_size:
+            raise ChunkedUploadError(
+                f"Fichier trop volumineux: {size/1024/1024:.1f}MB "
+                f"(max: {self.max_file_size/1024/1024:.0f}MB)", 413
+            )
+
+        self.purge_expired()
+
+        upload_id = uuid.uuid4().hex
+        session_dir = self._session_dir(upload_id)
+        os.makedirs(session_dir)
+        open(os.path.join(session_dir, 'data.part'), 'wb').close()
+
+        session = {
+            'uploadId': upload_id,
+            'filename': secure_filename(filename),
+            'size': size,
+            'offset': 0,
+            'sha256': sha256.lower() if sha256 else None,
+            'layerConfig': layer_config,
+            'createdAt': datetime.now().isoformat(),
+            'updatedAt': datetime.now().isoformat()
+        }
+        self._save(session)
+        logger.info(f"Session d'upload {upload_id} créée ({session['filename']}, {size} octets)")
+        return session
+
+    def get(self, upload_id: str) -> Dict[str, Any]:
+        path = os.path.join(self._session_dir(upload_id), 'session.json')
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            raise ChunkedUploadError("Session d'upload introuvable", 404)
+
+    def write_chunk(self, upload_id: str, offset: int, stream: BinaryIO,
+                    checksum: Optional[str]) -> Dict[str, Any]:
+        """Écrit un morceau à l'offset courant en le lisant par blocs depuis le flux
+
+        L'empreinte SHA-256 du morceau est obligatoire : un morceau altéré en
+        transit n'est détecté qu'à l'assemblage sinon, une fois tout le fichier
+        reçu."""
+        if not checksum:
+            raise ChunkedUploadError("Empreinte SHA-256 du morceau manquante (Content-SHA256)", 400)
+        with self._session_lock(upload_id):
+            session = self.get(upload_id)
+            if session.get('assembledSha256'):
+                raise ChunkedUploadError("Upload déjà assemblé", 409, session['offset'])
+            if offset != session['offset']:
+                raise ChunkedUploadError("Offset inattendu", 409, session['offset'])
+
+            digest = hashlib.sha256()
+            written = 0
+            part_path = os.path.join(self._session_dir(upload_id), 'data.part')
+            with open(part_path, 'r+b') as f:
+                f.seek(offset)
+                while True:
+                    block = stream.read(self.READ_BUFFER_SIZE)
+                    if not block:
+                        break
+                    written += len(block)
+                    if offset + written > session['size']:
+                        f.truncate(offset)
+                        raise ChunkedUploadError("Le morceau dépasse la taille annoncée", 413, offset)
+                    digest.update(block)
+                    f.write(block)
+
+                if digest.hexdigest() != checksum.lower():
+                    # Morceau corrompu : retour à l'offset précédent
+                    f.truncate(offset)
+                    raise ChunkedUploadError("Empreinte SHA-256 du morceau invalide", 400, offset)
+
+            session['offset'] = offset + written
+            session['updatedAt'] = datetime.now().isoformat()
+            self._save(session)
+            return session
+
+    def assemble(self, upload_id: str) -> Tuple[str, str]:
+        """Vérifie que le fichier est complet ; retourne son chemin définitif et son SHA-256
+
+        Le fichier n'est lu qu'une fois : l'empreinte, comparée à celle annoncée
+        à la création, est conservée dans la session et réutilisée si
+        l'assemblage est redemandé (nouvel appel à /complete)."""
+        with self._session_lock(upload_id):
+            session = self.get(upload_id)
+            self._check_not_claimed(session)
+            session_dir = self._session_dir(upload_id)
+            file_path = os.path.join(session_dir, session['filename'])
+            if session.get('assembledSha256'):
+                return file_path, session['assembledSha256']
+            if session['offset'] != session['size']:
+                raise ChunkedUploadError("Upload incomplet", 409, session['offset'])
+
+            part_path = os.path.join(session_dir, 'data.part')
+            digest = self._file_sha256(part_path)
+            if session.get('sha256') and digest != session['sha256']:
+                raise ChunkedUploadError("Empreinte SHA-256 du fichier invalide", 400, session['offset'])
+
+            os.replace(part_path, file_path)
+            session['assembledSha256'] = digest
+            session['updatedAt'] = datetime.now().isoformat()
+            self._save(session)
+            return file_path, digest
+
+    def claim(self, upload_id: str) -> Tuple[str, str]:
+        """Réserve le fichier assemblé pour un job d'import ; retourne (fichier, dossier du job)
+
+        Un seul appel réussit par session : les suivants lèvent une erreur 409.
+        Le dossier du job, hors de la session, est supprimé par le job."""
+        with self._session_lock(upload_id):
+            session = self.get(upload_id)
+            self._check_not_claimed(session)
+            if not session.get('assembledSha256'):
+                raise ChunkedUploadError("Upload non assemblé", 409, session['offset'])
+
+            job_dir = tempfile.mkdtemp(prefix=self.JOB_DIR_PREFIX, dir=self.base_dir)
+            job_path = os.path.join(job_dir, session['filename'])
+            os.replace(os.path.join(self._session_dir(upload_id), session['filename']), job_path)
+            session['claimed'] = True
+            session['updatedAt'] = datetime.now().isoformat()
+            self._save(session)
+            return job_path, job_dir
+
+    def unclaim(self, upload_id: str, job_path: str):
+        """Annule la réservation (job refusé) : le fichier revient dans la session"""
+        with self._session_lock(upload_id):
+            session = self.get(upload_id)
+            os.replace(job_path, os.path.join(self._session_dir(upload_id), session['filename']))
+            shutil.rmtree(os.path.dirname(job_path), ignore_errors=True)
+            session['claimed'] = False
+            session['updatedAt'] = datetime.now().isoformat()
+            self._save(session)
+
+    def record_job(self, upload_id: str, job_id: int):
+        """Associe à la session le job d'import créé (renvoyé aux appels suivants)"""
+        with self._session_lock(upload_id):
+            session = self.get(upload_id)
+            session['jobId'] = job_id
+            session['updatedAt'] = datetime.now().isoformat()
+            self._save(session)
+
+    def delete(self, upload_id: str):
+        shutil.rmtree(self._session_dir(upload_id), ignore_errors=True)
+        with self._lock:
+            self._session_locks.pop(upload_id, None)
+
+    def session_dir(self, upload_id: str) -> str:
+        return self._session_dir(upload_id)
+
+    def purge_expired(self):
+        """Supprime les dossiers de session inactifs depuis plus de SESSION_TTL_SECONDS
+
+        L'activité est lue sur le dossier lui-même (chaque écriture de
+        session.json y crée un fichier), de sorte qu'un dossier sans
+        session.json, abandonné après un échec, est également supprimé. Les
+        dossiers de job laissés par un processus interrompu le sont aussi."""
+        now = time.time()
+        for name in os.listdir(self.base_dir):
+            path = os.path.join(self.base_dir, name)
+            try:
+                if now - os.path.getmtime(path) <= self.SESSION_TTL_SECONDS:
+                    continue
+                if name.startswith(self.JOB_DIR_PREFIX):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    logger.info(f"Session d'upload {name} expirée")
+                    self.delete(name)
+            except (OSError, ChunkedUploadError):
+                continue
+
+    @staticmethod
+    def _check_not_claimed(session: Dict[str, Any]):
+        if session.get('claimed'):
+            raise ChunkedUploadError(
+                "Upload déjà transmis à l'import", 409, session['offset'], session.get('jobId')
+            )
+
+    def _session_dir(self, upload_id: str) -> str:
+        # L'identifiant vient de l'URL : seul un uuid hexadécimal est accepté
+        if len(upload_id) != 32 or not all(c in '0123456789abcdef' for c in upload_id):
+            raise ChunkedUploadError("Session d'upload introuvable", 404)
+        return os.path.join(self.base_dir, upload_id)
+
+    @contextmanager
+    def _session_lock(self, upload_id: str):
+        """Verrou exclusif de la session, partagé entre processus (flock)"""
+        session_dir = self._session_dir(upload_id)
+        if not FCNTL_AVAILABLE:
+            with self._lock:
+                lock = self._session_locks.setdefault(upload_id, threading.Lock())
+            with lock:
+                yield
+            return
+
+        try:
+            fd = os.open(os.path.join(session_dir, '.lock'), os.O_RDWR | os.O_CREAT, 0o600)
+        except FileNotFoundError:
+            raise ChunkedUploadError("Session d'upload introuvable", 404)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def _save(self, session: Dict[str, Any]):
+        session_dir = self._session_dir(session['uploadId'])
+        fd, tmp_path = tempfile.mkstemp(dir=session_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(session, f)
+        os.replace(tmp_path, os.path.join(session_dir, 'session.json'))
+
+    @classmethod
+    def _file_sha256(cls, path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(cls.READ_BUFFER_SIZE), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+
+# Instance singleton des sessions d'upload par morceaux
+_chunked_upload_store: Optional[ChunkedUploadStore] = None
+_chunked_upload_store_lock = threading.Lock()
+
+
+def get_chunked_upload_store(config: Optional[Dict[str, Any]] = None) -> ChunkedUploadStore:
+    """Retourne l'instance singleton des sessions d'upload par morceaux.
+
+    L'emplacement, la taille maximale des fichiers et la taille de morceau
+    conseillée sont lus dans la configuration Flask (CHUNKED_UPLOAD_DIR,
+    CHUNKED_UPLOAD_MAX_SIZE_MB, CHUNKED_UPLOAD_CHUNK_SIZE_MB)."""
+    global _chunked_upload_store
+    if _chunked_upload_store is None:
+        with _chunked_upload_store_lock:
+            if _chunked_upload_store is None:
+                config = config or {}
+                base_dir = config.get('CHUNKED_UPLOAD_DIR') or os.path.join(tempfile.gettempdir(), 'odg_chunked_uploads')
+                max_mb = config.get('CHUNKED_UPLOAD_MAX_SIZE_MB', ChunkedUploadStore.DEFAULT_MAX_FILE_SIZE // (1024 * 1024))
+                chunk_mb = config.get('CHUNKED_UPLOAD_CHUNK_SIZE_MB', ChunkedUploadStore.DEFAULT_CHUNK_SIZE // (1024 * 1024))
+                _chunked_upload_store = ChunkedUploadStore(
+                    base_dir,
+                    max_file_size=int(max_mb) * 1024 * 1024,
+                    chunk_size=int(chunk_mb) * 1024 * 1024
+                )
+    return _chunked_upload_store
@@ -0,0 +1,183 @@
+"""
+Chargement des features géospatiales dans PostGIS
+
+Deux stratégies d'insertion dans geospatial_features :
+- 'insert' : un INSERT ... SELECT FROM unnest(...) par lot (WKB + attributs JSON)
+- 'copy'   : COPY ... FROM STDIN (CSV) avec la géométrie en EWKB hexadécimal,
+             directement dans la table ou via une table de staging temporaire
+
+Le COPY évite l'analyse SQL et la construction de paramètres pour chaque
+ligne ; il est utilisé automatiquement pour les gros imports.
+"""
+
+import io
+import csv
+import logging
+from contextlib import nullcontext
+from typing import List
+
+import geopandas as gpd
+import shapely
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+FEATURE_COLUMNS = (
+    'layer_id', 'feature_index', 'geometry_type', 'geom', 'properties',
+    'min_x', 'min_y', 'max_x', 'max_y'
+)
+
+
+def feature_properties_json(batch: gpd.GeoDataFrame) -> List[str]:
+    """Attributs de chaque feature du lot, sérialisés en JSON (une chaîne par feature)
+
+    Le résultat compte toujours une entrée par feature : un lot sans colonne
+    attributaire (GeoJSON aux properties vides ou nulles) donne des objets vides."""
+    properties = batch.drop(columns=batch.geometry.name)
+    if properties.columns.empty:
+        return ['{}'] * len(batch)
+    properties_json = properties.to_json(
+        orient='records', lines=True, date_format='iso', default_handler=str
+    )
+    return [line for line in properties_json.split('\n') if line]
+
+
+def copy_csv(layer_id: int, batch: gpd.GeoDataFrame, offset: int) -> io.StringIO:
+    """Lignes CSV du COPY d'un lot (une par feature), tampon rembobiné"""
+    geoms = shapely.set_srid(batch.geometry.to_numpy(), 4326)
+    ewkb = shapely.to_wkb(geoms, hex=True, include_srid=True)
+    bounds = shapely.bounds(geoms)
+    geometry_types = batch.geometry.geom_type.str.upper().tolist()
+    properties = feature_properties_json(batch)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerows(
+        (layer_id, offset + i, geometry_types[i], ewkb[i], properties[i], *bounds[i])
+        for i in range(len(batch))
+    )
+    buffer.seek(0)
+    return buffer
+
+
+class FeatureBatchLoader:
+    """Insère des lots de features dans geospatial_features"""
+
+    METHODS = ('insert', 'copy')
+    STAGING_TABLE = 'geospatial_features_staging'
+
+    def __init__(self, session, method: str = 'insert', use_staging: bool = False, profiler=None):
+        if method not in self.METHODS:
+            raise ValueError(f"Méthode de chargement inconnue: {method}")
+        if method == 'copy' and not self.supports_copy(session):
+            logger.warning("COPY non disponible sur cette connexion, utilisation de INSERT")
+            method = 'insert'
+        self.session = session
+        self.method = method
+        self.use_staging = use_staging
+        # ImportProfiler optionnel : étapes 'geometry_build' et 'db_insert'
+        self.profiler = profiler
+        self._staging_ready = False
+
+    @staticmethod
+    def supports_copy(session) -> bool:
+        """COPY FROM STDIN nécessite PostgreSQL via psycopg2"""
+        bind = session.get_bind()
+        return bind.dialect.name == 'postgresql' and bind.dialect.driver == 'psycopg2'
+
+    def load(self, layer_id: int, batch: gpd.GeoDataFrame, offset: int):
+        """Insère un lot ; offset est l'index de la première feature du lot"""
+        if self.method == 'copy':
+            self._copy_batch(layer_id, batch, offset)
+        else:
+            self._insert_batch(layer_id, batch, offset)
+
+    def _insert_batch(self, layer_id: int, batch: gpd.GeoDataFrame, offset: int):
+        """Un INSERT par lot, géométries et attributs passés en tableaux"""
+        with self._stage('geometry_build'):
+            params = {
+                'layer_id': layer_id,
+                'indexes': list(range(offset, offset + len(batch))),
+                'wkbs': shapely.to_wkb(batch.geometry.to_numpy()).tolist(),
+                'properties': feature_properties_json(batch)
+            }
+        with self._stage('db_insert'):
+            self._execute_insert(params)
+
+    def _execute_insert(self, params):
+        self.session.execute(
+            text("""
+                INSERT INTO geospatial_features
+                    (layer_id, feature_index, geometry_type, geom, properties,
+                     min_x, min_y, max_x, max_y)
+                SELECT :layer_id, f.idx, GeometryType(f.g), f.g, CAST(f.p AS jsonb),
+                       ST_XMin(f.g), ST_YMin(f.g), ST_XMax(f.g), ST_YMax(f.g)
+                FROM (
+                    SELECT t.idx, ST_GeomFromWKB(t.w, 4326) AS g, t.p
+                    FROM unnest(
+                        CAST(:indexes AS integer[]),
+                        CAST(:wkbs AS bytea[]),
+                        CAST(:properties AS text[])
+                    ) AS t(idx, w, p)
+                ) AS f
+            """),
+            params
+        )
+
+    def _copy_batch(self, layer_id: int, batch: gpd.GeoDataFrame, offset: int):
+        """COPY CSV d'un lot : EWKB hexadécimal, type et emprise calculés côté Python"""
+        with self._stage('geometry_build'):
+            buffer = copy_csv(layer_id, batch, offset)
+
+        with self._stage('db_insert'):
+            self._copy_buffer(buffer, len(batch))
+
+    def _copy_buffer(self, buffer: io.StringIO, expected_rows: int):
+        """COPY du tampon CSV ; RuntimeError si le nombre de lignes insérées diffère"""
+        cursor = self._dbapi_connection().cursor()
+        try:
+            if self.use_staging:
+                self._ensure_staging_table(cursor)
+                cursor.copy_expert(
+                    f"COPY {self.STAGING_TABLE} ({', '.join(FEATURE_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                    buffer
+                )
+                # Le type et l'emprise sont recalculés par PostGIS lors du transfert
+                cursor.execute(f"""
+                    INSERT INTO geospatial_features
+                        (layer_id, feature_index, geometry_type, geom, properties,
+                         min_x, min_y, max_x, max_y)
+                    SELECT s.layer_id, s.feature_index, GeometryType(s.geom), s.geom, s.properties,
+                           ST_XMin(s.geom), ST_YMin(s.geom), ST_XMax(s.geom), ST_YMax(s.geom)
+                    FROM {self.STAGING_TABLE} s
+                """)
+                rowcount = cursor.rowcount
+                cursor.execute(f"TRUNCATE {self.STAGING_TABLE}")
+            else:
+                cursor.copy_expert(
+                    f"COPY geospatial_features ({', '.join(FEATURE_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                    buffer
+                )
+                rowcount = cursor.rowcount
+        finally:
+            cursor.close()
+        if rowcount != expected_rows:
+            raise RuntimeError(f"COPY incomplet: {rowcount} features insérées sur {expected_rows}")
+
+    def _ensure_staging_table(self, cursor):
+        """Table temporaire non journalisée, supprimée à la fin de la transaction"""
+        if self._staging_ready:
+            return
+        cursor.execute(f"""
+            CREATE TEMP TABLE IF NOT EXISTS {self.STAGING_TABLE} (
+                LIKE geospatial_features INCLUDING DEFAULTS
+            ) ON COMMIT DROP
+        """)
+        self._staging_ready = True
+
+    def _stage(self, name: str):
+        return self.profiler.stage(name) if self.profiler is not None else nullcontext()
+
+    def _dbapi_connection(self):
+        """Connexion psycopg2 de la transaction courante de la session"""
+        return self.session.connection().connection.dbapi_connection
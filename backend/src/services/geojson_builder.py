@@ -0,0 +1,369 @@
+"""
+Construction des GeoJSON dans PostGIS pour ODG
+
+Les Features sont produites directement en texte JSON par PostGIS
+(ST_AsGeoJSON, json_build_object, json_agg) : aucune géométrie n'est
+décodée en Python et le texte est transmis tel quel au client. Les
+FeatureCollections volumineuses sont lues par blocs (curseur serveur) et
+envoyées au fil de l'eau.
+
+Les mêmes sélections existent en lignes (géométrie WKB, propriétés JSONB)
+pour les encodeurs binaires (FlatGeobuf, GeoParquet, Arrow).
+"""
+
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+from sqlalchemy import select, func, cast, case, null, not_, or_, Numeric, Text
+from sqlalchemy.dialects.postgresql import JSON, JSONB, aggregate_order_by
+
+from src.models.geospatial_layers import GeospatialLayer, GeospatialFeature, db
+from src.services.geometry_simplification import zoom_band, band_geometry, zoom_tolerance
+from src.services.json_streaming import iter_json_object
+
+# Lignes lues par aller-retour avec le curseur serveur
+STREAM_BATCH_SIZE = 1000
+
+
+def display_geometry(model, envelope=None, clip: bool = False, zoom: Optional[int] = None):
+    """Expression SQL de la géométrie affichée : simplifiée pour le zoom, découpée à l'emprise
+
+    Les zooms couverts par une bande lisent la version précalculée ; au-delà,
+    la géométrie complète est simplifiée à la volée."""
+    if zoom_band(zoom) is not None:
+        geom = band_geometry(model, zoom)
+    elif zoom is not None:
+        geom = func.ST_SimplifyPreserveTopology(model.geom, zoom_tolerance(zoom))
+    else:
+        geom = model.geom
+    if clip and envelope is not None:
+        geom = func.ST_ClipByBox2D(geom, envelope)
+    return geom
+
+
+def layer_features_json(layer_ids: List[int], precision: Optional[int] = None,
+                        fields: Optional[List[str]] = None) -> Dict[int, str]:
+    """Feature GeoJSON (géométrie agrégée) de chaque couche, en texte"""
+    if not layer_ids:
+        return {}
+    stmt = _layer_feature_statement(
+        GeospatialLayer.query.filter(GeospatialLayer.id.in_(layer_ids)), precision=precision, fields=fields
+    )
+    return dict(db.session.execute(stmt).all())
+
+
+def feature_collections_json(layer_ids: List[int], precision: Optional[int] = None,
+                             fields: Optional[List[str]] = None) -> Dict[int, str]:
+    """FeatureCollection (une Feature par géométrie importée) de chaque couche, en texte.
+
+    Une seule requête json_agg par appel ; les couches antérieures au
+    stockage par feature sont représentées par leur géométrie agrégée."""
+    if not layer_ids:
+        return {}
+    feature = _feature_object(
+        GeospatialFeature,
+        GeospatialFeature.geom,
+        _feature_properties(GeospatialFeature),
+        precision, fields
+    )
+    stmt = (
+        select(
+            GeospatialFeature.layer_id,
+            cast(func.json_build_object(
+                'type', 'FeatureCollection',
+                'features', func.json_agg(aggregate_order_by(feature, GeospatialFeature.feature_index))
+            ), Text)
+        )
+        .where(GeospatialFeature.layer_id.in_(layer_ids))
+        .group_by(GeospatialFeature.layer_id)
+    )
+    collections = dict(db.session.execute(stmt).all())
+
+    legacy_ids = [layer_id for layer_id in layer_ids if layer_id not in collections]
+    for layer_id, feature_text in layer_features_json(legacy_ids, precision, fields).items():
+        collections[layer_id] = '{"type": "FeatureCollection", "features": [' + feature_text + ']}'
+    for layer_id in legacy_ids:
+        collections.setdefault(layer_id, '{"type": "FeatureCollection", "features": []}')
+    return collections
+
+
+def iter_collection_features(layer_id: int, precision: Optional[int] = None,
+                             fields: Optional[List[str]] = None) -> Iterator[str]:
+    """Features d'une couche pour son export (mêmes propriétés que feature_collections_json)"""
+    feature = _feature_object(
+        GeospatialFeature,
+        GeospatialFeature.geom,
+        _feature_properties(GeospatialFeature),
+        precision, fields
+    )
+    stmt = (
+        select(GeospatialFeature.id, cast(feature, Text))
+        .where(GeospatialFeature.layer_id == layer_id)
+        .order_by(GeospatialFeature.feature_index)
+    )
+    empty = True
+    for _, feature_text in _stream(stmt):
+        empty = False
+        yield feature_text
+
+    # Couche antérieure au stockage par feature : géométrie agrégée
+    if empty:
+        yield from layer_features_json([layer_id], precision, fields).values()
+
+
+def iter_layer_features(layer_query, envelope=None, clip: bool = False, zoom: Optional[int] = None,
+                        precision: Optional[int] = None, fields: Optional[List[str]] = None) -> Iterator[str]:
+    """Features GeoJSON (une par couche) des couches sélectionnées, en texte"""
+    stmt = _layer_feature_statement(layer_query, envelope, clip, zoom, precision=precision, fields=fields)
+    for _, feature_text in _stream(stmt):
+        yield feature_text
+
+
+def iter_features(layer_query, envelope=None, clip: bool = False, zoom: Optional[int] = None,
+                  precision: Optional[int] = None, fields: Optional[List[str]] = None) -> Iterator[str]:
+    """Features individuelles des couches sélectionnées, en texte
+
+    Les propriétés de la couche (layerId, layerName, layerType, status,
+    styleConfig) sont fusionnées avec les attributs d'origine. En présence
+    d'un niveau de zoom, les géométries plus petites qu'un pixel sont omises,
+    à l'exception des points."""
+    inner, properties = _features_source(layer_query, envelope, clip, zoom)
+    stmt = (
+        select(inner.c.layer_id, cast(_feature_object(inner.c, inner.c.geom, properties, precision, fields), Text))
+        .where(not_(func.ST_IsEmpty(inner.c.geom)))
+        .order_by(inner.c.layer_id, inner.c.feature_index)
+    )
+    for _, feature_text in _stream(stmt):
+        yield feature_text
+
+    # Couches antérieures au stockage par feature : géométrie agrégée
+    legacy_query = layer_query.filter(~GeospatialLayer.features.any())
+    stmt = _layer_feature_statement(
+        legacy_query, envelope, clip, zoom, with_summary=True, precision=precision, fields=fields
+    )
+    for _, feature_text in _stream(stmt):
+        yield feature_text
+
+
+def collection_row_statements(layer_id: int, fields: Optional[List[str]] = None) -> List[Any]:
+    """Requêtes (geometry en WKB, properties) des features d'une couche, comme iter_collection_features"""
+    stmt = (
+        select(
+            func.ST_AsBinary(GeospatialFeature.geom).label('geometry'),
+            _select_fields(_feature_properties(GeospatialFeature), fields).label('properties')
+        )
+        .where(GeospatialFeature.layer_id == layer_id)
+        .order_by(GeospatialFeature.feature_index)
+    )
+    legacy_query = GeospatialLayer.query.filter(
+        GeospatialLayer.id == layer_id, ~GeospatialLayer.features.any()
+    )
+    return [stmt, _layer_row_statement(legacy_query, fields=fields)]
+
+
+def layer_row_statements(layer_query, envelope=None, clip: bool = False, zoom: Optional[int] = None,
+                         fields: Optional[List[str]] = None) -> List[Any]:
+    """Requêtes (geometry en WKB, properties) des couches sélectionnées, comme iter_layer_features"""
+    return [_layer_row_statement(layer_query, envelope, clip, zoom, fields=fields)]
+
+
+def feature_row_statements(layer_query, envelope=None, clip: bool = False, zoom: Optional[int] = None,
+                           fields: Optional[List[str]] = None) -> List[Any]:
+    """Requêtes (geometry en WKB, properties) des features sélectionnées, comme iter_features"""
+    inner, properties = _features_source(layer_query, envelope, clip, zoom)
+    stmt = (
+        select(
+            func.ST_AsBinary(inner.c.geom).label('geometry'),
+            _select_fields(properties, fields).label('properties')
+        )
+        .where(not_(func.ST_IsEmpty(inner.c.geom)))
+        .order_by(inner.c.layer_id, inner.c.feature_index)
+    )
+    legacy_query = layer_query.filter(~GeospatialLayer.features.any())
+    return [stmt, _layer_row_statement(legacy_query, envelope, clip, zoom, with_summary=True, fields=fields)]
+
+
+def stream_rows(statements: Iterable[Any]) -> Iterator[Any]:
+    """Lignes successives de plusieurs requêtes, lues par blocs"""
+    for stmt in statements:
+        yield from _stream(stmt)
+
+
+def stream_feature_collection(features: Iterable[str], metadata: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+    """FeatureCollection envoyée par morceaux ; metadata.total_features est ajouté à la fin"""
+    return iter_json_object(
+        {'type': 'FeatureCollection'}, 'features', features,
+        tail=lambda count: {'metadata': {**(metadata or {}), 'total_features': count}},
+        raw=True
+    )
+
+
+def _features_source(layer_query, envelope=None, clip: bool = False, zoom: Optional[int] = None):
+    """(sous-requête, propriétés) des features individuelles des couches sélectionnées"""
+    layers = layer_query.with_entities(
+        GeospatialLayer.id,
+        GeospatialLayer.name,
+        GeospatialLayer.layer_type,
+        GeospatialLayer.status,
+        GeospatialLayer.style_config
+    ).subquery()
+
+    inner = (
+        select(
+            GeospatialFeature.id,
+            GeospatialFeature.layer_id,
+            GeospatialFeature.feature_index,
+            GeospatialFeature.properties,
+            GeospatialFeature.min_x,
+            GeospatialFeature.min_y,
+            GeospatialFeature.max_x,
+            GeospatialFeature.max_y,
+            display_geometry(GeospatialFeature, envelope, clip, zoom).label('geom'),
+            _layer_summary(layers.c).label('layer_properties')
+        )
+        .join(layers, layers.c.id == GeospatialFeature.layer_id)
+    )
+    if envelope is not None:
+        inner = inner.where(
+            GeospatialFeature.geom.intersects(envelope),
+            func.ST_Intersects(GeospatialFeature.geom, envelope)
+        )
+    if zoom is not None:
+        tolerance = zoom_tolerance(zoom)
+        inner = inner.where(or_(
+            GeospatialFeature.geometry_type.in_(['POINT', 'MULTIPOINT']),
+            GeospatialFeature.max_x - GeospatialFeature.min_x >= tolerance,
+            GeospatialFeature.max_y - GeospatialFeature.min_y >= tolerance
+        ))
+    inner = inner.subquery()
+
+    properties = inner.c.layer_properties.op('||', return_type=JSONB)(_feature_properties(inner.c))
+    return inner, properties
+
+
+def _layer_feature_statement(layer_query, envelope=None, clip: bool = False, zoom: Optional[int] = None,
+                             with_summary: bool = False, precision: Optional[int] = None,
+                             fields: Optional[List[str]] = None):
+    """(id, Feature en texte) des couches d'une requête, géométries vides exclues"""
+    c, properties = _layer_source(layer_query, envelope, clip, zoom, with_summary)
+    feature = func.json_build_object(
+        'type', 'Feature',
+        'id', c.id,
+        'geometry', _geometry_json(c.geom, precision),
+        'properties', _select_fields(properties, fields)
+    )
+    return (
+        select(c.id, cast(feature, Text))
+        .where(c.geom.isnot(None), not_(func.ST_IsEmpty(c.geom)))
+        .order_by(c.id)
+    )
+
+
+def _layer_row_statement(layer_query, envelope=None, clip: bool = False, zoom: Optional[int] = None,
+                         with_summary: bool = False, fields: Optional[List[str]] = None):
+    """(geometry en WKB, properties) des couches d'une requête, géométries vides exclues"""
+    c, properties = _layer_source(layer_query, envelope, clip, zoom, with_summary)
+    return (
+        select(
+            func.ST_AsBinary(c.geom).label('geometry'),
+            _select_fields(properties, fields).label('properties')
+        )
+        .where(c.geom.isnot(None), not_(func.ST_IsEmpty(c.geom)))
+        .order_by(c.id)
+    )
+
+
+def _layer_source(layer_query, envelope=None, clip: bool = False, zoom: Optional[int] = None,
+                  with_summary: bool = False):
+    """(colonnes, propriétés) des couches d'une requête, géométrie affichée comprise"""
+    inner = layer_query.with_entities(
+        GeospatialLayer.id,
+        GeospatialLayer.name,
+        GeospatialLayer.description,
+        GeospatialLayer.layer_type,
+        GeospatialLayer.geometry_type,
+        GeospatialLayer.status,
+        GeospatialLayer.style_config,
+        GeospatialLayer.layer_metadata,
+        GeospatialLayer.area_km2,
+        GeospatialLayer.length_km,
+        GeospatialLayer.point_count,
+        display_geometry(GeospatialLayer, envelope, clip, zoom).label('geom')
+    ).order_by(None).subquery()
+    c = inner.c
+
+    # Mêmes propriétés que GeospatialLayer.to_geojson_feature
+    properties = func.jsonb_build_object(
+        'id', c.id,
+        'name', c.name,
+        'description', c.description,
+        'layerType', c.layer_type,
+        'geometryType', c.geometry_type,
+        'status', c.status,
+        'styleConfig', c.style_config,
+        'metadata', c.layer_metadata,
+        'areaKm2', c.area_km2,
+        'lengthKm', c.length_km,
+        'pointCount', c.point_count
+    )
+    if with_summary:
+        properties = _layer_summary(c).op('||', return_type=JSONB)(properties)
+    return c, properties
+
+
+def _layer_summary(c):
+    """Propriétés de couche ajoutées à chaque feature de /geojson"""
+    return func.jsonb_build_object(
+        'layerId', c.id,
+        'layerName', c.name,
+        'layerType', c.layer_type,
+        'status', c.status,
+        'styleConfig', c.style_config
+    )
+
+
+def _feature_properties(c):
+    """Mêmes propriétés que GeospatialFeature.to_geojson_feature"""
+    return c.properties.op('||', return_type=JSONB)(func.jsonb_build_object(
+        'layerId', c.layer_id,
+        'featureIndex', c.feature_index
+    ))
+
+
+def _feature_object(c, geom, properties, precision: Optional[int] = None, fields: Optional[List[str]] = None):
+    extent = [c.min_x, c.min_y, c.max_x, c.max_y]
+    if precision is not None:
+        extent = [func.round(cast(value, Numeric), precision) for value in extent]
+    bbox = case(
+        (c.min_x.is_(None), null()),
+        else_=func.json_build_array(*extent)
+    )
+    return func.json_build_object(
+        'type', 'Feature',
+        'id', c.id,
+        'bbox', bbox,
+        'geometry', _geometry_json(geom, precision),
+        'properties', _select_fields(properties, fields)
+    )
+
+
+def _geometry_json(geom, precision: Optional[int] = None):
+    """Géométrie GeoJSON, coordonnées arrondies à precision décimales si précisé"""
+    if precision is None:
+        return cast(func.ST_AsGeoJSON(geom), JSON)
+    return cast(func.ST_AsGeoJSON(geom, precision), JSON)
+
+
+def _select_fields(properties, fields: Optional[List[str]] = None):
+    """Restreint les propriétés JSONB aux clés demandées (toutes si fields est None)"""
+    if fields is None:
+        return properties
+    entries = func.jsonb_each(properties).table_valued('key', 'value').render_derived()
+    selected = select(func.jsonb_object_agg(entries.c.key, entries.c.value)).where(
+        entries.c.key.in_(fields)
+    ).scalar_subquery()
+    return func.coalesce(selected, cast('{}', JSONB))
+
+
+def _stream(stmt):
+    """Lignes d'une requête lues par blocs via un curseur serveur"""
+    return db.session.execute(stmt.execution_options(yield_per=STREAM_BATCH_SIZE))
@@ -0,0 +1,67 @@
+"""
+Options de sortie GeoJSON communes aux endpoints cartographiques
+
+- precision : nombre de décimales des coordonnées (arrondi côté serveur,
+  ST_AsGeoJSON(geom, precision) pour les GeoJSON construits par PostGIS)
+- fields : propriétés à conserver ("name,status"), toutes par défaut
+
+Six décimales correspondent à environ 10 cm à l'équateur, bien au-delà de
+la résolution d'un écran même au zoom maximal.
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+
+MAX_PRECISION = 15
+
+
+def parse_precision(value: Optional[str]) -> Optional[int]:
+    """Nombre de décimales des coordonnées (0 à MAX_PRECISION), ou None"""
+    if value is None or value == '':
+        return None
+    try:
+        precision = int(value)
+    except ValueError:
+        raise ValueError("precision invalide: entier attendu")
+    if not 0 <= precision <= MAX_PRECISION:
+        raise ValueError(f"precision invalide: attendu entre 0 et {MAX_PRECISION}")
+    return precision
+
+
+def parse_fields(value: Optional[str]) -> Optional[List[str]]:
+    """Liste des propriétés demandées ("name,status"), ou None pour toutes"""
+    if value is None:
+        return None
+    return [field.strip() for field in value.split(',') if field.strip()]
+
+
+def parse_output_options(args) -> Tuple[Optional[int], Optional[List[str]]]:
+    """(precision, fields) lus dans les paramètres de requête ; ValueError si invalides"""
+    return parse_precision(args.get('precision')), parse_fields(args.get('fields'))
+
+
+def apply_output_options(feature: Optional[Dict[str, Any]], precision: Optional[int] = None,
+                         fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    """Applique precision et fields à une Feature GeoJSON construite en Python"""
+    if feature is None:
+        return None
+    if precision is not None:
+        if feature.get('geometry'):
+            feature['geometry'] = {
+                **feature['geometry'],
+                'coordinates': round_coordinates(feature['geometry'].get('coordinates'), precision)
+            }
+        if feature.get('bbox'):
+            feature['bbox'] = [round(value, precision) for value in feature['bbox']]
+    if fields is not None:
+        properties = feature.get('properties') or {}
+        feature['properties'] = {name: properties[name] for name in fields if name in properties}
+    return feature
+
+
+def round_coordinates(coordinates, precision: int):
+    """Arrondit des coordonnées GeoJSON imbriquées (position, anneau, polygone...)"""
+    if coordinates is None:
+        return None
+    if coordinates and isinstance(coordinates[0], (int, float)):
+        return [round(value, precision) for value in coordinates]
+    return [round_coordinates(part, precision) for part in coordinates]
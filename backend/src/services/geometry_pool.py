@@ -0,0 +1,163 @@
+"""
+Pool de processus pour les étapes CPU de l'import géospatial
+
+La reprojection, la vérification de validité et la réparation des géométries
+monopolisent le GIL : exécutées dans le thread d'import, elles ralentissent
+toutes les requêtes servies par le même processus. Elles sont déléguées à
+un pool de processus ; seules les géométries transitent, encodées en WKB
+(tableaux de bytes), jamais le GeoDataFrame et ses attributs.
+"""
+
+import os
+import logging
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future
+from typing import Dict, Any, Optional, Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+from src.services.geometry_repair import standardize_geodataframe, empty_repair_stats, merge_repair_stats
+
+logger = logging.getLogger(__name__)
+
+
+def standardize_wkb(wkb: np.ndarray, crs: Optional[str]):
+    """Standardise des géométries WKB (WGS84, réparation).
+
+    Retourne les positions conservées, leurs géométries en WKB, les
+    compteurs de réparation et la durée des étapes. Fonction de module pour
+    pouvoir être exécutée dans un ProcessPoolExecutor."""
+    timings: Dict[str, float] = {}
+    geoms = shapely.from_wkb(wkb)
+    gdf = gpd.GeoDataFrame({'position': np.arange(len(geoms))}, geometry=geoms, crs=crs)
+    gdf, stats = standardize_geodataframe(gdf, timings)
+    return gdf['position'].to_numpy(), shapely.to_wkb(gdf.geometry.to_numpy()), stats, timings
+
+
+class GeometryProcessPool:
+    """Standardisation des géométries dans un pool de processus"""
+
+    DEFAULT_MAX_WORKERS = min(4, os.cpu_count() or 1)
+    # En dessous, le coût de sérialisation dépasse le gain : traitement sur place
+    MIN_POOL_FEATURES = 2000
+    CHUNK_FEATURES = 20000
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS):
+        self.max_workers = max(0, max_workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 0
+
+    def standardize(self, gdf: gpd.GeoDataFrame) -> Tuple[gpd.GeoDataFrame, Dict[str, int], Dict[str, float]]:
+        """Standardise un GeoDataFrame, découpé en CHUNK_FEATURES géométries par tâche.
+
+        Retourne le GeoDataFrame, les compteurs de réparation et la durée
+        cumulée des étapes ('reproject', 'repair')."""
+        if not self.enabled or len(gdf) < self.MIN_POOL_FEATURES:
+            return self._standardize_inline(gdf)
+
+        chunks = [gdf.iloc[start:start + self.CHUNK_FEATURES] for start in range(0, len(gdf), self.CHUNK_FEATURES)]
+        futures = [self._submit(chunk) for chunk in chunks]
+        stats = empty_repair_stats()
+        timings: Dict[str, float] = {}
+        parts = []
+        for chunk, future in zip(chunks, futures):
+            part, chunk_stats, chunk_timings = self._apply(chunk, future.result())
+            merge_repair_stats(stats, chunk_stats)
+            _merge_timings(timings, chunk_timings)
+            parts.append(part)
+
+        if len(parts) == 1:
+            return parts[0], stats, timings
+        return gpd.GeoDataFrame(pd.concat(parts), geometry=gdf.geometry.name, crs='EPSG:4326'), stats, timings
+
+    def standardize_batches(self, batches: Iterator[gpd.GeoDataFrame]) -> Iterator[Tuple[gpd.GeoDataFrame, Dict[str, int], Dict[str, float]]]:
+        """Standardise un flux de lots, dans l'ordre (mêmes résultats que standardize).
+
+        Jusqu'à deux lots par worker sont en cours de traitement pendant que
+        le lot suivant est lu et que le précédent est inséré."""
+        pending: deque = deque()
+        for batch in batches:
+            if batch is None or batch.empty:
+                continue
+            if not self.enabled:
+                yield self._standardize_inline(batch)
+                continue
+            pending.append((batch, self._submit(batch)))
+            if len(pending) >= self.max_workers * 2:
+                batch, future = pending.popleft()
+                yield self._apply(batch, future.result())
+
+        while pending:
+            batch, future = pending.popleft()
+            yield self._apply(batch, future.result())
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def _submit(self, gdf: gpd.GeoDataFrame) -> Future:
+        crs = gdf.crs.to_wkt() if gdf.crs else None
+        return self._get_executor().submit(standardize_wkb, shapely.to_wkb(gdf.geometry.to_numpy()), crs)
+
+    @staticmethod
+    def _standardize_inline(gdf: gpd.GeoDataFrame):
+        timings: Dict[str, float] = {}
+        gdf, stats = standardize_geodataframe(gdf, timings)
+        return gdf, stats, timings
+
+    @staticmethod
+    def _apply(gdf: gpd.GeoDataFrame, result):
+        """Reconstruit le GeoDataFrame à partir du résultat d'un worker"""
+        positions, wkb, stats, timings = result
+        gdf = gdf.iloc[positions] if len(positions) != len(gdf) else gdf.copy()
+        gdf[gdf.geometry.name] = gpd.GeoSeries(shapely.from_wkb(wkb), index=gdf.index, crs='EPSG:4326')
+        return gdf, stats, timings
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # 'spawn' : les workers ne doivent pas hériter des connexions base de données
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                logger.info(f"Pool de processus géométrique démarré ({self.max_workers} workers)")
+            return self._executor
+
+
+def _merge_timings(total: Dict[str, float], timings: Dict[str, float]):
+    for stage, seconds in timings.items():
+        total[stage] = total.get(stage, 0.0) + seconds
+
+
+# Instance singleton du pool géométrique
+_geometry_pool: Optional[GeometryProcessPool] = None
+_geometry_pool_lock = threading.Lock()
+
+
+def get_geometry_pool(config: Optional[Dict[str, Any]] = None) -> GeometryProcessPool:
+    """Retourne l'instance singleton du pool géométrique.
+
+    Le nombre de processus est lu dans la configuration Flask
+    (GEOMETRY_POOL_MAX_WORKERS, 0 pour traiter sur place)."""
+    global _geometry_pool
+    if _geometry_pool is None:
+        with _geometry_pool_lock:
+            if _geometry_pool is None:
+                if config is None:
+                    from flask import current_app, has_app_context
+                    config = current_app.config if has_app_context() else {}
+                max_workers = config.get('GEOMETRY_POOL_MAX_WORKERS', GeometryProcessPool.DEFAULT_MAX_WORKERS)
+                _geometry_pool = GeometryProcessPool(max_workers=int(max_workers))
+    return _geometry_pool
@@ -0,0 +1,94 @@
+"""
+Standardisation et réparation vectorisée des géométries importées
+
+Les géométries invalides sont corrigées avec shapely.make_valid plutôt que
+supprimées. Une géométrie n'est écartée que si la réparation ne laisse rien
+de la dimension d'origine (ex: polygone réduit à une ligne).
+
+Fonctions sans état, utilisables dans les processus de parsing parallèles.
+"""
+
+import time
+from typing import Dict, Tuple, Optional
+
+import numpy as np
+import geopandas as gpd
+import shapely
+
+# Identifiant shapely du type GeometryCollection
+GEOMETRYCOLLECTION_TYPE_ID = 7
+
+
+def empty_repair_stats() -> Dict[str, int]:
+    """Compteurs de réparation : réparées, supprimées (irréparables) et vides"""
+    return {'repaired': 0, 'dropped': 0, 'empty': 0}
+
+
+def merge_repair_stats(total: Dict[str, int], stats: Dict[str, int]) -> Dict[str, int]:
+    for key, value in stats.items():
+        total[key] = total.get(key, 0) + int(value)
+    return total
+
+
+def standardize_geodataframe(gdf: gpd.GeoDataFrame,
+                             timings: Optional[Dict[str, float]] = None) -> Tuple[gpd.GeoDataFrame, Dict[str, int]]:
+    """Reprojection en WGS84 puis réparation des géométries
+
+    timings, s'il est fourni, reçoit la durée des étapes 'reproject' et 'repair'."""
+    start = time.perf_counter()
+    if gdf.crs and gdf.crs != 'EPSG:4326':
+        gdf = gdf.to_crs('EPSG:4326')
+    elif not gdf.crs:
+        gdf = gdf.set_crs('EPSG:4326')
+    reprojected = time.perf_counter()
+    gdf, stats = repair_geometries(gdf)
+    if timings is not None:
+        timings['reproject'] = timings.get('reproject', 0.0) + reprojected - start
+        timings['repair'] = timings.get('repair', 0.0) + time.perf_counter() - reprojected
+    return gdf, stats
+
+
+def repair_geometries(gdf: gpd.GeoDataFrame) -> Tuple[gpd.GeoDataFrame, Dict[str, int]]:
+    """Répare les géométries invalides et retire les géométries vides ou absentes"""
+    stats = empty_repair_stats()
+    if gdf.empty:
+        return gdf, stats
+
+    geoms = gdf.geometry.to_numpy()
+    missing = shapely.is_missing(geoms) | shapely.is_empty(geoms)
+    invalid = ~missing & ~shapely.is_valid(geoms)
+    stats['empty'] = int(missing.sum())
+    keep = ~missing
+
+    if invalid.any():
+        invalid_index = np.flatnonzero(invalid)
+        repaired = _make_valid(geoms[invalid_index])
+        repaired_ok = ~(shapely.is_missing(repaired) | shapely.is_empty(repaired))
+        stats['repaired'] = int(repaired_ok.sum())
+        stats['dropped'] = int((~repaired_ok).sum())
+        keep[invalid_index[~repaired_ok]] = False
+
+        geoms = geoms.copy()
+        geoms[invalid_index] = repaired
+        gdf = gdf.copy()
+        gdf[gdf.geometry.name] = gpd.GeoSeries(geoms, index=gdf.index, crs=gdf.crs)
+
+    if not keep.all():
+        gdf = gdf[keep]
+    return gdf, stats
+
+
+def _make_valid(geoms: np.ndarray) -> np.ndarray:
+    """make_valid en conservant la dimension d'origine de chaque géométrie"""
+    dimensions = shapely.get_dimensions(geoms)
+    try:
+        # Méthode 'structure' (GEOS >= 3.10) : les parties effondrées sont écartées
+        repaired = shapely.make_valid(geoms, method='structure', keep_collapsed=False)
+    except Exception:
+        repaired = shapely.make_valid(geoms)
+
+    # Les collections mixtes ne gardent que les parties de la dimension d'origine
+    for i in np.flatnonzero(shapely.get_type_id(repaired) == GEOMETRYCOLLECTION_TYPE_ID):
+        parts = [part for part in shapely.get_parts(repaired[i]) if shapely.get_dimensions(part) == dimensions[i]]
+        repaired[i] = shapely.union_all(parts) if parts else None
+    return repaired
@@ -0,0 +1,75 @@
+"""
+Géométries simplifiées par bande de zoom pour ODG
+
+Pour les zooms faibles, une géométrie au sommet près n'apporte rien à
+l'affichage. Chaque feature (et la géométrie agrégée de chaque couche)
+conserve donc une version simplifiée par bande de zoom
+(ST_SimplifyPreserveTopology, tolérance d'un pixel au zoom maximal de la
+bande), calculée à l'import. /geojson et /tiles choisissent la colonne
+selon le zoom demandé ; au-delà de la dernière bande, la géométrie complète
+est utilisée.
+
+Une colonne simplifiée reste NULL lorsque la simplification ne retire
+aucun sommet (points, géométries déjà légères) : la géométrie complète est
+alors lue à sa place.
+"""
+
+from typing import Optional
+
+from sqlalchemy import func, text
+
+# (zoom maximal de la bande, colonne) du plus simplifié au plus détaillé
+ZOOM_BANDS = (
+    (5, 'geom_z5'),
+    (9, 'geom_z9'),
+    (12, 'geom_z12'),
+)
+
+
+def zoom_tolerance(zoom: int) -> float:
+    """Taille d'un pixel en degrés au niveau de zoom donné (tuiles de 256 px)"""
+    return 360.0 / (256 * 2 ** zoom)
+
+
+def zoom_band(zoom: Optional[int]) -> Optional[str]:
+    """Colonne simplifiée adaptée au zoom, ou None (géométrie complète)"""
+    if zoom is None:
+        return None
+    for max_zoom, column in ZOOM_BANDS:
+        if zoom <= max_zoom:
+            return column
+    return None
+
+
+def band_geometry(model, zoom: Optional[int]):
+    """Géométrie simplifiée de la bande du zoom, à défaut la géométrie complète"""
+    column = zoom_band(zoom)
+    if column is None:
+        return model.geom
+    return func.coalesce(getattr(model, column), model.geom)
+
+
+def refresh_simplified_geometries(session, layer_id: int):
+    """(Re)calcule les géométries simplifiées des features et de la couche"""
+    assignments = ', '.join(
+        f"{column} = {_simplified_sql('geom', f':tolerance_{column}')}"
+        for _, column in ZOOM_BANDS
+    )
+    params = {f'tolerance_{column}': zoom_tolerance(max_zoom) for max_zoom, column in ZOOM_BANDS}
+    params['layer_id'] = layer_id
+    session.execute(
+        text(f"UPDATE geospatial_features SET {assignments} WHERE layer_id = :layer_id"),
+        params
+    )
+    session.execute(
+        text(f"UPDATE geospatial_layers SET {assignments} WHERE id = :layer_id"),
+        params
+    )
+
+
+def _simplified_sql(geom: str, tolerance: str) -> str:
+    """Expression SQL : géométrie simplifiée, NULL si aucun sommet n'est retiré"""
+    return (
+        f"(SELECT CASE WHEN ST_NPoints(s.g) < ST_NPoints({geom}) THEN s.g END "
+        f"FROM (SELECT ST_SimplifyPreserveTopology({geom}, {tolerance}) AS g) AS s)"
+    )
@@ -3,23 +3,35 @@ Service d'import de données géospatiales pour ODG
 Supporte KML, KMZ, Shapefile, GeoJSON, CSV, TXT, TIFF
 """
 
+import io
 import os
 import json
+import hashlib
 import zipfile
 import tempfile
 import logging
 import shutil
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 from pathlib import Path
 
 import geopandas as gpd
 import pandas as pd
-from shapely.geometry import Point, LineString, Polygon
-from geoalchemy2.functions import ST_GeomFromText
+import pyogrio
+import shapely
+from shapely.geometry import LineString, Polygon
+from sqlalchemy import text
 from werkzeug.utils import secure_filename
 
 from src.models.geospatial_layers import GeospatialLayer, LayerUploadHistory, db
+from src.services.feature_loader import FeatureBatchLoader
+from src.services.upload_cache import UploadCache, get_upload_cache
+from src.services.response_cache import get_response_cache
+from src.services.geometry_simplification import refresh_simplified_geometries
+from src.services.geometry_repair import empty_repair_stats, merge_repair_stats
+from src.services.geometry_pool import GeometryProcessPool, get_geometry_pool
+from src.services.import_profiling import ImportProfiler
+from src.services.archive_datasets import list_archive_datasets, dataset_members
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -34,6 +46,14 @@ except ImportError:
     RARFILE_AVAILABLE = False
     logger.warning("Module rarfile non disponible. Support RAR désactivé.")
 
+# Import conditionnel pour la lecture Arrow par lots (streaming)
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    logger.warning("Module pyarrow non disponible. Lecture par lots via pyogrio classique.")
+
 class GeospatialImportService:
     """Service principal pour l'import de fichiers géospatiaux"""
     
@@ -50,109 +70,288 @@ class GeospatialImportService:
     }
     
     MAX_FILE_SIZE = 100 * 1024 * 1024  # 100MB
-    MAX_FEATURES = 10000  # Limite de features par fichier
     
-    def __init__(self):
-        self.temp_dir = tempfile.mkdtemp(prefix='odg_import_')
-        logger.info(f"Service d'import initialisé. Dossier temp: {self.temp_dir}")
+    # Import en streaming : lecture, validation et insertion par lots de taille fixe
+    STREAMING_FORMATS = ['KML', 'KMZ', 'SHP', 'ZIP', 'RAR', 'GEOJSON', 'CSV', 'TXT']
+    STREAMING_THRESHOLD_BYTES = 10 * 1024 * 1024  # 10MB
+    STREAMING_BATCH_SIZE = 5000
+    
+    # Chargement en masse via COPY FROM STDIN au-delà de ce seuil
+    BULK_LOAD_THRESHOLD_BYTES = 5 * 1024 * 1024  # 5MB
+    BULK_LOAD_USE_STAGING = False
+    
+    # Prévisualisation rapide : métadonnées du format + échantillon de features
+    PREVIEW_MODES = ('auto', 'fast', 'full')
+    FAST_PREVIEW_THRESHOLD_BYTES = 5 * 1024 * 1024  # 5MB
+    PREVIEW_SAMPLE_SIZE = 100
+    # CSV/TXT : octets lus en tête et en fin de fichier pour l'aperçu rapide
+    PREVIEW_TABULAR_SAMPLE_BYTES = 1024 * 1024
+    
+    # Lecture des CSV/TXT : détection du délimiteur sur l'en-tête, blocs pyarrow
+    CSV_DELIMITERS = [',', ';', '\t', '|']
+    TXT_DELIMITERS = ['\t', ' ', ',', ';']
+    TABULAR_SNIFF_BYTES = 64 * 1024
+    TABULAR_BLOCK_SIZE = 16 * 1024 * 1024
+    
+    # Vectorisation des TIFF par fenêtres, en parallèle
+    RASTER_BLOCK_SIZE = 1024
+    RASTER_MAX_WORKERS = min(4, os.cpu_count() or 1)
+    
+    # Archives multi-couches : une couche par jeu de données
+    ARCHIVE_FORMATS = ['ZIP', 'RAR']
     
-    def import_file(self, file_path: str, layer_config: Dict[str, Any]) -> Tuple[bool, str, Optional[GeospatialLayer]]:
+    # Profil des imports (durée par étape, pic mémoire tracemalloc)
+    PROFILE_MEMORY = True
+    
+    def __init__(self, upload_cache: Optional[UploadCache] = None,
+                 geometry_pool: Optional[GeometryProcessPool] = None):
+        self._temp_dir = None
+        self.repair_stats = empty_repair_stats()
+        self.upload_cache = upload_cache or get_upload_cache()
+        self.geometry_pool = geometry_pool or get_geometry_pool()
+        self.profiler = ImportProfiler(trace_memory=False)
+        self._upload_record: Optional[LayerUploadHistory] = None
+    
+    @property
+    def temp_dir(self) -> str:
+        """Dossier temporaire créé à la première extraction d'archive"""
+        if self._temp_dir is None:
+            self._temp_dir = tempfile.mkdtemp(prefix='odg_import_')
+            logger.info(f"Dossier temporaire d'import: {self._temp_dir}")
+        return self._temp_dir
+    
+    def import_file(self, file_path: str, layer_config: Dict[str, Any],
+                    upload_id: Optional[int] = None) -> Tuple[bool, str, Optional[GeospatialLayer]]:
         """
         Import principal d'un fichier géospatial
         
         Args:
             file_path: Chemin vers le fichier à importer
             layer_config: Configuration de la couche (nom, description, etc.)
+            upload_id: ID d'un enregistrement LayerUploadHistory existant
+                (statut 'pending') créé lors de la mise en file d'attente
+        
+        layer_config peut contenir 'content_hash' (SHA-256 déjà calculé),
+        'allow_duplicate' (réimporter un fichier identique à un import existant),
+        'max_file_size' (limite relevée pour les uploads par morceaux) et
+        'upload_timings' (durées mesurées par la route, ex: écriture du fichier).
+        
+        Le profil de l'import (durée par étape, pic mémoire) est enregistré
+        dans file_metadata['profile'] de l'historique d'upload.
             
         Returns:
             Tuple (success, message, layer_object)
         """
+        self.profiler = ImportProfiler(trace_memory=self.PROFILE_MEMORY)
+        self.profiler.start()
+        for stage, seconds in (layer_config.get('upload_timings') or {}).items():
+            self.profiler.add(stage, seconds)
+        self._upload_record = None
+        try:
+            return self._import_file(file_path, layer_config, upload_id)
+        finally:
+            self._save_profile()
+    
+    def _import_file(self, file_path: str, layer_config: Dict[str, Any],
+                     upload_id: Optional[int]) -> Tuple[bool, str, Optional[GeospatialLayer]]:
         start_time = datetime.now()
         upload_record = None
         
         try:
+            if upload_id is not None:
+                upload_record = db.session.get(LayerUploadHistory, upload_id)
+                self._upload_record = upload_record
+            
             # Validation du fichier
             if not os.path.exists(file_path):
-                return False, f"Fichier non trouvé: {file_path}", None
+                return self._fail_upload(upload_record, f"Fichier non trouvé: {file_path}")
             
+            # Les uploads par morceaux acceptent des fichiers plus volumineux
+            max_file_size = layer_config.get('max_file_size', self.MAX_FILE_SIZE)
             file_size = os.path.getsize(file_path)
-            if file_size > self.MAX_FILE_SIZE:
-                return False, f"Fichier trop volumineux: {file_size/1024/1024:.1f}MB (max: {self.MAX_FILE_SIZE/1024/1024}MB)", None
+            if file_size > max_file_size:
+                return self._fail_upload(upload_record, f"Fichier trop volumineux: {file_size/1024/1024:.1f}MB (max: {max_file_size/1024/1024}MB)")
             
             # Détection du format
-            file_format = self._detect_format(file_path)
+            file_format = self.detect_format(file_path)
             if not file_format:
-                return False, "Format de fichier non supporté", None
-            
-            # Création de l'enregistrement d'historique
-            upload_record = LayerUploadHistory(
-                original_filename=os.path.basename(file_path),
-                file_size_bytes=file_size,
-                file_format=file_format,
-                upload_status='processing'
-            )
-            db.session.add(upload_record)
-            db.session.commit()
+                return self._fail_upload(upload_record, "Format de fichier non supporté")
             
-            logger.info(f"Début import fichier {file_path} (format: {file_format})")
-            
-            # Parsing selon le format
-            gdf = self._parse_file(file_path, file_format)
-            if gdf is None or gdf.empty:
-                upload_record.upload_status = 'error'
-                upload_record.error_message = "Aucune donnée géospatiale trouvée"
+            # Création (ou reprise) de l'enregistrement d'historique
+            if upload_record is None:
+                upload_record = LayerUploadHistory(
+                    original_filename=os.path.basename(file_path),
+                    file_size_bytes=file_size,
+                    file_format=file_format
+                )
+                db.session.add(upload_record)
+                self._upload_record = upload_record
+            content_hash = layer_config.get('content_hash')
+            if not content_hash:
+                with self.profiler.stage('hash'):
+                    content_hash = self.upload_cache.hash_file(file_path)
+            upload_record.upload_status = 'processing'
+            upload_record.file_metadata = {'sha256': content_hash}
+            with self.profiler.stage('commit'):
                 db.session.commit()
-                return False, "Aucune donnée géospatiale trouvée dans le fichier", None
             
-            # Validation des données
-            validation_result = self._validate_geodataframe(gdf)
-            if not validation_result[0]:
-                upload_record.upload_status = 'error'
-                upload_record.error_message = validation_result[1]
-                db.session.commit()
-                return False, validation_result[1], None
+            # Fichier identique déjà importé : la couche existante est réutilisée
+            if not layer_config.get('allow_duplicate'):
+                existing_layer = self.find_imported_layer(content_hash)
+                if existing_layer is not None:
+                    return self._reuse_layer(upload_record, existing_layer, start_time)
             
-            # Création de la couche géospatiale
-            layer = self._create_geospatial_layer(gdf, layer_config, file_format, file_path)
-            if not layer:
-                upload_record.upload_status = 'error'
-                upload_record.error_message = "Erreur lors de la création de la couche"
-                db.session.commit()
-                return False, "Erreur lors de la création de la couche", None
+            logger.info(f"Début import fichier {file_path} (format: {file_format})")
+            cache_key = self._cache_key(content_hash, file_format, layer_config.get('raster_options'))
             
-            # Sauvegarde
-            db.session.add(layer)
-            db.session.commit()
+            # Archive contenant plusieurs jeux de données : une couche par jeu
+            if file_format in self.ARCHIVE_FORMATS:
+                with self.profiler.stage('archive_open'):
+                    datasets = self._archive_dataset_sources(file_path, file_format)
+                if len(datasets) > 1 or (datasets and datasets[0][1] != 'SHP'):
+                    return self._import_archive_datasets(
+                        datasets, layer_config, file_format, file_path, upload_record, start_time
+                    )
             
-            # Mise à jour de l'historique
-            processing_time = (datetime.now() - start_time).total_seconds()
-            upload_record.layer_id = layer.id
-            upload_record.upload_status = 'success'
-            upload_record.features_count = len(gdf)
-            upload_record.processing_time_seconds = processing_time
-            upload_record.processed_at = datetime.now()
-            upload_record.file_metadata = {
-                'crs': str(gdf.crs) if gdf.crs else 'Unknown',
-                'bounds': gdf.total_bounds.tolist() if not gdf.empty else [],
-                'geometry_types': gdf.geometry.geom_type.unique().tolist()
-            }
-            db.session.commit()
+            # Gros fichiers : lecture et insertion par lots, mémoire constante
+            if self._should_stream(file_format, file_size, layer_config):
+                logger.info(f"Import en streaming par lots de {self.STREAMING_BATCH_SIZE} features")
+                batches = self.upload_cache.iter_batches(cache_key, self.STREAMING_BATCH_SIZE)
+                if batches is None:
+                    batches = self._iter_file_batches(file_path, file_format)
+                else:
+                    self._load_cached_repair_stats(cache_key)
+                    batches = self.profiler.iter_stage('parse', batches)
+                return self._import_batches(batches, layer_config, file_format, file_path, upload_record, start_time)
+            
+            # Résultat déjà analysé (par /preview) ou parsing selon le format
+            with self.profiler.stage('parse'):
+                gdf = self.upload_cache.get(cache_key)
+                from_cache = gdf is not None
+                if not from_cache:
+                    gdf = self._parse_file(file_path, file_format, layer_config.get('raster_options'))
+            if not from_cache:
+                if gdf is None or gdf.empty:
+                    upload_record.upload_status = 'error'
+                    upload_record.error_message = "Aucune donnée géospatiale trouvée"
+                    db.session.commit()
+                    return False, "Aucune donnée géospatiale trouvée dans le fichier", None
+                
+                # Validation des données
+                with self.profiler.stage('validate'):
+                    validation_result = self._validate_geodataframe(gdf)
+                if not validation_result[0]:
+                    upload_record.upload_status = 'error'
+                    upload_record.error_message = validation_result[1]
+                    db.session.commit()
+                    return False, validation_result[1], None
+                with self.profiler.stage('cache_write'):
+                    self.upload_cache.put(cache_key, gdf, metadata={'geometry_repair': self.repair_stats})
+            else:
+                logger.info(f"Fichier {content_hash[:12]} déjà analysé, lecture depuis le cache")
+                self._load_cached_repair_stats(cache_key)
             
-            logger.info(f"Import réussi: {len(gdf)} features en {processing_time:.2f}s")
-            return True, f"Import réussi: {len(gdf)} features importées", layer
+            # Insertion des features par lots
+            batches = self._iter_dataframe_batches(gdf)
+            return self._import_batches(batches, layer_config, file_format, file_path, upload_record, start_time)
             
         except Exception as e:
             logger.error(f"Erreur lors de l'import: {str(e)}")
             if upload_record:
+                db.session.rollback()
                 upload_record.upload_status = 'error'
                 upload_record.error_message = str(e)
                 upload_record.processed_at = datetime.now()
                 db.session.commit()
             return False, f"Erreur lors de l'import: {str(e)}", None
     
-    def preview_file(self, file_path: str) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+    def _save_profile(self):
+        """Arrête le profilage et l'enregistre dans l'historique d'upload"""
+        profile = self.profiler.stop()
+        upload_record = self._upload_record
+        self._upload_record = None
+        if upload_record is None or upload_record.id is None:
+            return
+        try:
+            upload_record.file_metadata = {**(upload_record.file_metadata or {}), 'profile': profile}
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Impossible d'enregistrer le profil de l'import: {str(e)}")
+    
+    def _fail_upload(self, upload_record: Optional[LayerUploadHistory], message: str) -> Tuple[bool, str, None]:
+        """Marque l'enregistrement d'historique en erreur (s'il existe)"""
+        if upload_record is not None:
+            upload_record.upload_status = 'error'
+            upload_record.error_message = message
+            upload_record.processed_at = datetime.now()
+            db.session.commit()
+        return False, message, None
+    
+    def _load_cached_repair_stats(self, cache_key: str):
+        """Compteurs de réparation enregistrés lors de l'analyse mise en cache"""
+        cached_stats = self.upload_cache.get_metadata(cache_key).get('geometry_repair')
+        if cached_stats:
+            self.repair_stats = merge_repair_stats(empty_repair_stats(), cached_stats)
+    
+    @staticmethod
+    def _cache_key(content_hash: str, file_format: str,
+                   raster_options: Optional[Dict[str, Any]] = None) -> str:
+        """Clé du cache d'upload : le format détecté (un même contenu est lu
+        différemment en .txt et en .csv) et les options raster modifient le
+        résultat du parsing"""
+        cache_key = f"{content_hash}-{file_format.lower()}"
+        if not raster_options:
+            return cache_key
+        options_hash = hashlib.sha256(json.dumps(raster_options, sort_keys=True).encode()).hexdigest()
+        return f"{cache_key}-{options_hash[:12]}"
+    
+    @staticmethod
+    def find_imported_layer(content_hash: str) -> Optional[GeospatialLayer]:
+        """Couche visible issue d'un import réussi du même fichier (même SHA-256)"""
+        record = (
+            LayerUploadHistory.query
+            .join(GeospatialLayer, LayerUploadHistory.layer_id == GeospatialLayer.id)
+            .filter(
+                LayerUploadHistory.upload_status == 'success',
+                LayerUploadHistory.file_metadata['sha256'].astext == content_hash,
+                GeospatialLayer.is_visible == True
+            )
+            .order_by(LayerUploadHistory.uploaded_at.desc())
+            .first()
+        )
+        return record.layer if record else None
+    
+    def _reuse_layer(self, upload_record: LayerUploadHistory, layer: GeospatialLayer,
+                     start_time: datetime) -> Tuple[bool, str, GeospatialLayer]:
+        """Termine l'upload d'un fichier déjà importé en pointant vers la couche existante"""
+        logger.info(f"Fichier déjà importé, réutilisation de la couche {layer.id}")
+        source_info = (layer.layer_metadata or {}).get('source_info', {})
+        upload_record.layer_id = layer.id
+        upload_record.upload_status = 'success'
+        upload_record.features_count = source_info.get('feature_count')
+        upload_record.processing_time_seconds = (datetime.now() - start_time).total_seconds()
+        upload_record.processed_at = datetime.now()
+        upload_record.file_metadata = {
+            **(upload_record.file_metadata or {}),
+            'duplicate_of_layer': layer.id
+        }
+        db.session.commit()
+        return True, f"Fichier déjà importé: couche existante '{layer.name}'", layer
+    
+    def preview_file(self, file_path: str, mode: str = 'auto') -> Tuple[bool, str, Optional[Dict[str, Any]]]:
         """Analyse un fichier géospatial sans créer de couche en base.
-        Retourne uniquement des métadonnées pour l'aperçu (compte, bounds, types)."""
+        Retourne uniquement des métadonnées pour l'aperçu (compte, bounds, types).
+        
+        mode: 'full' (lecture complète, amorce le cache d'upload), 'fast'
+        (métadonnées du format + échantillon) ou 'auto' (rapide au-delà de
+        FAST_PREVIEW_THRESHOLD_BYTES si le fichier n'est pas déjà en cache).
+        
+        Une archive ZIP/RAR contenant plusieurs jeux de données (ou un seul
+        GeoJSON/KML) est importée couche par couche : l'aperçu, toujours
+        rapide, détaille chaque jeu de données dans 'datasets'."""
+        if mode not in self.PREVIEW_MODES:
+            return False, f"Mode de prévisualisation invalide: {mode}", None
         try:
             if not os.path.exists(file_path):
                 logger.error(f"Fichier non trouvé: {file_path}")
@@ -165,62 +364,109 @@ class GeospatialImportService:
                     f"(max: {self.MAX_FILE_SIZE/1024/1024}MB)"
                 ), None
 
-            file_format = self._detect_format(file_path)
+            file_format = self.detect_format(file_path)
             if not file_format:
                 logger.error(f"Format non supporté pour: {file_path}")
                 return False, "Format de fichier non supporté. Formats acceptés: KML, KMZ, SHP, GeoJSON, CSV, TXT, TIFF", None
 
-            logger.info(f"Parsing fichier {file_path} (format: {file_format})")
-            try:
-                gdf = self._parse_file(file_path, file_format)
-            except ValueError as ve:
-                # Propager les erreurs de validation avec message explicite
-                logger.error(f"Erreur de validation: {str(ve)}")
-                return False, str(ve), None
+            content_hash = self.upload_cache.hash_file(file_path)
+            cache_key = self._cache_key(content_hash, file_format)
+            cached = self.upload_cache.contains(cache_key)
+            if mode == 'auto':
+                mode = 'fast' if file_size > self.FAST_PREVIEW_THRESHOLD_BYTES and not cached else 'full'
             
-            if gdf is None:
-                logger.error(f"Échec du parsing pour {file_path}")
-                return False, f"Impossible de lire le fichier {file_format}. Vérifiez que le fichier est valide.", None
+            # Archive multi-couches : mêmes jeux de données que l'import
+            datasets = None
+            if file_format in self.ARCHIVE_FORMATS:
+                datasets = self._archive_dataset_sources(file_path, file_format)
+                if not datasets:
+                    return False, f"Aucun jeu de données (SHP, GeoJSON, KML) trouvé dans l'archive {file_format}", None
+                if len(datasets) == 1 and datasets[0][1] == 'SHP':
+                    datasets = None
             
-            if gdf.empty:
-                logger.error(f"Aucune donnée dans {file_path}")
-                return False, "Aucune donnée géospatiale trouvée dans le fichier", None
+            if datasets is not None:
+                logger.info(f"Prévisualisation de l'archive {file_path}: {len(datasets)} jeux de données")
+                mode = 'fast'
+                cached = False
+                preview_data = self._preview_archive_datasets(datasets)
+            elif mode == 'fast':
+                # Métadonnées du format uniquement, échantillon pour les types de géométrie
+                logger.info(f"Prévisualisation rapide {file_path} (format: {file_format})")
+                preview_data = self._fast_preview(file_path, file_format)
+            else:
+                gdf = self.upload_cache.get(cache_key) if cached else None
+                cached = gdf is not None
+                if cached:
+                    self._load_cached_repair_stats(cache_key)
+                
+                if not cached:
+                    logger.info(f"Parsing fichier {file_path} (format: {file_format})")
+                    try:
+                        gdf = self._parse_file(file_path, file_format)
+                    except ValueError as ve:
+                        # Propager les erreurs de validation avec message explicite
+                        logger.error(f"Erreur de validation: {str(ve)}")
+                        return False, str(ve), None
+                    
+                    if gdf is None:
+                        logger.error(f"Échec du parsing pour {file_path}")
+                        return False, f"Impossible de lire le fichier {file_format}. Vérifiez que le fichier est valide.", None
+                    
+                    if gdf.empty:
+                        logger.error(f"Aucune donnée dans {file_path}")
+                        return False, "Aucune donnée géospatiale trouvée dans le fichier", None
 
-            is_valid, message = self._validate_geodataframe(gdf)
-            if not is_valid:
-                return False, message, None
+                    is_valid, message = self._validate_geodataframe(gdf)
+                    if not is_valid:
+                        return False, message, None
+                    
+                    # L'upload qui suit la prévisualisation réutilisera ce résultat
+                    self.upload_cache.put(cache_key, gdf, metadata={'geometry_repair': self.repair_stats})
 
-            bounds = gdf.total_bounds.tolist() if not gdf.empty else []
-            geom_types = gdf.geometry.geom_type.value_counts()
-            main_geom_type = geom_types.index[0].upper() if not geom_types.empty else None
+                geom_types = gdf.geometry.geom_type.value_counts()
+                preview_data = {
+                    'featureCount': len(gdf),
+                    'geometryTypes': geom_types.to_dict(),
+                    'mainGeometryType': geom_types.index[0].upper() if not geom_types.empty else None,
+                    'bounds': gdf.total_bounds.tolist() if not gdf.empty else [],
+                    'crs': str(gdf.crs) if gdf.crs else 'Unknown',
+                    'geometryRepair': dict(self.repair_stats),
+                }
 
-            preview_data: Dict[str, Any] = {
+            preview_data.update({
                 'fileFormat': file_format,
-                'featureCount': len(gdf),
-                'geometryTypes': geom_types.to_dict(),
-                'mainGeometryType': main_geom_type,
-                'bounds': bounds,
-                'crs': str(gdf.crs) if gdf.crs else 'Unknown',
                 'fileSizeBytes': file_size,
-            }
+                'contentHash': content_hash,
+                'cached': cached,
+                'previewMode': mode,
+            })
+            
+            existing_layer = self.find_imported_layer(content_hash)
+            if existing_layer is not None:
+                preview_data['existingLayer'] = {'id': existing_layer.id, 'name': existing_layer.name}
 
+            feature_count = preview_data.get('featureCount')
+            if feature_count is None:
+                return True, "Prévisualisation réussie", preview_data
             return True, (
-                f"Prévisualisation réussie: {len(gdf)} features détectées"
+                f"Prévisualisation réussie: {feature_count} features détectées"
             ), preview_data
         except Exception as e:
             logger.error(f"Erreur lors de la prévisualisation: {str(e)}")
             return False, f"Erreur lors de la prévisualisation: {str(e)}", None
     
-    def _detect_format(self, file_path: str) -> Optional[str]:
+    @classmethod
+    def detect_format(cls, file_path: str) -> Optional[str]:
         """Détecte le format du fichier"""
         file_ext = Path(file_path).suffix.lower()
         
-        for format_name, extensions in self.SUPPORTED_FORMATS.items():
+        for format_name, extensions in cls.SUPPORTED_FORMATS.items():
             if file_ext in extensions:
                 return format_name
         return None
     
-    def _parse_file(self, file_path: str, file_format: str) -> Optional[gpd.GeoDataFrame]:
+    def _parse_file(self, file_path: str, file_format: str,
+                    raster_options: Optional[Dict[str, Any]] = None) -> Optional[gpd.GeoDataFrame]:
         """Parse le fichier selon son format"""
         try:
             if file_format == 'KML':
@@ -240,7 +486,7 @@ class GeospatialImportService:
             elif file_format == 'TXT':
                 return self._parse_txt(file_path)
             elif file_format == 'TIFF':
-                return self._parse_tiff(file_path)
+                return self._parse_tiff(file_path, raster_options)
             else:
                 logger.error(f"Format non supporté: {file_format}")
                 return None
@@ -264,25 +510,23 @@ class GeospatialImportService:
     def _parse_kmz(self, file_path: str) -> Optional[gpd.GeoDataFrame]:
         """Parse un fichier KMZ (KML compressé)"""
         try:
-            with zipfile.ZipFile(file_path, 'r') as kmz:
-                # Chercher le fichier KML principal
-                kml_files = [f for f in kmz.namelist() if f.endswith('.kml')]
-                if not kml_files:
-                    raise ValueError("Aucun fichier KML trouvé dans le KMZ")
-                
-                # Extraire le premier KML
-                kml_file = kml_files[0]
-                temp_kml = os.path.join(self.temp_dir, 'temp.kml')
-                
-                with kmz.open(kml_file) as kml_data:
-                    with open(temp_kml, 'wb') as f:
-                        f.write(kml_data.read())
-                
-                return self._parse_kml(temp_kml)
+            return self._parse_kml(self._kmz_kml_path(file_path))
         except Exception as e:
             logger.error(f"Erreur parsing KMZ: {str(e)}")
             return None
     
+    def _kmz_kml_path(self, file_path: str) -> str:
+        """Chemin virtuel GDAL du KML principal d'un KMZ, lu sans extraction"""
+        with self.profiler.stage('archive_open'), zipfile.ZipFile(file_path, 'r') as kmz:
+            # Chercher le fichier KML principal
+            kml_files = [f for f in kmz.namelist() if f.lower().endswith('.kml')]
+        if not kml_files:
+            raise ValueError("Aucun fichier KML trouvé dans le KMZ")
+        
+        # doc.kml par convention, sinon le premier KML
+        kml_file = next((f for f in kml_files if os.path.basename(f).lower() == 'doc.kml'), kml_files[0])
+        return self._vsi_path('vsizip', file_path, kml_file)
+    
     def _parse_shapefile(self, file_path: str) -> Optional[gpd.GeoDataFrame]:
         """Parse un Shapefile
         
@@ -290,24 +534,9 @@ class GeospatialImportService:
         Le file_path doit pointer vers le fichier .shp principal
         """
         try:
-            # Vérifier que c'est bien un fichier .shp
-            if not file_path.lower().endswith('.shp'):
-                logger.error(f"Le fichier doit être un .shp, reçu: {file_path}")
-                raise ValueError("Impossible de lire le fichier SHP. Vérifiez que le fichier est valide.")
-            
-            # Vérifier l'existence des fichiers compagnons requis
-            base_path = file_path[:-4]  # Enlever .shp
-            required_files = ['.shp', '.shx', '.dbf']
-            missing_files = []
-            
-            for ext in required_files:
-                companion_file = base_path + ext
-                if not os.path.exists(companion_file):
-                    missing_files.append(ext)
-            
-            if missing_files:
-                logger.error(f"Fichiers manquants pour le shapefile: {missing_files}")
-                raise ValueError(f"Impossible de lire le fichier SHP. Fichiers manquants: {', '.join(missing_files)}")
+            # Les shapefiles d'archives (/vsizip/...) sont vérifiés à partir du listing
+            if not self._is_vsi_path(file_path):
+                self._check_shapefile_companions(file_path)
             
             # Lire le shapefile
             gdf = gpd.read_file(file_path)
@@ -325,47 +554,121 @@ class GeospatialImportService:
             logger.error(f"Erreur parsing Shapefile: {str(e)}", exc_info=True)
             raise ValueError("Impossible de lire le fichier SHP. Vérifiez que le fichier est valide.")
     
+    def _check_shapefile_companions(self, file_path: str):
+        """Vérifie la présence des fichiers compagnons requis d'un shapefile"""
+        # Vérifier que c'est bien un fichier .shp
+        if not file_path.lower().endswith('.shp'):
+            logger.error(f"Le fichier doit être un .shp, reçu: {file_path}")
+            raise ValueError("Impossible de lire le fichier SHP. Vérifiez que le fichier est valide.")
+        
+        # Vérifier l'existence des fichiers compagnons requis
+        base_path = file_path[:-4]  # Enlever .shp
+        required_files = ['.shp', '.shx', '.dbf']
+        missing_files = []
+        
+        for ext in required_files:
+            companion_file = base_path + ext
+            if not os.path.exists(companion_file):
+                missing_files.append(ext)
+        
+        if missing_files:
+            logger.error(f"Fichiers manquants pour le shapefile: {missing_files}")
+            raise ValueError(f"Impossible de lire le fichier SHP. Fichiers manquants: {', '.join(missing_files)}")
+    
     def _parse_zip_shapefile(self, file_path: str) -> Optional[gpd.GeoDataFrame]:
         """Parse un fichier ZIP contenant un shapefile
         
         Le ZIP doit contenir au minimum les fichiers .shp, .shx, .dbf
         """
         try:
-            logger.info(f"Extraction du ZIP: {file_path}")
-            
-            # Créer un dossier temporaire pour l'extraction
-            extract_dir = os.path.join(self.temp_dir, 'zip_extract')
-            os.makedirs(extract_dir, exist_ok=True)
-            
-            # Extraire le contenu du ZIP
-            with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_dir)
-            
-            # Chercher le fichier .shp dans l'extraction
-            shp_files = []
-            for root, dirs, files in os.walk(extract_dir):
-                for file in files:
-                    if file.lower().endswith('.shp'):
-                        shp_files.append(os.path.join(root, file))
-            
-            if not shp_files:
-                raise ValueError("Aucun fichier .shp trouvé dans l'archive ZIP")
-            
-            if len(shp_files) > 1:
-                logger.warning(f"Plusieurs fichiers .shp trouvés, utilisation du premier: {shp_files[0]}")
-            
-            # Parser le shapefile trouvé
-            shp_path = shp_files[0]
-            logger.info(f"Shapefile trouvé: {shp_path}")
-            
-            return self._parse_shapefile(shp_path)
-            
+            return self._parse_shapefile(self._zip_shapefile_path(file_path))
         except ValueError as ve:
             raise ve
         except Exception as e:
             logger.error(f"Erreur parsing ZIP: {str(e)}", exc_info=True)
             raise ValueError(f"Impossible de lire l'archive ZIP: {str(e)}")
     
+    def _zip_shapefile_path(self, file_path: str) -> str:
+        """Chemin /vsizip/ du shapefile d'une archive ZIP : lu en place, sans extraction"""
+        with self.profiler.stage('archive_open'), zipfile.ZipFile(file_path, 'r') as zip_ref:
+            members = zip_ref.namelist()
+        
+        shp_member = self._find_archive_shapefile(members, 'ZIP')
+        return self._vsi_path('vsizip', file_path, shp_member)
+    
+    def _find_archive_shapefile(self, members: List[str], archive_format: str) -> str:
+        """Cherche le .shp dans le listing d'une archive et vérifie ses compagnons"""
+        shp_files = [m for m in members if m.lower().endswith('.shp')]
+        
+        if not shp_files:
+            raise ValueError(f"Aucun fichier .shp trouvé dans l'archive {archive_format}")
+        
+        if len(shp_files) > 1:
+            logger.warning(f"Plusieurs fichiers .shp trouvés, utilisation du premier: {shp_files[0]}")
+        
+        shp_member = shp_files[0]
+        available = {m.lower() for m in members}
+        missing_files = [
+            ext for ext in ['.shx', '.dbf']
+            if (shp_member[:-4] + ext).lower() not in available
+        ]
+        if missing_files:
+            logger.error(f"Fichiers manquants pour le shapefile: {missing_files}")
+            raise ValueError(f"Impossible de lire le fichier SHP. Fichiers manquants: {', '.join(missing_files)}")
+        
+        logger.info(f"Shapefile trouvé: {shp_member}")
+        return shp_member
+    
+    def _archive_dataset_sources(self, file_path: str, file_format: str) -> List[Tuple[str, str, str]]:
+        """(membre, format, chemin lisible) de chaque jeu de données d'une archive ZIP/RAR"""
+        if file_format == 'ZIP':
+            with zipfile.ZipFile(file_path, 'r') as zip_ref:
+                members = zip_ref.namelist()
+            return [
+                (member, dataset_format, self._vsi_path('vsizip', file_path, member))
+                for member, dataset_format in list_archive_datasets(members)
+            ]
+        
+        if not RARFILE_AVAILABLE:
+            raise ValueError(
+                "Le support RAR n'est pas disponible. "
+                "Veuillez installer rarfile: pip install rarfile"
+            )
+        with rarfile.RarFile(file_path, 'r') as rar_ref:
+            members = rar_ref.namelist()
+            datasets = list_archive_datasets(members)
+            if not datasets:
+                return []
+            
+            try:
+                pyogrio.read_info(self._vsi_path('vsirar', file_path, datasets[0][0]))
+                return [
+                    (member, dataset_format, self._vsi_path('vsirar', file_path, member))
+                    for member, dataset_format in datasets
+                ]
+            except Exception:
+                logger.info("/vsirar/ indisponible, extraction des seuls fichiers des jeux de données")
+            
+            extract_dir = os.path.join(self.temp_dir, 'rar_extract')
+            os.makedirs(extract_dir, exist_ok=True)
+            for member, dataset_format in datasets:
+                for needed in dataset_members(member, dataset_format, members):
+                    rar_ref.extract(needed, extract_dir)
+        
+        return [
+            (member, dataset_format, os.path.join(extract_dir, member))
+            for member, dataset_format in datasets
+        ]
+    
+    @staticmethod
+    def _vsi_path(handler: str, archive_path: str, member: str) -> str:
+        """Chemin virtuel GDAL d'un membre d'archive (/vsizip/, /vsirar/)"""
+        return f"/{handler}/{os.path.abspath(archive_path)}/{member}"
+    
+    @staticmethod
+    def _is_vsi_path(path: str) -> bool:
+        return path.startswith('/vsi')
+    
     def _parse_rar_shapefile(self, file_path: str) -> Optional[gpd.GeoDataFrame]:
         """Parse un fichier RAR contenant un shapefile
         
@@ -373,47 +676,49 @@ class GeospatialImportService:
         Nécessite le module rarfile (pip install rarfile)
         """
         try:
-            if not RARFILE_AVAILABLE:
-                raise ValueError(
-                    "Le support RAR n'est pas disponible. "
-                    "Veuillez installer rarfile: pip install rarfile"
-                )
-            
-            logger.info(f"Extraction du RAR: {file_path}")
-            
-            # Créer un dossier temporaire pour l'extraction
-            extract_dir = os.path.join(self.temp_dir, 'rar_extract')
-            os.makedirs(extract_dir, exist_ok=True)
-            
-            # Extraire le contenu du RAR
-            with rarfile.RarFile(file_path, 'r') as rar_ref:
-                rar_ref.extractall(extract_dir)
-            
-            # Chercher le fichier .shp dans l'extraction
-            shp_files = []
-            for root, dirs, files in os.walk(extract_dir):
-                for file in files:
-                    if file.lower().endswith('.shp'):
-                        shp_files.append(os.path.join(root, file))
-            
-            if not shp_files:
-                raise ValueError("Aucun fichier .shp trouvé dans l'archive RAR")
-            
-            if len(shp_files) > 1:
-                logger.warning(f"Plusieurs fichiers .shp trouvés, utilisation du premier: {shp_files[0]}")
-            
-            # Parser le shapefile trouvé
-            shp_path = shp_files[0]
-            logger.info(f"Shapefile trouvé: {shp_path}")
-            
-            return self._parse_shapefile(shp_path)
-            
+            return self._parse_shapefile(self._rar_shapefile_path(file_path))
         except ValueError as ve:
             raise ve
         except Exception as e:
             logger.error(f"Erreur parsing RAR: {str(e)}", exc_info=True)
             raise ValueError(f"Impossible de lire l'archive RAR: {str(e)}")
     
+    def _rar_shapefile_path(self, file_path: str) -> str:
+        """Chemin du shapefile d'une archive RAR
+        
+        Lu en place via /vsirar/ lorsque GDAL le permet (GDAL >= 3.7 compilé
+        avec libarchive) ; sinon seuls les fichiers du shapefile sont extraits."""
+        with self.profiler.stage('archive_open'):
+            return self._open_rar_shapefile(file_path)
+    
+    def _open_rar_shapefile(self, file_path: str) -> str:
+        if not RARFILE_AVAILABLE:
+            raise ValueError(
+                "Le support RAR n'est pas disponible. "
+                "Veuillez installer rarfile: pip install rarfile"
+            )
+        
+        with rarfile.RarFile(file_path, 'r') as rar_ref:
+            members = rar_ref.namelist()
+            shp_member = self._find_archive_shapefile(members, 'RAR')
+            
+            vsi_path = self._vsi_path('vsirar', file_path, shp_member)
+            try:
+                pyogrio.read_info(vsi_path)
+                return vsi_path
+            except Exception:
+                logger.info("/vsirar/ indisponible, extraction des seuls fichiers du shapefile")
+            
+            extract_dir = os.path.join(self.temp_dir, 'rar_extract')
+            os.makedirs(extract_dir, exist_ok=True)
+            
+            base = shp_member[:-4].lower()
+            shapefile_members = [m for m in members if os.path.splitext(m)[0].lower() == base]
+            for member in shapefile_members:
+                rar_ref.extract(member, extract_dir)
+        
+        return os.path.join(extract_dir, shp_member)
+    
     def _parse_geojson(self, file_path: str) -> Optional[gpd.GeoDataFrame]:
         """Parse un fichier GeoJSON"""
         try:
@@ -426,72 +731,47 @@ class GeospatialImportService:
     def _parse_csv(self, file_path: str) -> Optional[gpd.GeoDataFrame]:
         """Parse un CSV avec coordonnées"""
         try:
-            df = pd.read_csv(file_path)
-            
-            # Détection automatique des colonnes de coordonnées
-            coord_columns = self._detect_coordinate_columns(df)
-            if not coord_columns:
-                raise ValueError("Colonnes de coordonnées non trouvées")
-            
-            lon_col, lat_col = coord_columns
-            
-            # Création des géométries Point
-            geometry = [Point(xy) for xy in zip(df[lon_col], df[lat_col])]
-            gdf = gpd.GeoDataFrame(df, geometry=geometry, crs='EPSG:4326')
-            
-            return self._standardize_geodataframe(gdf)
+            return self._read_tabular(file_path, 'CSV')
         except Exception as e:
             logger.error(f"Erreur parsing CSV: {str(e)}")
             return None
     
     def _parse_txt(self, file_path: str) -> Optional[gpd.GeoDataFrame]:
-        """Parse un fichier TXT avec coordonnées"""
+        """Parse un fichier TXT avec coordonnées (deux premières colonnes)"""
         try:
-            # Essayer différents délimiteurs
-            for delimiter in ['\t', ' ', ',', ';']:
-                try:
-                    df = pd.read_csv(file_path, delimiter=delimiter)
-                    if len(df.columns) >= 2:
-                        break
-                except:
-                    continue
-            else:
-                raise ValueError("Format TXT non reconnu")
-            
-            # Utiliser les deux premières colonnes comme coordonnées
-            if len(df.columns) >= 2:
-                df.columns = ['longitude', 'latitude'] + list(df.columns[2:])
-                geometry = [Point(xy) for xy in zip(df['longitude'], df['latitude'])]
-                gdf = gpd.GeoDataFrame(df, geometry=geometry, crs='EPSG:4326')
-                return self._standardize_geodataframe(gdf)
-            
-            return None
+            return self._read_tabular(file_path, 'TXT')
         except Exception as e:
             logger.error(f"Erreur parsing TXT: {str(e)}")
             return None
     
-    def _parse_tiff(self, file_path: str) -> Optional[gpd.GeoDataFrame]:
-        """Parse un fichier TIFF géoréférencé (raster)"""
+    def _read_tabular(self, file_path: str, file_format: str) -> Optional[gpd.GeoDataFrame]:
+        """Lit entièrement un CSV/TXT via le chemin de lecture par lots"""
+        batches = list(self._iter_tabular_batches(file_path, file_format))
+        if not batches:
+            return None
+        return pd.concat(batches, ignore_index=True)
+    
+    def _parse_tiff(self, file_path: str, raster_options: Optional[Dict[str, Any]] = None) -> Optional[gpd.GeoDataFrame]:
+        """Parse un fichier TIFF géoréférencé (raster)
+        
+        La bande est vectorisée par fenêtres dans un pool de processus.
+        raster_options: block_size, decimation (facteur entier), class_breaks
+        (seuils de classification appliqués avant vectorisation), band."""
         try:
-            import rasterio
-            from rasterio.features import shapes
-            from shapely.geometry import shape
-            
-            with rasterio.open(file_path) as src:
-                # Conversion du raster en polygones
-                mask = src.read(1) != src.nodata
-                results = (
-                    {'properties': {'raster_val': v}, 'geometry': s}
-                    for i, (s, v) in enumerate(shapes(src.read(1), mask=mask, transform=src.transform))
-                )
-                
-                geoms = list(results)
-                if not geoms:
-                    return None
-                
-                # Création du GeoDataFrame
-                gdf = gpd.GeoDataFrame.from_features(geoms, crs=src.crs)
-                return self._standardize_geodataframe(gdf)
+            from src.services.raster_polygonize import RasterPolygonizer
+            
+            options = raster_options or {}
+            polygonizer = RasterPolygonizer(
+                block_size=options.get('block_size', self.RASTER_BLOCK_SIZE),
+                max_workers=options.get('max_workers', self.RASTER_MAX_WORKERS),
+                decimation=options.get('decimation', 1),
+                class_breaks=options.get('class_breaks'),
+                band=options.get('band', 1)
+            )
+            gdf = polygonizer.polygonize(file_path)
+            if gdf is None:
+                return None
+            return self._standardize_geodataframe(gdf)
                 
         except ImportError:
             logger.error("rasterio non installé - impossible de lire les TIFF")
@@ -531,29 +811,33 @@ class GeospatialImportService:
         return None
     
     def _standardize_geodataframe(self, gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
-        """Standardise un GeoDataFrame (projection, nettoyage)"""
-        # Reprojection vers WGS84 si nécessaire
-        if gdf.crs and gdf.crs != 'EPSG:4326':
-            gdf = gdf.to_crs('EPSG:4326')
-        elif not gdf.crs:
-            gdf.crs = 'EPSG:4326'
-        
-        # Nettoyage des géométries invalides
-        gdf = gdf[gdf.geometry.is_valid]
-        
-        # Suppression des géométries vides
-        gdf = gdf[~gdf.geometry.is_empty]
+        """Standardise un GeoDataFrame (projection WGS84, réparation des géométries)
         
+        Le travail est réparti dans le pool de processus géométrique."""
+        with self.profiler.stage('standardize'):
+            gdf, stats, timings = self.geometry_pool.standardize(gdf)
+        self.profiler.add_geometry_timings(timings)
+        self._record_repair_stats(stats)
         return gdf
     
+    def _standardize_batches(self, batches: Iterator[gpd.GeoDataFrame]) -> Iterator[gpd.GeoDataFrame]:
+        """Standardise un flux de lots dans le pool de processus, en conservant l'ordre"""
+        results = self.geometry_pool.standardize_batches(batches)
+        for gdf, stats, timings in self.profiler.iter_stage('standardize', results):
+            self.profiler.add_geometry_timings(timings)
+            self._record_repair_stats(stats)
+            yield gdf
+    
+    def _record_repair_stats(self, stats: Dict[str, int]):
+        merge_repair_stats(self.repair_stats, stats)
+        if stats['repaired'] or stats['dropped']:
+            logger.info(f"Géométries réparées: {stats['repaired']}, supprimées: {stats['dropped']}")
+    
     def _validate_geodataframe(self, gdf: gpd.GeoDataFrame) -> Tuple[bool, str]:
         """Valide un GeoDataFrame"""
         if gdf.empty:
             return False, "Aucune donnée géospatiale valide"
         
-        if len(gdf) > self.MAX_FEATURES:
-            return False, f"Trop de features: {len(gdf)} (max: {self.MAX_FEATURES})"
-        
         # Vérification des types de géométrie
         geom_types = gdf.geometry.geom_type.unique()
         valid_types = ['Point', 'LineString', 'Polygon', 'MultiPoint', 'MultiLineString', 'MultiPolygon']
@@ -564,81 +848,581 @@ class GeospatialImportService:
         
         return True, "Validation réussie"
     
-    def _create_geospatial_layer(self, gdf: gpd.GeoDataFrame, layer_config: Dict[str, Any], 
-                                file_format: str, file_path: str) -> Optional[GeospatialLayer]:
-        """Crée une couche géospatiale à partir d'un GeoDataFrame"""
-        try:
-            # Détermination du type de géométrie principal
-            geom_types = gdf.geometry.geom_type.value_counts()
-            main_geom_type = geom_types.index[0].upper()
-            
-            # Conversion des géométries en WKT pour PostGIS
-            if len(gdf) == 1:
-                # Une seule géométrie
-                geom_wkt = gdf.geometry.iloc[0].wkt
-            else:
-                # Plusieurs géométries - créer une GeometryCollection ou MultiGeometry
-                if main_geom_type == 'POINT':
-                    from shapely.geometry import MultiPoint
-                    multi_geom = MultiPoint(gdf.geometry.tolist())
-                    geom_wkt = multi_geom.wkt
-                    main_geom_type = 'MULTIPOINT'
-                elif main_geom_type == 'LINESTRING':
-                    from shapely.geometry import MultiLineString
-                    multi_geom = MultiLineString(gdf.geometry.tolist())
-                    geom_wkt = multi_geom.wkt
-                    main_geom_type = 'MULTILINESTRING'
-                elif main_geom_type == 'POLYGON':
-                    from shapely.geometry import MultiPolygon
-                    multi_geom = MultiPolygon(gdf.geometry.tolist())
-                    geom_wkt = multi_geom.wkt
-                    main_geom_type = 'MULTIPOLYGON'
-                else:
-                    # Prendre la première géométrie par défaut
-                    geom_wkt = gdf.geometry.iloc[0].wkt
-            
-            # Préparation des métadonnées
-            metadata_dict = {
-                'properties': gdf.drop('geometry', axis=1).to_dict('records') if len(gdf.columns) > 1 else [],
-                'source_info': {
-                    'original_crs': str(gdf.crs) if gdf.crs else 'Unknown',
-                    'feature_count': len(gdf),
-                    'geometry_types': geom_types.to_dict(),
-                    'bounds': gdf.total_bounds.tolist()
-                },
-                'processing_info': {
-                    'import_date': datetime.now().isoformat(),
-                    'file_size_bytes': os.path.getsize(file_path)
+    def _should_stream(self, file_format: str, file_size: int, layer_config: Dict[str, Any]) -> bool:
+        """Détermine si le fichier doit être importé en streaming"""
+        if file_format not in self.STREAMING_FORMATS:
+            return False
+        if layer_config.get('streaming') is not None:
+            return bool(layer_config['streaming'])
+        return file_size > self.STREAMING_THRESHOLD_BYTES
+    
+    def _fast_preview(self, file_path: str, file_format: str) -> Dict[str, Any]:
+        """Compte, emprise, CRS et schéma sans décoder l'ensemble des géométries"""
+        if file_format == 'TIFF':
+            return self._fast_preview_raster(file_path)
+        if file_format in ('CSV', 'TXT'):
+            return self._fast_preview_tabular(file_path, file_format)
+        
+        return self._fast_preview_ogr(self._ogr_source(file_path, file_format))
+    
+    def _fast_preview_ogr(self, source: str) -> Dict[str, Any]:
+        """Aperçu d'une source OGR à partir de ses métadonnées et d'un échantillon"""
+        info = pyogrio.read_info(source, force_feature_count=True, force_total_bounds=True)
+        sample = pyogrio.read_dataframe(source, max_features=self.PREVIEW_SAMPLE_SIZE)
+        geom_types = sample.geometry.geom_type.value_counts()
+        crs = info.get('crs')
+        
+        return {
+            'featureCount': int(info['features']) if info.get('features', -1) >= 0 else None,
+            'geometryTypes': geom_types.to_dict(),
+            'mainGeometryType': geom_types.index[0].upper() if not geom_types.empty else None,
+            'bounds': self._bounds_to_wgs84(info.get('total_bounds'), crs),
+            'crs': 'EPSG:4326' if crs else 'Unknown',
+            'originalCrs': crs or 'Unknown',
+            'fields': dict(zip(info['fields'].tolist(), info['dtypes'].tolist())),
+            'sampleSize': len(sample)
+        }
+    
+    def _preview_archive_datasets(self, datasets: List[Tuple[str, str, str]]) -> Dict[str, Any]:
+        """Aperçu par jeu de données d'une archive, avec totaux sur l'ensemble"""
+        summaries = []
+        geometry_types: Dict[str, int] = {}
+        bounds = None
+        feature_count = 0
+        for member, dataset_format, source in datasets:
+            summary: Dict[str, Any] = {'member': member, 'format': dataset_format}
+            try:
+                summary.update(self._fast_preview_ogr(source))
+            except Exception as e:
+                logger.warning(f"Aperçu impossible pour {member}: {str(e)}")
+                summary['error'] = str(e)
+                summaries.append(summary)
+                continue
+            summaries.append(summary)
+            feature_count += summary['featureCount'] or 0
+            for geom_type, count in summary['geometryTypes'].items():
+                geometry_types[geom_type] = geometry_types.get(geom_type, 0) + int(count)
+            if len(summary['bounds']) == 4:
+                bounds = summary['bounds'] if bounds is None else [
+                    min(bounds[0], summary['bounds'][0]), min(bounds[1], summary['bounds'][1]),
+                    max(bounds[2], summary['bounds'][2]), max(bounds[3], summary['bounds'][3])
+                ]
+        
+        if all('error' in summary for summary in summaries):
+            raise ValueError("Aucun jeu de données de l'archive n'a pu être lu")
+        return {
+            'featureCount': feature_count,
+            'geometryTypes': geometry_types,
+            'mainGeometryType': max(geometry_types, key=geometry_types.get).upper() if geometry_types else None,
+            'bounds': bounds or [],
+            'crs': 'EPSG:4326',
+            'datasets': summaries
+        }
+    
+    def _fast_preview_tabular(self, file_path: str, file_format: str) -> Dict[str, Any]:
+        """CSV/TXT : schéma, nombre de lignes et emprise sur le début et la fin du fichier
+        
+        Seuls PREVIEW_TABULAR_SAMPLE_BYTES sont lus à chaque extrémité. Au-delà,
+        le nombre de lignes est extrapolé de la taille moyenne d'une ligne
+        (featureCountEstimated) et l'emprise est celle des lignes lues
+        (boundsSampled) ; le mode 'full' donne les valeurs exactes."""
+        delimiter = self._sniff_delimiter(file_path, file_format)
+        file_size = os.path.getsize(file_path)
+        
+        with open(file_path, 'rb') as f:
+            head = f.read(self.PREVIEW_TABULAR_SAMPLE_BYTES)
+            complete = len(head) == file_size
+            tail = b''
+            if not complete:
+                # Dernière ligne lue probablement tronquée
+                head = head[:head.rfind(b'\n') + 1] or head
+                f.seek(max(file_size - self.PREVIEW_TABULAR_SAMPLE_BYTES, len(head)))
+                tail = f.read()
+                tail = tail[tail.find(b'\n') + 1:]
+        
+        rows = pd.read_csv(io.BytesIO(head), delimiter=delimiter)
+        sample = rows.head(self.PREVIEW_SAMPLE_SIZE)
+        if file_format == 'TXT':
+            coord_columns = (sample.columns[0], sample.columns[1])
+        else:
+            coord_columns = self._detect_coordinate_columns(sample)
+            if not coord_columns:
+                raise ValueError("Colonnes de coordonnées non trouvées")
+        
+        coords = rows[list(coord_columns)]
+        feature_count = len(rows)
+        if not complete:
+            header_size = head.find(b'\n') + 1
+            feature_count = round(len(rows) * (file_size - header_size) / max(len(head) - header_size, 1))
+            try:
+                tail_rows = pd.read_csv(
+                    io.BytesIO(tail), delimiter=delimiter, header=None,
+                    names=list(rows.columns), usecols=list(coord_columns)
+                )
+                coords = pd.concat([coords, tail_rows], ignore_index=True)
+            except (ValueError, pd.errors.ParserError):
+                # Fin de fichier illisible isolément (champ multiligne coupé)
+                pass
+        lon = pd.to_numeric(coords[coord_columns[0]], errors='coerce')
+        lat = pd.to_numeric(coords[coord_columns[1]], errors='coerce')
+        
+        return {
+            'featureCount': int(feature_count),
+            'featureCountEstimated': not complete,
+            'geometryTypes': {'Point': int(feature_count)},
+            'mainGeometryType': 'POINT',
+            'bounds': [float(lon.min()), float(lat.min()), float(lon.max()), float(lat.max())],
+            'boundsSampled': not complete,
+            'crs': 'EPSG:4326',
+            'fields': {col: str(dtype) for col, dtype in sample.dtypes.items()},
+            'sampleSize': len(sample)
+        }
+    
+    def _fast_preview_raster(self, file_path: str) -> Dict[str, Any]:
+        """TIFF : profil du raster ; le nombre de polygones n'est connu qu'à l'import"""
+        import rasterio
+        
+        with rasterio.open(file_path) as src:
+            crs = src.crs.to_string() if src.crs else None
+            return {
+                'featureCount': None,
+                'geometryTypes': {},
+                'mainGeometryType': 'POLYGON',
+                'bounds': self._bounds_to_wgs84(list(src.bounds), crs),
+                'crs': 'EPSG:4326' if crs else 'Unknown',
+                'originalCrs': crs or 'Unknown',
+                'raster': {
+                    'width': src.width,
+                    'height': src.height,
+                    'bandCount': src.count,
+                    'dtype': src.dtypes[0],
+                    'nodata': src.nodata
                 }
             }
+    
+    @staticmethod
+    def _bounds_to_wgs84(bounds, crs: Optional[str]) -> List[float]:
+        """Reprojette une emprise [minx, miny, maxx, maxy] en EPSG:4326"""
+        if bounds is None or len(bounds) != 4:
+            return []
+        bounds = [float(b) for b in bounds]
+        if not crs:
+            return bounds
+        from pyproj import CRS, Transformer
+        source_crs = CRS.from_user_input(crs)
+        if source_crs.to_epsg() == 4326:
+            return bounds
+        transformer = Transformer.from_crs(source_crs, 'EPSG:4326', always_xy=True)
+        return list(transformer.transform_bounds(*bounds))
+    
+    def _iter_file_batches(self, file_path: str, file_format: str) -> Iterator[gpd.GeoDataFrame]:
+        """Lit un fichier par lots de STREAMING_BATCH_SIZE features standardisées"""
+        if file_format in ('CSV', 'TXT'):
+            yield from self._iter_tabular_batches(file_path, file_format)
+            return
+        
+        yield from self._iter_ogr_batches(self._ogr_source(file_path, file_format))
+    
+    def _ogr_source(self, file_path: str, file_format: str) -> str:
+        """Chemin lisible par OGR (KML, Shapefile, GeoJSON) pour un fichier importé"""
+        if file_format == 'KMZ':
+            return self._kmz_kml_path(file_path)
+        if file_format == 'ZIP':
+            return self._zip_shapefile_path(file_path)
+        if file_format == 'RAR':
+            return self._rar_shapefile_path(file_path)
+        
+        if file_format == 'SHP':
+            self._check_shapefile_companions(file_path)
+        return file_path
+    
+    def _iter_ogr_batches(self, source: str) -> Iterator[gpd.GeoDataFrame]:
+        """Lecture par lots standardisés d'une source OGR (KML, Shapefile, GeoJSON)"""
+        yield from self._standardize_batches(self.profiler.iter_stage('parse', self._read_ogr_batches(source)))
+    
+    def _read_ogr_batches(self, source: str) -> Iterator[gpd.GeoDataFrame]:
+        """Lots bruts (CRS d'origine) d'une source OGR"""
+        batch_size = self.STREAMING_BATCH_SIZE
+        
+        if PYARROW_AVAILABLE:
+            # Flux Arrow : un seul passage sur le fichier, géométries en WKB
+            with pyogrio.open_arrow(source, batch_size=batch_size, use_pyarrow=True) as (meta, reader):
+                geometry_name = meta.get('geometry_name') or 'wkb_geometry'
+                for record_batch in reader:
+                    df = record_batch.to_pandas()
+                    geometry = shapely.from_wkb(df.pop(geometry_name).to_numpy())
+                    yield gpd.GeoDataFrame(df, geometry=geometry, crs=meta.get('crs'))
+            return
+        
+        offset = 0
+        while True:
+            gdf = pyogrio.read_dataframe(source, skip_features=offset, max_features=batch_size)
+            if gdf.empty:
+                break
+            read_count = len(gdf)
+            yield gdf
+            offset += read_count
+            if read_count < batch_size:
+                break
+    
+    def _iter_tabular_batches(self, file_path: str, file_format: str) -> Iterator[gpd.GeoDataFrame]:
+        """Lecture par lots d'un CSV/TXT de coordonnées
+        
+        Le délimiteur et les colonnes de coordonnées sont déterminés sur un
+        échantillon de tête ; les points de chaque bloc sont construits en une
+        seule opération vectorisée."""
+        delimiter = self._sniff_delimiter(file_path, file_format)
+        sample = pd.read_csv(file_path, delimiter=delimiter, nrows=self.PREVIEW_SAMPLE_SIZE)
+        
+        if file_format == 'TXT':
+            # Les deux premières colonnes sont les coordonnées
+            if len(sample.columns) < 2:
+                raise ValueError("Format TXT non reconnu")
+            coord_columns = (sample.columns[0], sample.columns[1])
+        else:
+            coord_columns = self._detect_coordinate_columns(sample)
+            if not coord_columns:
+                raise ValueError("Colonnes de coordonnées non trouvées")
+        
+        points = self._iter_tabular_points(file_path, file_format, delimiter, coord_columns)
+        for gdf in self._standardize_batches(self.profiler.iter_stage('parse', points)):
+            for start in range(0, len(gdf), self.STREAMING_BATCH_SIZE):
+                yield gdf.iloc[start:start + self.STREAMING_BATCH_SIZE]
+    
+    def _iter_tabular_points(self, file_path: str, file_format: str, delimiter: str,
+                             coord_columns: Tuple[str, str]) -> Iterator[gpd.GeoDataFrame]:
+        """Points bruts de chaque bloc d'un CSV/TXT"""
+        for frame in self._iter_tabular_frames(file_path, delimiter, coord_columns):
+            lon_col, lat_col = coord_columns
+            if file_format == 'TXT':
+                frame.columns = ['longitude', 'latitude'] + list(frame.columns[2:])
+                lon_col, lat_col = 'longitude', 'latitude'
             
-            # Création de la couche
-            layer = GeospatialLayer(
-                name=layer_config.get('name', f'Import {file_format}'),
-                description=layer_config.get('description', f'Données importées depuis {os.path.basename(file_path)}'),
-                layer_type=layer_config.get('layer_type', 'custom'),
-                geometry_type=main_geom_type,
-                source_format=file_format,
-                source_path=file_path,
-                status=layer_config.get('status', 'actif'),
-                geom=ST_GeomFromText(geom_wkt, 4326),
-                metadata=metadata_dict
-            )
+            # Lignes sans coordonnées numériques ignorées
+            x = pd.to_numeric(frame[lon_col], errors='coerce')
+            y = pd.to_numeric(frame[lat_col], errors='coerce')
+            has_coords = x.notna() & y.notna()
+            if not has_coords.all():
+                frame, x, y = frame[has_coords], x[has_coords], y[has_coords]
             
-            # Application du style par défaut
-            layer.set_default_style_by_type()
+            yield gpd.GeoDataFrame(frame, geometry=gpd.points_from_xy(x, y), crs='EPSG:4326')
+    
+    def _iter_tabular_frames(self, file_path: str, delimiter: str,
+                             coord_columns: Tuple[str, str]) -> Iterator[pd.DataFrame]:
+        """Blocs successifs d'un fichier délimité (lecteur CSV pyarrow si disponible)
+        
+        pyarrow déduit les types sur le premier bloc ; si un bloc suivant ne
+        s'y conforme pas, pandas relit le fichier depuis le début et écarte les
+        enregistrements déjà produits. Le décompte porte sur les enregistrements
+        et non sur les lignes physiques, que les champs multilignes entre
+        guillemets rendent différentes."""
+        rows_read = 0
+        if PYARROW_AVAILABLE:
+            import pyarrow as pa
+            from pyarrow import csv as pa_csv
             
-            return layer
+            try:
+                reader = pa_csv.open_csv(
+                    file_path,
+                    read_options=pa_csv.ReadOptions(block_size=self.TABULAR_BLOCK_SIZE),
+                    parse_options=pa_csv.ParseOptions(delimiter=delimiter),
+                    convert_options=pa_csv.ConvertOptions(
+                        column_types={col: pa.float64() for col in coord_columns}
+                    )
+                )
+                for record_batch in reader:
+                    frame = record_batch.to_pandas()
+                    rows_read += len(frame)
+                    yield frame
+                return
+            except pa.ArrowInvalid as e:
+                logger.warning(f"Lecture pyarrow interrompue ({str(e)}), reprise avec pandas après {rows_read} enregistrements")
+        
+        skip = rows_read
+        for frame in pd.read_csv(file_path, delimiter=delimiter, chunksize=self.STREAMING_BATCH_SIZE):
+            if skip:
+                if len(frame) <= skip:
+                    skip -= len(frame)
+                    continue
+                frame = frame.iloc[skip:]
+                skip = 0
+            yield frame
+    
+    def _sniff_delimiter(self, file_path: str, file_format: str) -> str:
+        """Détecte le délimiteur sur les premières lignes (une seule lecture de TABULAR_SNIFF_BYTES)"""
+        candidates = self.TXT_DELIMITERS if file_format == 'TXT' else self.CSV_DELIMITERS
+        
+        with open(file_path, 'rb') as f:
+            head = f.read(self.TABULAR_SNIFF_BYTES)
+        lines = [line for line in head.decode('utf-8', errors='replace').splitlines() if line.strip()]
+        if len(head) == self.TABULAR_SNIFF_BYTES and len(lines) > 1:
+            # Dernière ligne probablement tronquée
+            lines = lines[:-1]
+        lines = lines[:50]
+        if not lines:
+            raise ValueError(f"Format {file_format} non reconnu")
+        
+        # Premier candidat présent le même nombre de fois sur chaque ligne
+        for delimiter in candidates:
+            counts = {line.count(delimiter) for line in lines}
+            if len(counts) == 1 and counts.pop() >= 1:
+                return delimiter
+        
+        # Sinon, le candidat le plus fréquent dans l'en-tête
+        delimiter = max(candidates, key=lambda d: lines[0].count(d))
+        if lines[0].count(delimiter) == 0:
+            raise ValueError(f"Format {file_format} non reconnu")
+        return delimiter
+    
+    def _iter_dataframe_batches(self, gdf: gpd.GeoDataFrame) -> Iterator[gpd.GeoDataFrame]:
+        """Découpe un GeoDataFrame déjà chargé en lots"""
+        for start in range(0, len(gdf), self.STREAMING_BATCH_SIZE):
+            yield gdf.iloc[start:start + self.STREAMING_BATCH_SIZE]
+    
+    def _import_batches(self, batches: Iterator[gpd.GeoDataFrame], layer_config: Dict[str, Any],
+                        file_format: str, file_path: str, upload_record: LayerUploadHistory,
+                        start_time: datetime) -> Tuple[bool, str, Optional[GeospatialLayer]]:
+        """Crée la couche à partir des lots puis finalise l'historique d'upload"""
+        loaded = self._load_layer(batches, layer_config, file_format, file_path)
+        if loaded is None:
+            return self._fail_upload(upload_record, "Aucune donnée géospatiale trouvée dans le fichier")
+        layer, summary = loaded
+        
+        processing_time = (datetime.now() - start_time).total_seconds()
+        upload_record.layer_id = layer.id
+        upload_record.upload_status = 'success'
+        upload_record.features_count = summary['features_count']
+        upload_record.processing_time_seconds = processing_time
+        upload_record.processed_at = datetime.now()
+        upload_record.file_metadata = {
+            **(upload_record.file_metadata or {}),
+            'crs': summary['crs'],
+            'bounds': summary['bounds'],
+            'geometry_types': list(summary['geometry_types'].keys()),
+            'geometry_repair': dict(self.repair_stats)
+        }
+        with self.profiler.stage('commit'):
+            db.session.commit()
+        
+        logger.info(f"Import réussi: {summary['features_count']} features en {processing_time:.2f}s")
+        return True, f"Import réussi: {summary['features_count']} features importées", layer
+    
+    def _load_layer(self, batches: Iterator[gpd.GeoDataFrame], layer_config: Dict[str, Any],
+                    file_format: str, file_path: str) -> Optional[Tuple[GeospatialLayer, Dict[str, Any]]]:
+        """Valide et insère les features lot par lot, puis valide la transaction.
+        
+        Chaque feature est stockée dans geospatial_features avec ses attributs.
+        Seuls les compteurs et l'emprise sont conservés entre deux lots, la
+        mémoire utilisée ne dépend donc pas de la taille du fichier.
+        Retourne None si aucun lot ne contient de feature."""
+        layer = None
+        crs = 'Unknown'
+        fields: List[str] = []
+        features_count = 0
+        geom_type_counts: Dict[str, int] = {}
+        bounds = None
+        loader = FeatureBatchLoader(
+            db.session,
+            method=self._select_load_method(file_path, layer_config),
+            use_staging=self.BULK_LOAD_USE_STAGING,
+            profiler=self.profiler
+        )
+        
+        for batch in batches:
+            if batch is None or batch.empty:
+                continue
             
-        except Exception as e:
-            logger.error(f"Erreur création couche: {str(e)}", exc_info=True)
+            with self.profiler.stage('validate'):
+                is_valid, message = self._validate_geodataframe(batch)
+            if not is_valid:
+                raise ValueError(message)
+            
+            if layer is None:
+                crs = str(batch.crs) if batch.crs else 'Unknown'
+                fields = [col for col in batch.columns if col != batch.geometry.name]
+                layer = GeospatialLayer(
+                    name=layer_config.get('name', f'Import {file_format}'),
+                    description=layer_config.get('description', f'Données importées depuis {os.path.basename(file_path)}'),
+                    layer_type=layer_config.get('layer_type', 'custom'),
+                    geometry_type=self._main_geometry_type(batch.geometry.geom_type.value_counts().to_dict(), len(batch)),
+                    source_format=file_format,
+                    source_path=file_path,
+                    status=layer_config.get('status', 'actif')
+                )
+                db.session.add(layer)
+                db.session.flush()
+            
+            for geom_type, count in batch.geometry.geom_type.value_counts().items():
+                geom_type_counts[geom_type] = geom_type_counts.get(geom_type, 0) + int(count)
+            
+            batch_bounds = batch.total_bounds.tolist()
+            bounds = batch_bounds if bounds is None else [
+                min(bounds[0], batch_bounds[0]), min(bounds[1], batch_bounds[1]),
+                max(bounds[2], batch_bounds[2]), max(bounds[3], batch_bounds[3])
+            ]
+            
+            loader.load(layer.id, batch, features_count)
+            features_count += len(batch)
+            logger.info(f"Lot inséré: {features_count} features")
+        
+        if layer is None:
             return None
+        
+        # Géométrie agrégée de la couche (compatibilité des vues et statistiques existantes)
+        with self.profiler.stage('db_insert'):
+            self._refresh_layer_geometry(layer.id)
+        
+        # Versions simplifiées servies aux zooms faibles
+        with self.profiler.stage('simplify'):
+            refresh_simplified_geometries(db.session, layer.id)
+        
+        layer.geometry_type = self._main_geometry_type(geom_type_counts, features_count)
+        layer.set_default_style_by_type()
+        layer.layer_metadata = {
+            'fields': fields,
+            'source_info': {
+                'original_crs': crs,
+                'feature_count': features_count,
+                'geometry_types': geom_type_counts,
+                'bounds': bounds
+            },
+            'processing_info': {
+                'import_date': datetime.now().isoformat(),
+                'file_size_bytes': os.path.getsize(file_path),
+                'batch_size': self.STREAMING_BATCH_SIZE,
+                'load_method': loader.method
+            }
+        }
+        with self.profiler.stage('commit'):
+            db.session.commit()
+        # Réponses cartographiques sur l'ensemble des couches (tuiles, GeoJSON),
+        # désormais incomplètes
+        get_response_cache().invalidate_layer(layer.id)
+        
+        return layer, {
+            'crs': crs,
+            'bounds': bounds,
+            'geometry_types': geom_type_counts,
+            'features_count': features_count
+        }
+    
+    def _import_archive_datasets(self, datasets: List[Tuple[str, str, str]], layer_config: Dict[str, Any],
+                                 file_format: str, file_path: str, upload_record: LayerUploadHistory,
+                                 start_time: datetime) -> Tuple[bool, str, Optional[GeospatialLayer]]:
+        """Importe chaque jeu de données d'une archive comme une couche distincte.
+        
+        Chaque jeu de données est lu par lots (flux Arrow) et standardisé dans
+        le pool de processus géométrique, comme un fichier isolé : la mémoire
+        reste constante quelle que soit la taille de l'archive. Chaque couche
+        est validée (commit) dès son insertion, l'échec d'un jeu de données
+        n'annule pas les autres."""
+        logger.info(f"Archive {file_format} multi-couches: {len(datasets)} jeux de données")
+        base_name = layer_config.get('name') or f'Import {file_format}'
+        results: List[Dict[str, Any]] = []
+        layers: List[GeospatialLayer] = []
+        
+        for member, dataset_format, source in datasets:
+            result: Dict[str, Any] = {'member': member, 'format': dataset_format}
+            stats_before = dict(self.repair_stats)
+            try:
+                dataset_config = {
+                    **layer_config,
+                    'name': f"{base_name} - {Path(member).stem}",
+                    'description': layer_config.get('description') or f'Données importées depuis {member} ({os.path.basename(file_path)})'
+                }
+                loaded = self._load_layer(self._iter_ogr_batches(source), dataset_config, dataset_format, file_path)
+                if loaded is None:
+                    raise ValueError("Aucune donnée géospatiale trouvée")
+                layer, summary = loaded
+                layers.append(layer)
+                result.update({
+                    'status': 'success',
+                    'layerId': layer.id,
+                    'featuresCount': summary['features_count'],
+                    'geometryTypes': list(summary['geometry_types'].keys()),
+                    'geometryRepair': {
+                        key: self.repair_stats[key] - stats_before.get(key, 0) for key in self.repair_stats
+                    }
+                })
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Erreur import {member}: {str(e)}")
+                result.update({'status': 'error', 'error': str(e)})
+            results.append(result)
+        
+        features_count = sum(r.get('featuresCount', 0) for r in results)
+        processing_time = (datetime.now() - start_time).total_seconds()
+        upload_record.file_metadata = {
+            **(upload_record.file_metadata or {}),
+            'datasets': results,
+            'geometry_repair': dict(self.repair_stats)
+        }
+        upload_record.processing_time_seconds = processing_time
+        upload_record.processed_at = datetime.now()
+        
+        if not layers:
+            upload_record.upload_status = 'error'
+            upload_record.error_message = "Aucun jeu de données de l'archive n'a pu être importé"
+            db.session.commit()
+            return False, upload_record.error_message, None
+        
+        upload_record.layer_id = layers[0].id
+        upload_record.upload_status = 'success'
+        upload_record.features_count = features_count
+        db.session.commit()
+        
+        failed = len(results) - len(layers)
+        message = f"Import réussi: {len(layers)} couches, {features_count} features importées"
+        if failed:
+            message += f" ({failed} jeu(x) de données en erreur)"
+        logger.info(f"{message} en {processing_time:.2f}s")
+        return True, message, layers[0]
+    
+    @staticmethod
+    def _main_geometry_type(geom_type_counts: Dict[str, int], features_count: int) -> str:
+        """Type de géométrie principal de la couche (POINT, MULTIPOLYGON, ...)"""
+        families: Dict[str, int] = {}
+        for geom_type, count in geom_type_counts.items():
+            family = geom_type.replace('Multi', '').upper()
+            families[family] = families.get(family, 0) + count
+        main_family = max(families, key=families.get)
+        
+        if features_count == 1 and main_family in (t.upper() for t in geom_type_counts):
+            return main_family
+        return f'MULTI{main_family}'
+    
+    def _select_load_method(self, file_path: str, layer_config: Dict[str, Any]) -> str:
+        """COPY pour les gros fichiers, INSERT par lots sinon ('bulk_load' force le choix)"""
+        bulk_load = layer_config.get('bulk_load')
+        if bulk_load is not None:
+            return 'copy' if bulk_load else 'insert'
+        return 'copy' if os.path.getsize(file_path) > self.BULK_LOAD_THRESHOLD_BYTES else 'insert'
+    
+    def _refresh_layer_geometry(self, layer_id: int):
+        """Recalcule la géométrie agrégée d'une couche à partir de ses features"""
+        db.session.execute(
+            text("""
+                UPDATE geospatial_layers SET geom = (
+                    SELECT CASE WHEN ST_NumGeometries(c.g) = 1 THEN ST_GeometryN(c.g, 1) ELSE c.g END
+                    FROM (
+                        SELECT ST_Collect(parts.g) AS g FROM (
+                            SELECT (ST_Dump(geom)).geom AS g
+                            FROM geospatial_features WHERE layer_id = :layer_id
+                        ) AS parts
+                    ) AS c
+                )
+                WHERE id = :layer_id
+            """),
+            {'layer_id': layer_id}
+        )
     
     def cleanup(self):
         """Nettoyage des fichiers temporaires"""
+        if self._temp_dir is None:
+            return
         try:
-            import shutil
-            shutil.rmtree(self.temp_dir, ignore_errors=True)
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+            self._temp_dir = None
             logger.info("Nettoyage des fichiers temporaires terminé")
         except Exception as e:
             logger.warning(f"Erreur lors du nettoyage: {str(e)}")
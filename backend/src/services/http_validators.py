@@ -0,0 +1,66 @@
+"""
+Requêtes conditionnelles (ETag / Last-Modified) pour les données cartographiques
+
+La version des données est lue par une requête d'agrégat par table
+(nombre de lignes, max(updated_at)) sans charger aucune géométrie. Un
+client qui renvoie If-None-Match ou If-Modified-Since reçoit un 304 tant
+que les tables n'ont pas changé.
+
+Le nombre de lignes couvre les suppressions physiques, que max(updated_at)
+ne voit pas : If-None-Match, prioritaire lorsqu'il est présent, est donc le
+validateur fiable ; If-Modified-Since n'est consulté qu'en son absence.
+
+L'ETag est faible (W/) : il identifie la version des données, pas les
+octets envoyés, qui diffèrent selon l'encodage négocié (identité, gzip,
+brotli). La comparaison If-None-Match est donc faible elle aussi.
+"""
+
+import json
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Iterable, Optional, Tuple
+
+from flask import request, current_app
+
+from src.services.response_cache import table_version
+
+
+def data_validators(models: Iterable[Any], params: Optional[Any] = None) -> Tuple[str, Optional[datetime]]:
+    """ETag (valeur, sans W/) et date de dernière modification des tables d'une réponse
+
+    params distingue les variantes d'une même ressource (paramètres de requête)."""
+    versions = []
+    last_modified = None
+    for model in models:
+        count, updated_at = table_version(model)
+        versions.append([model.__tablename__, count, updated_at.isoformat() if updated_at else None])
+        if updated_at is not None and (last_modified is None or updated_at > last_modified):
+            last_modified = updated_at
+    payload = json.dumps([versions, params], sort_keys=True, default=str)
+    etag = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    # updated_at est stocké en UTC naïf
+    if last_modified is not None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+    return etag, last_modified
+
+
+def is_not_modified(etag: str, last_modified: Optional[datetime]) -> bool:
+    """Vrai si la copie du client (If-None-Match / If-Modified-Since) est à jour"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def with_validators(response, etag: str, last_modified: Optional[datetime]):
+    """Ajoute ETag et Last-Modified ; le client revalide à chaque affichage"""
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response
+
+
+def not_modified_response(etag: str, last_modified: Optional[datetime]):
+    return with_validators(current_app.response_class(status=304), etag, last_modified)
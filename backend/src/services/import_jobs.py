@@ -0,0 +1,147 @@
+"""
+File d'attente des imports géospatiaux pour ODG
+
+Les uploads sont enregistrés immédiatement dans LayerUploadHistory (statut
+'pending') puis traités en arrière-plan par un pool de workers borné.
+Le client suit la progression via l'identifiant de l'historique
+(pending -> processing -> success/error).
+"""
+
+import os
+import shutil
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ImportJobQueue:
+    """Pool borné de workers exécutant GeospatialImportService.import_file"""
+
+    DEFAULT_MAX_WORKERS = 2
+    DEFAULT_QUEUE_SIZE = 20
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, max_queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.max_workers = max(1, max_workers)
+        self.max_queue_size = max(0, max_queue_size)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix='odg_import'
+        )
+        # Un "slot" par job en cours ou en attente : au-delà, les uploads sont refusés
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue_size)
+        self._lock = threading.Lock()
+        self._active_jobs = 0
+        self._queued_jobs = 0
+        logger.info(
+            f"File d'import initialisée ({self.max_workers} workers, "
+            f"{self.max_queue_size} jobs en attente max)"
+        )
+
+    def submit(self, app, upload_id: int, file_path: str, layer_config: Dict[str, Any],
+               cleanup_dir: Optional[str] = None) -> bool:
+        """
+        Planifie l'import d'un fichier déjà sauvegardé sur disque
+
+        Args:
+            app: Application Flask (nécessaire pour le contexte base de données)
+            upload_id: ID de l'enregistrement LayerUploadHistory associé
+            file_path: Chemin du fichier à importer
+            layer_config: Configuration de la couche
+            cleanup_dir: Dossier temporaire à supprimer une fois le job terminé
+
+        Returns:
+            False si la file d'attente est pleine
+        """
+        if not self._slots.acquire(blocking=False):
+            logger.warning(f"File d'import pleine, upload {upload_id} refusé")
+            return False
+
+        with self._lock:
+            self._queued_jobs += 1
+
+        future = self._executor.submit(self._run, app, upload_id, file_path, layer_config, cleanup_dir)
+        future.add_done_callback(lambda _: self._slots.release())
+        logger.info(f"Upload {upload_id} ajouté à la file d'import")
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """Retourne l'état courant de la file"""
+        with self._lock:
+            return {
+                'maxWorkers': self.max_workers,
+                'maxQueueSize': self.max_queue_size,
+                'activeJobs': self._active_jobs,
+                'queuedJobs': self._queued_jobs
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Arrête le pool de workers"""
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, app, upload_id: int, file_path: str, layer_config: Dict[str, Any],
+             cleanup_dir: Optional[str]):
+        """Exécute un job d'import dans le contexte de l'application"""
+        from src.models.geospatial_layers import LayerUploadHistory, db
+        from src.services.geospatial_import import GeospatialImportService
+
+        with self._lock:
+            self._queued_jobs -= 1
+            self._active_jobs += 1
+
+        try:
+            with app.app_context():
+                import_service = GeospatialImportService()
+                try:
+                    success, message, _ = import_service.import_file(
+                        file_path, layer_config, upload_id=upload_id
+                    )
+                    logger.info(f"Job d'import {upload_id} terminé: {message}")
+                except Exception as e:
+                    # import_file gère ses propres erreurs ; filet de sécurité pour le statut
+                    logger.error(f"Erreur inattendue job d'import {upload_id}: {str(e)}", exc_info=True)
+                    db.session.rollback()
+                    upload_record = db.session.get(LayerUploadHistory, upload_id)
+                    if upload_record and upload_record.upload_status not in ('success', 'error'):
+                        upload_record.upload_status = 'error'
+                        upload_record.error_message = str(e)
+                        upload_record.processed_at = datetime.now()
+                        db.session.commit()
+                finally:
+                    import_service.cleanup()
+                    db.session.remove()
+        finally:
+            if cleanup_dir:
+                shutil.rmtree(cleanup_dir, ignore_errors=True)
+            elif os.path.exists(file_path):
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    pass
+            with self._lock:
+                self._active_jobs -= 1
+
+
+# Instance singleton de la file d'import
+_import_job_queue: Optional[ImportJobQueue] = None
+_import_job_queue_lock = threading.Lock()
+
+
+def get_import_job_queue(config: Optional[Dict[str, Any]] = None) -> ImportJobQueue:
+    """Retourne l'instance singleton de la file d'import.
+
+    La taille du pool et de la file est lue dans la configuration Flask
+    (IMPORT_MAX_WORKERS, IMPORT_QUEUE_SIZE) lors de la première création."""
+    global _import_job_queue
+    if _import_job_queue is None:
+        with _import_job_queue_lock:
+            if _import_job_queue is None:
+                config = config or {}
+                _import_job_queue = ImportJobQueue(
+                    max_workers=int(config.get('IMPORT_MAX_WORKERS', ImportJobQueue.DEFAULT_MAX_WORKERS)),
+                    max_queue_size=int(config.get('IMPORT_QUEUE_SIZE', ImportJobQueue.DEFAULT_QUEUE_SIZE))
+                )
+    return _import_job_queue
@@ -0,0 +1,130 @@
+"""
+Profil d'exécution des imports géospatiaux
+
+Chaque import mesure la durée de ses étapes (écriture de l'upload, ouverture
+d'archive, lecture, reprojection, validation, construction des géométries,
+insertion, simplification par bande de zoom, commit) et le pic de mémoire
+Python relevé par tracemalloc.
+Le profil est stocké dans LayerUploadHistory.file_metadata['profile'].
+
+Les étapes sont des durées réelles du thread d'import, exclusives : une
+étape ouverte à l'intérieur d'une autre suspend le chronomètre de la
+première. La reprojection et la réparation s'exécutant dans le pool
+géométrique, leurs durées ('geometryStages') sont des temps cumulés des
+workers, qui peuvent dépasser la durée de l'étape 'standardize' lorsque
+plusieurs workers travaillent en parallèle. tracemalloc étant global au processus, le pic
+mémoire d'imports simultanés est celui de l'ensemble des imports en cours.
+"""
+
+import time
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Iterable, Optional
+
+IMPORT_STAGES = (
+    'upload_write', 'hash', 'archive_open', 'parse', 'standardize', 'validate',
+    'geometry_build', 'db_insert', 'simplify', 'commit'
+)
+GEOMETRY_STAGES = ('reproject', 'repair')
+
+# tracemalloc reste actif tant qu'un import est profilé
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False
+
+
+class ImportProfiler:
+    """Chronomètre par étape et pic mémoire d'un import"""
+
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.stages: Dict[str, float] = {}
+        self.geometry_stages: Dict[str, float] = {}
+        self._stack = []
+        self._started_at: Optional[float] = None
+        self._tracing = False
+
+    def start(self):
+        self._started_at = time.perf_counter()
+        if self.trace_memory:
+            _start_tracing()
+            self._tracing = True
+
+    def stop(self) -> Dict[str, Any]:
+        """Arrête le profilage et retourne le profil"""
+        peak = None
+        if self._tracing:
+            peak = tracemalloc.get_traced_memory()[1]
+            _stop_tracing()
+            self._tracing = False
+        total = time.perf_counter() - self._started_at if self._started_at else None
+        self._started_at = None
+        profile = self.to_dict(total)
+        profile['memoryPeakBytes'] = peak
+        return profile
+
+    def add(self, stage: str, seconds: float):
+        """Ajoute une durée mesurée ailleurs (ex: écriture de l'upload par la route)"""
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def add_geometry_timings(self, timings: Dict[str, float]):
+        """Cumule les durées rapportées par standardize_geodataframe"""
+        for stage, seconds in timings.items():
+            self.geometry_stages[stage] = self.geometry_stages.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str):
+        now = time.perf_counter()
+        if self._stack:
+            parent, started = self._stack[-1]
+            self.add(parent, now - started)
+        self._stack.append((name, now))
+        try:
+            yield
+        finally:
+            name, started = self._stack.pop()
+            now = time.perf_counter()
+            self.add(name, now - started)
+            if self._stack:
+                parent, _ = self._stack[-1]
+                self._stack[-1] = (parent, now)
+
+    def iter_stage(self, name: str, iterable: Iterable) -> Iterator:
+        """Attribue à l'étape le temps passé à produire chaque élément"""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def to_dict(self, total_seconds: Optional[float] = None) -> Dict[str, Any]:
+        ordered = {name: round(self.stages[name], 4) for name in IMPORT_STAGES if name in self.stages}
+        ordered.update({name: round(value, 4) for name, value in self.stages.items() if name not in ordered})
+        return {
+            'stages': ordered,
+            'geometryStages': {name: round(value, 4) for name, value in self.geometry_stages.items()},
+            'totalSeconds': round(total_seconds, 4) if total_seconds is not None else None
+        }
+
+
+def _start_tracing():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        if _tracing_users == 0:
+            # Un traçage démarré hors des imports n'est pas arrêté à la fin
+            _tracing_owned = not tracemalloc.is_tracing()
+            if _tracing_owned:
+                tracemalloc.start()
+        _tracing_users += 1
+
+
+def _stop_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
@@ -0,0 +1,116 @@
+"""
+Réponses JSON envoyées au fil de l'eau, compressées selon Accept-Encoding
+
+jsonify construit tout le document en mémoire avant le premier octet. Ici,
+l'enveloppe JSON est écrite autour d'un tableau dont les éléments sont
+sérialisés un par un, regroupés en morceaux d'environ STREAM_CHUNK_BYTES,
+puis compressés à la volée (brotli si le module est installé et accepté par
+le client, sinon gzip).
+"""
+
+import json
+import zlib
+import logging
+from typing import Dict, Any, Callable, Iterable, Iterator, Optional, Union
+
+from flask import request, current_app, stream_with_context
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+    logger.info("Module brotli non disponible - compression gzip uniquement")
+
+# Taille des morceaux envoyés au client (avant compression)
+STREAM_CHUNK_BYTES = 64 * 1024
+GZIP_LEVEL = 5
+# Qualité brotli adaptée à la compression à la volée (11 = maximum, lent)
+BROTLI_QUALITY = 5
+
+
+def iter_json_object(head: Dict[str, Any], key: str, items: Iterable[Any],
+                     tail: Optional[Callable[[int], Dict[str, Any]]] = None,
+                     raw: bool = False) -> Iterator[str]:
+    """Objet JSON dont le membre key est un tableau écrit élément par élément
+
+    head : membres écrits avant le tableau ; tail(count) : membres écrits
+    après, calculés une fois le nombre d'éléments connu ; raw : éléments déjà
+    sérialisés (texte JSON produit par PostGIS)."""
+    opening = json.dumps(head, default=str)[:-1]
+    chunk = [opening + (', ' if head else '') + json.dumps(key) + ': [']
+    size = 0
+    count = 0
+    for item in items:
+        text = item if raw else json.dumps(item, default=str)
+        if count:
+            chunk.append(',')
+        chunk.append(text)
+        count += 1
+        size += len(text)
+        if size >= STREAM_CHUNK_BYTES:
+            yield ''.join(chunk)
+            chunk = []
+            size = 0
+    chunk.append(']')
+    for name, value in (tail(count) if tail else {}).items():
+        chunk.append(', ' + json.dumps(name) + ': ' + json.dumps(value, default=str))
+    chunk.append('}')
+    yield ''.join(chunk)
+
+
+def negotiate_encoding() -> Optional[str]:
+    """Encodage de contenu accepté par le client : 'br', 'gzip' ou None"""
+    accepted = request.accept_encodings
+    if BROTLI_AVAILABLE and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_chunks(chunks: Iterable[Union[str, bytes]], encoding: str) -> Iterator[bytes]:
+    """Compresse un flux de morceaux sans le matérialiser"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        compress, flush = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31 : en-tête gzip
+        compress, flush = compressor.compress, compressor.flush
+    for chunk in chunks:
+        data = compress(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        if data:
+            yield data
+    yield flush()
+
+
+def streaming_response(chunks: Iterable[Union[str, bytes]], mimetype: str = 'application/json', status: int = 200,
+                       compress: bool = True):
+    """Réponse envoyée morceau par morceau, compressée si le client l'accepte
+
+    compress=False pour les formats déjà compressés (GeoParquet)."""
+    encoding = negotiate_encoding() if compress else None
+    chunks = _logged(chunks, request.path)
+    body = compress_chunks(chunks, encoding) if encoding else _encoded(chunks)
+    response = current_app.response_class(stream_with_context(body), mimetype=mimetype, status=status)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if compress:
+        response.vary.add('Accept-Encoding')
+    return response
+
+
+def _encoded(chunks: Iterable[Union[str, bytes]]) -> Iterator[bytes]:
+    for chunk in chunks:
+        yield chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+
+
+def _logged(chunks: Iterable[Union[str, bytes]], path: str) -> Iterator[Union[str, bytes]]:
+    """Journalise les erreurs survenues après l'envoi des en-têtes (réponse tronquée)"""
+    try:
+        yield from chunks
+    except Exception as e:
+        logger.error(f"Erreur pendant l'envoi de {path}: {str(e)}")
+        raise
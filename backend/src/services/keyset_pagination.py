@@ -0,0 +1,111 @@
+"""
+Pagination par curseur (keyset) pour les listes ODG
+
+paginate() émet un COUNT(*) puis un OFFSET dont le coût croît avec le
+numéro de page. Ici, la page suivante est lue après la dernière ligne
+renvoyée : WHERE (created_at, id) < (:created_at, :id) ORDER BY created_at
+DESC, id DESC LIMIT n, servi par un index (created_at, id) quelle que soit
+la profondeur. Le curseur est opaque pour le client (JSON en base64 url).
+
+Le total n'est renvoyé que sur demande (with_total=true), sous forme
+d'estimation du planificateur (EXPLAIN) : aucun parcours de la table.
+Le paramètre page reste accepté (pagination par OFFSET) pour les clients
+existants.
+"""
+
+import json
+import base64
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import tuple_
+
+from src.models.mining_data import db
+
+DEFAULT_PAGE_SIZE = 20
+# Plafond de per_page, quel que soit l'endpoint
+MAX_PAGE_SIZE = 100
+
+
+def paginate_request(query, order_column, id_column, args,
+                     default_per_page: int = DEFAULT_PAGE_SIZE) -> Tuple[List[Any], Dict[str, Any]]:
+    """(éléments, bloc pagination) de query selon les paramètres de requête
+
+    - cursor : curseur renvoyé par la page précédente (next_cursor)
+    - per_page : taille de page, plafonnée à MAX_PAGE_SIZE
+    - with_total : ajoute estimated_total (estimation du planificateur)
+    - page : pagination par OFFSET (compatibilité), ignorée si cursor est présent
+
+    ValueError si le curseur est invalide."""
+    per_page = min(max(args.get('per_page', default_per_page, type=int), 1), MAX_PAGE_SIZE)
+    cursor = args.get('cursor')
+    if not cursor and args.get('page') is not None:
+        return _offset_page(query, order_column, id_column, args.get('page', 1, type=int), per_page)
+
+    items, next_cursor = keyset_page(query, order_column, id_column, cursor, per_page)
+    pagination = {
+        'per_page': per_page,
+        'cursor': cursor or None,
+        'next_cursor': next_cursor,
+        'has_next': next_cursor is not None,
+        'has_prev': bool(cursor)
+    }
+    if args.get('with_total', 'false').lower() == 'true':
+        pagination['estimated_total'] = estimated_count(query)
+    return items, pagination
+
+
+def keyset_page(query, order_column, id_column, cursor: Optional[str],
+                per_page: int) -> Tuple[List[Any], Optional[str]]:
+    """Page suivant le curseur (ordre décroissant) et curseur de la page d'après, ou None"""
+    page_query = query.order_by(None).order_by(order_column.desc(), id_column.desc())
+    if cursor:
+        page_query = page_query.filter(tuple_(order_column, id_column) < decode_cursor(cursor))
+    rows = page_query.limit(per_page + 1).all()
+    items = rows[:per_page]
+    if len(rows) <= per_page:
+        return items, None
+    last = items[-1]
+    return items, encode_cursor(getattr(last, order_column.key), getattr(last, id_column.key))
+
+
+def encode_cursor(position: datetime, row_id: int) -> str:
+    payload = json.dumps([position.isoformat(), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """(date, id) d'un curseur ; ValueError s'il est invalide"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        position, row_id = json.loads(payload)
+        return datetime.fromisoformat(position), int(row_id)
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise ValueError("cursor invalide")
+
+
+def estimated_count(query) -> int:
+    """Nombre de lignes estimé par le planificateur (EXPLAIN), sans parcourir la table"""
+    compiled = query.order_by(None).statement.compile(
+        dialect=db.engine.dialect, compile_kwargs={'render_postcompile': True}
+    )
+    plan = db.session.connection().exec_driver_sql(
+        'EXPLAIN (FORMAT JSON) ' + str(compiled), compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def _offset_page(query, order_column, id_column, page: int, per_page: int) -> Tuple[List[Any], Dict[str, Any]]:
+    paginated = query.order_by(None).order_by(order_column.desc(), id_column.desc()).paginate(
+        page=page, per_page=per_page, error_out=False
+    )
+    return paginated.items, {
+        'page': page,
+        'pages': paginated.pages,
+        'per_page': per_page,
+        'total': paginated.total,
+        'has_next': paginated.has_next,
+        'has_prev': paginated.has_prev
+    }
@@ -0,0 +1,176 @@
+"""
+Polygonisation des rasters (GeoTIFF) par blocs pour ODG
+
+Le raster est découpé en fenêtres de taille fixe. Chaque fenêtre est lue une
+seule fois, éventuellement décimée et classifiée, puis vectorisée dans un
+processus séparé. Les polygones coupés par les limites de fenêtres sont
+ensuite recousus par valeur, de sorte que le résultat est identique à une
+vectorisation de la bande entière sans jamais la charger en mémoire.
+"""
+
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Iterator
+
+import numpy as np
+import geopandas as gpd
+import shapely
+from shapely import affinity
+from shapely.geometry import shape
+
+logger = logging.getLogger(__name__)
+
+# rasterio.features.shapes n'accepte que ces types de données
+SHAPES_DTYPES = ('int16', 'int32', 'uint8', 'uint16', 'float32')
+
+
+def polygonize_window(file_path: str, window: Tuple[int, int, int, int], band: int,
+                      decimation: int, class_breaks: Optional[List[float]]) -> List[Tuple[bytes, float, bool]]:
+    """Vectorise une fenêtre (col_off, row_off, width, height) du raster.
+
+    Fonction de module pour pouvoir être exécutée dans un ProcessPoolExecutor.
+    Retourne (WKB, valeur, touche_une_limite_interne) pour chaque polygone."""
+    import rasterio
+    from rasterio.enums import Resampling
+    from rasterio.features import shapes
+    from rasterio.windows import Window
+
+    col_off, row_off, width, height = window
+    with rasterio.open(file_path) as src:
+        out_width = max(1, width // decimation)
+        out_height = max(1, height // decimation)
+        data = src.read(
+            band,
+            window=Window(col_off, row_off, width, height),
+            out_shape=(out_height, out_width),
+            resampling=Resampling.nearest
+        )
+        nodata = src.nodata
+        window_transform = src.window_transform(Window(col_off, row_off, width, height))
+        raster_width, raster_height = src.width, src.height
+
+    mask = np.ones(data.shape, dtype=bool)
+    if nodata is not None:
+        mask &= data != nodata
+    if np.issubdtype(data.dtype, np.floating):
+        mask &= ~np.isnan(data)
+    if not mask.any():
+        return []
+
+    if class_breaks:
+        data = np.digitize(data, class_breaks).astype('int32')
+    elif data.dtype.name not in SHAPES_DTYPES:
+        data = data.astype('float32' if np.issubdtype(data.dtype, np.floating) else 'int32')
+
+    # Vectorisation en coordonnées pixel de la fenêtre décimée, puis passage en coordonnées monde
+    scale_x = width / out_width
+    scale_y = height / out_height
+    a, b, c, d, e, f = (
+        window_transform.a * scale_x, window_transform.b * scale_y, window_transform.c,
+        window_transform.d * scale_x, window_transform.e * scale_y, window_transform.f
+    )
+
+    # Limites de la fenêtre intérieures au raster (où un polygone peut avoir été coupé)
+    seam_left = col_off > 0
+    seam_top = row_off > 0
+    seam_right = col_off + width < raster_width
+    seam_bottom = row_off + height < raster_height
+
+    results = []
+    for geojson_geom, value in shapes(data, mask=mask):
+        pixel_geom = shape(geojson_geom)
+        min_x, min_y, max_x, max_y = pixel_geom.bounds
+        on_seam = (
+            (seam_left and min_x <= 0) or (seam_top and min_y <= 0) or
+            (seam_right and max_x >= out_width) or (seam_bottom and max_y >= out_height)
+        )
+        world_geom = affinity.affine_transform(pixel_geom, [a, b, d, e, c, f])
+        results.append((shapely.to_wkb(world_geom), float(value), on_seam))
+    return results
+
+
+class RasterPolygonizer:
+    """Vectorise une bande raster par fenêtres, en parallèle"""
+
+    DEFAULT_BLOCK_SIZE = 1024
+
+    def __init__(self, block_size: int = DEFAULT_BLOCK_SIZE, max_workers: Optional[int] = None,
+                 decimation: int = 1, class_breaks: Optional[List[float]] = None, band: int = 1):
+        self.block_size = max(1, int(block_size))
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.decimation = max(1, int(decimation))
+        self.class_breaks = sorted(float(v) for v in class_breaks) if class_breaks else None
+        self.band = band
+
+    def polygonize(self, file_path: str) -> Optional[gpd.GeoDataFrame]:
+        """GeoDataFrame des polygones (colonne raster_val), dans le CRS du raster"""
+        import rasterio
+
+        with rasterio.open(file_path) as src:
+            crs = src.crs
+            windows = list(self._iter_windows(src.width, src.height))
+
+        logger.info(
+            f"Polygonisation de {file_path}: {len(windows)} fenêtres de {self.block_size}px, "
+            f"décimation x{self.decimation}"
+        )
+
+        geometries: List[Any] = []
+        values: List[float] = []
+        seam_geometries: Dict[float, List[Any]] = {}
+
+        for window_results in self._map_windows(file_path, windows):
+            for wkb, value, on_seam in window_results:
+                geometry = shapely.from_wkb(wkb)
+                if on_seam:
+                    seam_geometries.setdefault(value, []).append(geometry)
+                else:
+                    geometries.append(geometry)
+                    values.append(value)
+
+        # Recollage des polygones de même valeur coupés par les limites de fenêtres
+        for value, parts in seam_geometries.items():
+            merged = shapely.union_all(parts)
+            for part in shapely.get_parts(merged):
+                geometries.append(part)
+                values.append(value)
+
+        if not geometries:
+            return None
+
+        gdf = gpd.GeoDataFrame({'raster_val': values}, geometry=geometries, crs=crs)
+        if self.class_breaks:
+            gdf = self._add_class_bounds(gdf)
+        return gdf
+
+    def _iter_windows(self, width: int, height: int) -> Iterator[Tuple[int, int, int, int]]:
+        # Fenêtres alignées sur la décimation pour éviter les décalages entre blocs
+        step = max(self.decimation, self.block_size - self.block_size % self.decimation)
+        for row_off in range(0, height, step):
+            for col_off in range(0, width, step):
+                yield col_off, row_off, min(step, width - col_off), min(step, height - row_off)
+
+    def _map_windows(self, file_path: str, windows: List[Tuple[int, int, int, int]]):
+        args = (self.band, self.decimation, self.class_breaks)
+        if len(windows) == 1 or self.max_workers == 1:
+            for window in windows:
+                yield polygonize_window(file_path, window, *args)
+            return
+
+        # 'spawn' : les workers ne doivent pas hériter des connexions base de données
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context) as executor:
+            futures = [executor.submit(polygonize_window, file_path, window, *args) for window in windows]
+            for future in futures:
+                yield future.result()
+
+    def _add_class_bounds(self, gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+        """Bornes [class_min, class_max[ de chaque classe (raster_val = indice de classe)"""
+        lower = [None] + self.class_breaks
+        upper = self.class_breaks + [None]
+        class_index = gdf['raster_val'].astype(int)
+        gdf['class_min'] = [lower[i] for i in class_index]
+        gdf['class_max'] = [upper[i] for i in class_index]
+        return gdf
@@ -0,0 +1,339 @@
+"""
+Cache des réponses cartographiques (tuiles MVT, GeoJSON) pour ODG
+
+La clé d'une entrée combine la requête (chemin, paramètres) et la version
+des données servies : (id, updated_at) de chaque couche géospatiale
+concernée, nombre de lignes et dernière mise à jour des tables WebGIS. Une
+modification produit donc une nouvelle clé ; les entrées devenues
+obsolètes sont en outre supprimées explicitement (étiquettes 'layer:<id>'
+ou nom de source) à la mise à jour, à la suppression et à l'import d'une
+couche, sans attendre leur éviction LRU. Les réponses couvrant l'ensemble
+des couches (collection /geojson, tuiles) portent en outre l'étiquette
+'layers' : une couche créée, que leur clé ne mentionnait pas encore, les
+rend obsolètes.
+
+Deux backends interchangeables :
+- memory : LRU en mémoire, propre à chaque processus
+- disk : LRU sur disque, partageable entre processus (dossier commun)
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional, Iterable, List, Set, Tuple
+
+from src.models.geospatial_layers import GeospatialLayer, db
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCacheBackend:
+    """LRU en mémoire borné en octets"""
+
+    name = 'memory'
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, max_bytes)
+        self._entries: 'OrderedDict[str, Tuple[bytes, Set[str]]]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: bytes, tags: Set[str]) -> int:
+        """Enregistre une entrée ; retourne le nombre d'entrées évincées"""
+        if len(value) > self.max_bytes:
+            return 0
+        evicted = 0
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (value, tags)
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._pop(oldest)
+                evicted += 1
+        return evicted
+
+    def invalidate(self, tag: str) -> int:
+        with self._lock:
+            keys = [key for key, (_, tags) in self._entries.items() if tag in tags]
+            for key in keys:
+                self._pop(key)
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def usage(self) -> Tuple[int, int]:
+        """(nombre d'entrées, taille en octets)"""
+        with self._lock:
+            return len(self._entries), self._size
+
+    def _pop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[0])
+
+
+class DiskCacheBackend:
+    """LRU sur disque borné en octets : <clé>.bin et ses étiquettes <clé>.tags"""
+
+    name = 'disk'
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max(0, max_bytes)
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = f.read()
+        except OSError:
+            return None
+        # La date de modification sert d'horodatage LRU
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return value
+
+    def set(self, key: str, value: bytes, tags: Set[str]) -> int:
+        if len(value) > self.max_bytes:
+            return 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(value)
+            with open(self._tags_path(key), 'w', encoding='utf-8') as f:
+                json.dump(sorted(tags), f)
+            os.replace(tmp_path, self._entry_path(key))
+        except OSError as e:
+            logger.warning(f"Impossible d'écrire l'entrée de cache {key}: {str(e)}")
+            self._remove(tmp_path)
+            return 0
+        return self._evict()
+
+    def invalidate(self, tag: str) -> int:
+        removed = 0
+        with self._lock:
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith('.tags'):
+                    continue
+                key = name[:-len('.tags')]
+                try:
+                    with open(self._tags_path(key), 'r', encoding='utf-8') as f:
+                        tags = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                if tag in tags:
+                    self._remove_entry(key)
+                    removed += 1
+        return removed
+
+    def clear(self):
+        with self._lock:
+            for path, _, _ in self._entries():
+                self._remove_entry(os.path.basename(path)[:-len('.bin')])
+
+    def usage(self) -> Tuple[int, int]:
+        entries = self._entries()
+        return len(entries), sum(size for _, size, _ in entries)
+
+    def _evict(self) -> int:
+        """Supprime les entrées les moins récemment utilisées au-delà de max_bytes"""
+        evicted = 0
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda entry: entry[2])
+            total = sum(size for _, size, _ in entries)
+            for path, size, _ in entries:
+                if total <= self.max_bytes:
+                    break
+                self._remove_entry(os.path.basename(path)[:-len('.bin')])
+                total -= size
+                evicted += 1
+        return evicted
+
+    def _entries(self):
+        """(chemin, taille, date d'accès) de chaque entrée"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.bin'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f'{key}.bin')
+
+    def _tags_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f'{key}.tags')
+
+    def _remove_entry(self, key: str):
+        self._remove(self._entry_path(key))
+        self._remove(self._tags_path(key))
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class ResponseCache:
+    """Cache de réponses étiquetées par couche et par source, avec compteurs"""
+
+    DEFAULT_MAX_BYTES = 128 * 1024 * 1024  # 128MB
+    # Étiquette des réponses portant sur l'ensemble des couches visibles
+    LAYERS_TAG = 'layers'
+
+    def __init__(self, backend=None):
+        # Sans backend, le cache est désactivé (toujours manqué)
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    @staticmethod
+    def make_key(namespace: str, params: Dict[str, Any], versions: Iterable[Any]) -> str:
+        """Clé SHA-256 d'une requête et de la version des données servies"""
+        payload = json.dumps([namespace, params, list(versions)], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def layer_tags(layer_ids: Iterable[int], sources: Iterable[str] = (),
+                   collection: bool = False) -> Set[str]:
+        """Étiquettes d'une réponse ; collection : réponse sur l'ensemble des couches"""
+        tags = {f'layer:{layer_id}' for layer_id in layer_ids} | set(sources)
+        if collection:
+            tags.add(ResponseCache.LAYERS_TAG)
+        return tags
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self.backend.get(key) if self.enabled else None
+        with self._lock:
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return value
+
+    def set(self, key: str, value: bytes, tags: Set[str]):
+        if not self.enabled:
+            return
+        evicted = self.backend.set(key, value, tags)
+        if evicted:
+            with self._lock:
+                self._evictions += evicted
+
+    def invalidate_layer(self, layer_id: int) -> int:
+        """Supprime les entrées contenant la couche (mise à jour, suppression, import)
+        et les réponses sur l'ensemble des couches, qui peuvent désormais l'inclure"""
+        return self._invalidate(f'layer:{layer_id}') + self._invalidate(self.LAYERS_TAG)
+
+    def invalidate_source(self, source: str) -> int:
+        """Supprime les entrées contenant une source WebGIS (deposits, exploitation_areas...)"""
+        return self._invalidate(source)
+
+    def clear(self):
+        if self.enabled:
+            self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs et occupation du cache"""
+        entries, size = self.backend.usage() if self.enabled else (0, 0)
+        with self._lock:
+            return {
+                'backend': self.backend.name if self.enabled else None,
+                'entries': entries,
+                'sizeBytes': size,
+                'maxBytes': self.backend.max_bytes if self.enabled else 0,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations
+            }
+
+    def _invalidate(self, tag: str) -> int:
+        if not self.enabled:
+            return 0
+        try:
+            removed = self.backend.invalidate(tag)
+        except Exception as e:
+            logger.warning(f"Invalidation du cache impossible ({tag}): {str(e)}")
+            return 0
+        with self._lock:
+            self._invalidations += removed
+        return removed
+
+
+def layer_versions(layer_query) -> List[Tuple[int, str]]:
+    """(id, updated_at) des couches d'une requête, sans charger les géométries"""
+    rows = layer_query.with_entities(GeospatialLayer.id, GeospatialLayer.updated_at).order_by(GeospatialLayer.id)
+    return [(layer_id, updated_at.isoformat() if updated_at else None) for layer_id, updated_at in rows]
+
+
+def table_version(model) -> Tuple[int, Optional[datetime]]:
+    """(nombre de lignes, dernière mise à jour) d'une table"""
+    return tuple(db.session.query(db.func.count(model.id), db.func.max(model.updated_at)).one())
+
+
+# Instance singleton du cache de réponses
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache(config: Optional[Dict[str, Any]] = None) -> ResponseCache:
+    """Retourne l'instance singleton du cache de réponses.
+
+    Le backend et sa taille sont lus dans la configuration Flask
+    (RESPONSE_CACHE_BACKEND : memory, disk ou none ; RESPONSE_CACHE_MAX_MB ;
+    RESPONSE_CACHE_DIR pour le backend disk) lors de la première création."""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                if config is None:
+                    from flask import current_app, has_app_context
+                    config = current_app.config if has_app_context() else {}
+                backend_name = (config.get('RESPONSE_CACHE_BACKEND') or 'memory').lower()
+                max_mb = config.get('RESPONSE_CACHE_MAX_MB', ResponseCache.DEFAULT_MAX_BYTES // (1024 * 1024))
+                max_bytes = int(max_mb) * 1024 * 1024
+                if backend_name == 'disk':
+                    cache_dir = config.get('RESPONSE_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'odg_response_cache')
+                    backend = DiskCacheBackend(cache_dir, max_bytes)
+                elif backend_name == 'memory':
+                    backend = MemoryCacheBackend(max_bytes)
+                else:
+                    backend = None
+                _response_cache = ResponseCache(backend)
+                logger.info(f"Cache de réponses: {backend_name} ({max_mb}MB max)")
+    return _response_cache
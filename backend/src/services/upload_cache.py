@@ -0,0 +1,206 @@
+"""
+Cache des fichiers géospatiaux analysés pour ODG
+
+Les GeoDataFrames standardisés (WGS84, géométries valides) sont conservés
+sur disque au format GeoParquet, indexés par l'empreinte SHA-256 du fichier
+source. /preview amorce le cache, l'/upload qui suit réutilise le résultat
+sans relire le fichier. La taille totale est bornée : les entrées les moins
+récemment utilisées sont supprimées en premier.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Dict, Any, Optional, Iterator
+
+import geopandas as gpd
+import shapely
+
+logger = logging.getLogger(__name__)
+
+
+class UploadCache:
+    """Cache LRU sur disque de GeoDataFrames indexé par SHA-256"""
+
+    DEFAULT_MAX_BYTES = 500 * 1024 * 1024  # 500MB
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max(0, max_bytes)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        logger.info(f"Cache d'upload initialisé: {self.cache_dir} ({self.max_bytes / 1024 / 1024:.0f}MB max)")
+
+    @classmethod
+    def hash_file(cls, file_path: str) -> str:
+        """Empreinte SHA-256 du contenu d'un fichier"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(cls.HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def contains(self, content_hash: str) -> bool:
+        return os.path.exists(self._entry_path(content_hash))
+
+    def get(self, content_hash: str) -> Optional[gpd.GeoDataFrame]:
+        """GeoDataFrame en cache, ou None"""
+        path = self._entry_path(content_hash)
+        try:
+            gdf = gpd.read_parquet(path)
+        except FileNotFoundError:
+            self._record(hit=False)
+            return None
+        except Exception as e:
+            logger.warning(f"Entrée de cache illisible {content_hash}: {str(e)}")
+            self._remove(path)
+            self._record(hit=False)
+            return None
+
+        self._touch(path)
+        self._record(hit=True)
+        return gdf
+
+    def iter_batches(self, content_hash: str, batch_size: int) -> Optional[Iterator[gpd.GeoDataFrame]]:
+        """Lecture par lots d'une entrée en cache (None si absente)"""
+        path = self._entry_path(content_hash)
+        if not os.path.exists(path):
+            self._record(hit=False)
+            return None
+        self._touch(path)
+        self._record(hit=True)
+        return self._read_batches(path, batch_size)
+
+    def get_metadata(self, content_hash: str) -> Dict[str, Any]:
+        """Métadonnées associées à une entrée (statistiques d'analyse), {} si absentes"""
+        try:
+            with open(self._metadata_path(content_hash), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def put(self, content_hash: str, gdf: gpd.GeoDataFrame, metadata: Optional[Dict[str, Any]] = None) -> bool:
+        """Enregistre un GeoDataFrame standardisé ; False si non sérialisable"""
+        path = self._entry_path(content_hash)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            gdf.to_parquet(tmp_path, index=False)
+            if metadata:
+                with open(self._metadata_path(content_hash), 'w', encoding='utf-8') as f:
+                    json.dump(metadata, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Impossible de mettre en cache {content_hash}: {str(e)}")
+            self._remove(tmp_path)
+            return False
+
+        self._evict()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs et occupation du cache"""
+        entries = self._entries()
+        with self._lock:
+            return {
+                'entries': len(entries),
+                'sizeBytes': sum(size for _, size, _ in entries),
+                'maxBytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions
+            }
+
+    def _read_batches(self, path: str, batch_size: int) -> Iterator[gpd.GeoDataFrame]:
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for record_batch in parquet_file.iter_batches(batch_size=batch_size):
+            df = record_batch.to_pandas()
+            geometry = shapely.from_wkb(df.pop('geometry').to_numpy())
+            yield gpd.GeoDataFrame(df, geometry=geometry, crs='EPSG:4326')
+
+    def _evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà de max_bytes"""
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda entry: entry[2])
+            total = sum(size for _, size, _ in entries)
+            for path, size, _ in entries:
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                self._remove(path[:-len('.parquet')] + '.json')
+                total -= size
+                self._evictions += 1
+
+    def _entries(self):
+        """(chemin, taille, date d'accès) de chaque entrée"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.parquet'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _entry_path(self, content_hash: str) -> str:
+        return os.path.join(self.cache_dir, f'{content_hash}.parquet')
+
+    def _metadata_path(self, content_hash: str) -> str:
+        return os.path.join(self.cache_dir, f'{content_hash}.json')
+
+    def _record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    @staticmethod
+    def _touch(path: str):
+        # La date de modification sert d'horodatage LRU
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# Instance singleton du cache d'upload
+_upload_cache: Optional[UploadCache] = None
+_upload_cache_lock = threading.Lock()
+
+
+def get_upload_cache(config: Optional[Dict[str, Any]] = None) -> UploadCache:
+    """Retourne l'instance singleton du cache d'upload.
+
+    L'emplacement et la taille maximale sont lus dans la configuration Flask
+    (UPLOAD_CACHE_DIR, UPLOAD_CACHE_MAX_MB) lors de la première création."""
+    global _upload_cache
+    if _upload_cache is None:
+        with _upload_cache_lock:
+            if _upload_cache is None:
+                if config is None:
+                    from flask import current_app, has_app_context
+                    config = current_app.config if has_app_context() else {}
+                cache_dir = config.get('UPLOAD_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'odg_upload_cache')
+                max_mb = config.get('UPLOAD_CACHE_MAX_MB', UploadCache.DEFAULT_MAX_BYTES // (1024 * 1024))
+                _upload_cache = UploadCache(cache_dir, max_bytes=int(max_mb) * 1024 * 1024)
+    return _upload_cache
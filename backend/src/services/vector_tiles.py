@@ -0,0 +1,203 @@
+"""
+Tuiles vectorielles Mapbox (MVT) pour la carte ODG
+
+Chaque tuile est encodée par PostGIS (ST_AsMVTGeom, ST_AsMVT), une couche
+MVT par source :
+- geospatial : features des couches importées (géométrie agrégée pour les
+  couches antérieures au stockage par feature), en version simplifiée de la
+  bande du zoom de la tuile
+- deposits : gisements miniers (points latitude/longitude)
+- exploitation_areas, infrastructure : données WebGIS historiques, dont les
+  coordonnées sont stockées en JSON ([[lat, lon], ...])
+
+Les couches MVT encodées séparément sont concaténées, ce que permet le
+format (une tuile est une suite de messages Layer).
+"""
+
+from typing import Iterable, List, Set, Tuple
+
+from sqlalchemy import select, func, cast, literal, null, union_all, or_, Float, Integer
+from sqlalchemy.dialects.postgresql import JSON, JSONB, aggregate_order_by
+
+from src.models.geospatial_layers import GeospatialLayer, GeospatialFeature, db
+from src.models.mining_data import MiningDeposit, ExploitationArea, Infrastructure
+from src.services.response_cache import ResponseCache, layer_versions, table_version
+from src.services.geometry_simplification import band_geometry, zoom_tolerance
+
+MVT_MIMETYPE = 'application/vnd.mapbox-vector-tile'
+TILE_SOURCES = ('geospatial', 'deposits', 'exploitation_areas', 'infrastructure')
+# Résolution interne de la tuile et marge (en unités de tuile) autour de ses bords
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+# Tables WebGIS servies en tuiles
+SOURCE_MODELS = {
+    'deposits': MiningDeposit,
+    'exploitation_areas': ExploitationArea,
+    'infrastructure': Infrastructure
+}
+
+
+def build_vector_tile(z: int, x: int, y: int, layer_query, sources: Iterable[str] = TILE_SOURCES) -> bytes:
+    """Tuile MVT des sources demandées ; layer_query sélectionne les couches géospatiales"""
+    bounds = func.ST_TileEnvelope(z, x, y)
+    bounds_4326 = func.ST_Transform(bounds, 4326)
+    # Géométries plus petites qu'un pixel de tuile (256 px) omises, sauf les points
+    min_size = zoom_tolerance(z)
+
+    parts = []
+    for source in sources:
+        if source == 'geospatial':
+            rows = _geospatial_rows(layer_query, z, bounds, bounds_4326, min_size)
+        elif source == 'deposits':
+            rows = _deposit_rows(bounds, bounds_4326)
+        elif source == 'exploitation_areas':
+            rows = _exploitation_area_rows(bounds, bounds_4326)
+        elif source == 'infrastructure':
+            rows = _infrastructure_rows(bounds, bounds_4326)
+        else:
+            raise ValueError(f"Source de tuile inconnue: {source}")
+        parts.append(_encode_layer(source, rows, feature_id=source != 'geospatial'))
+    return b''.join(parts)
+
+
+def tile_data_version(z: int, x: int, y: int, layer_query,
+                      sources: Iterable[str] = TILE_SOURCES) -> Tuple[List, Set[str]]:
+    """Version des données d'une tuile (pour la clé de cache) et étiquettes d'invalidation
+
+    Seules les couches géospatiales qui intersectent la tuile sont prises en
+    compte : la modification d'une couche éloignée ne change pas la clé."""
+    versions: List = []
+    tags: Set[str] = set()
+    if 'geospatial' in sources:
+        bounds_4326 = func.ST_Transform(func.ST_TileEnvelope(z, x, y), 4326)
+        layers = layer_versions(layer_query.filter(GeospatialLayer.geom.intersects(bounds_4326)))
+        versions.append(layers)
+        tags |= ResponseCache.layer_tags((layer_id for layer_id, _ in layers), collection=True)
+    for source in sources:
+        if source in SOURCE_MODELS:
+            versions.append((source, table_version(SOURCE_MODELS[source])))
+            tags.add(source)
+    return versions, tags
+
+
+def _encode_layer(name: str, rows, feature_id: bool = True) -> bytes:
+    """Encode les lignes (colonnes attributaires + 'geom' en coordonnées de tuile)"""
+    layer = rows.subquery(name)
+    args = [layer.table_valued(), name, TILE_EXTENT, 'geom']
+    if feature_id:
+        args.append('id')
+    stmt = select(func.ST_AsMVT(*args)).where(layer.c.geom.isnot(None))
+    tile = db.session.execute(stmt).scalar()
+    return bytes(tile) if tile else b''
+
+
+def _tile_geometry(geom, bounds):
+    return func.ST_AsMVTGeom(func.ST_Transform(geom, 3857), bounds, TILE_EXTENT, TILE_BUFFER, True).label('geom')
+
+
+def _geospatial_rows(layer_query, z: int, bounds, bounds_4326, min_size: float):
+    layers = layer_query.with_entities(
+        GeospatialLayer.id,
+        GeospatialLayer.name,
+        GeospatialLayer.layer_type,
+        GeospatialLayer.status
+    ).order_by(None).subquery()
+
+    features = (
+        select(
+            GeospatialFeature.id.label('featureId'),
+            GeospatialFeature.layer_id.label('layerId'),
+            layers.c.name.label('layerName'),
+            layers.c.layer_type.label('layerType'),
+            layers.c.status.label('status'),
+            GeospatialFeature.feature_index.label('featureIndex'),
+            GeospatialFeature.properties.label('properties'),
+            _tile_geometry(band_geometry(GeospatialFeature, z), bounds)
+        )
+        .join(layers, layers.c.id == GeospatialFeature.layer_id)
+        .where(
+            GeospatialFeature.geom.intersects(bounds_4326),
+            or_(
+                GeospatialFeature.geometry_type.in_(['POINT', 'MULTIPOINT']),
+                GeospatialFeature.max_x - GeospatialFeature.min_x >= min_size,
+                GeospatialFeature.max_y - GeospatialFeature.min_y >= min_size
+            )
+        )
+    )
+
+    # Couches antérieures au stockage par feature : géométrie agrégée
+    legacy = (
+        select(
+            cast(null(), Integer).label('featureId'),
+            GeospatialLayer.id.label('layerId'),
+            GeospatialLayer.name.label('layerName'),
+            GeospatialLayer.layer_type.label('layerType'),
+            GeospatialLayer.status.label('status'),
+            cast(null(), Integer).label('featureIndex'),
+            cast(null(), JSONB).label('properties'),
+            _tile_geometry(band_geometry(GeospatialLayer, z), bounds)
+        )
+        .where(
+            GeospatialLayer.id.in_(select(layers.c.id)),
+            ~GeospatialLayer.features.any(),
+            GeospatialLayer.geom.intersects(bounds_4326)
+        )
+    )
+    return union_all(features, legacy)
+
+
+def _deposit_rows(bounds, bounds_4326):
+    geom = func.ST_SetSRID(func.ST_MakePoint(MiningDeposit.longitude, MiningDeposit.latitude), 4326)
+    return select(
+        MiningDeposit.id,
+        MiningDeposit.name,
+        MiningDeposit.type,
+        MiningDeposit.company,
+        MiningDeposit.status,
+        _tile_geometry(geom, bounds)
+    ).where(func.ST_Intersects(geom, bounds_4326))
+
+
+def _exploitation_area_rows(bounds, bounds_4326):
+    line = _coordinates_line(ExploitationArea.coordinates)
+    # Anneau fermé sur son premier sommet (les coordonnées saisies ne le répètent pas)
+    geom = func.ST_MakePolygon(func.ST_AddPoint(line, func.ST_StartPoint(line)))
+    return select(
+        ExploitationArea.id,
+        ExploitationArea.name,
+        ExploitationArea.company,
+        ExploitationArea.status,
+        ExploitationArea.area,
+        _tile_geometry(geom, bounds)
+    ).where(
+        func.json_array_length(cast(ExploitationArea.coordinates, JSON)) >= 3,
+        func.ST_Intersects(geom, bounds_4326)
+    )
+
+
+def _infrastructure_rows(bounds, bounds_4326):
+    geom = _coordinates_line(Infrastructure.coordinates)
+    return select(
+        Infrastructure.id,
+        Infrastructure.name,
+        Infrastructure.type,
+        Infrastructure.status,
+        _tile_geometry(geom, bounds)
+    ).where(
+        func.json_array_length(cast(Infrastructure.coordinates, JSON)) >= 2,
+        func.ST_Intersects(geom, bounds_4326)
+    )
+
+
+def _coordinates_line(column):
+    """LineString WGS84 construite à partir d'une liste JSON [[lat, lon], ...]"""
+    points = func.json_array_elements(cast(column, JSON)).table_valued(
+        'value', with_ordinality='position'
+    ).render_derived()
+    point = func.ST_MakePoint(
+        cast(points.c.value.op('->>')(literal(1)), Float),
+        cast(points.c.value.op('->>')(literal(0)), Float)
+    )
+    return select(
+        func.ST_SetSRID(func.ST_MakeLine(aggregate_order_by(point, points.c.position)), 4326)
+    ).scalar_subquery()
@@ -0,0 +1,16 @@
+"""
+Configuration pytest des tests du backend ODG
+
+Les tests importent les modules par leur chemin de paquet (src.services...)
+comme l'application : le dossier backend est ajouté au chemin d'import.
+Les dépendances lourdes (geopandas, Flask-SQLAlchemy...) sont demandées
+module par module avec pytest.importorskip.
+
+Usage (depuis backend/):
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,205 @@
+"""Sessions d'upload par morceaux (ChunkedUploadStore)"""
+
+import io
+import os
+import time
+import shutil
+import hashlib
+
+import pytest
+
+pytest.importorskip('werkzeug')
+
+from src.services.chunked_uploads import ChunkedUploadStore, ChunkedUploadError
+
+DATA = b'0123456789' * 10
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ChunkedUploadStore(str(tmp_path / 'uploads'), max_file_size=1024, chunk_size=40)
+
+
+@pytest.fixture
+def session(store):
+    return store.create('couche.geojson', len(DATA), {'name': 'Couche'}, sha256=sha256(DATA))
+
+
+def write(store, upload_id, offset, data, checksum=None):
+    return store.write_chunk(upload_id, offset, io.BytesIO(data), checksum or sha256(data))
+
+
+def part_size(store, upload_id):
+    return os.path.getsize(os.path.join(store.session_dir(upload_id), 'data.part'))
+
+
+def upload_all(store, upload_id):
+    for offset in range(0, len(DATA), 40):
+        write(store, upload_id, offset, DATA[offset:offset + 40])
+
+
+def test_chunks_advance_offset(store, session):
+    upload_id = session['uploadId']
+    assert write(store, upload_id, 0, DATA[:40])['offset'] == 40
+    assert write(store, upload_id, 40, DATA[40:80])['offset'] == 80
+    assert store.get(upload_id)['offset'] == 80
+
+
+def test_unexpected_offset_is_rejected(store, session):
+    upload_id = session['uploadId']
+    write(store, upload_id, 0, DATA[:40])
+    with pytest.raises(ChunkedUploadError) as error:
+        write(store, upload_id, 0, DATA[:40])
+    assert error.value.status_code == 409
+    assert error.value.offset == 40
+
+
+def test_bad_checksum_rolls_back(store, session):
+    upload_id = session['uploadId']
+    write(store, upload_id, 0, DATA[:40])
+    with pytest.raises(ChunkedUploadError) as error:
+        write(store, upload_id, 40, DATA[40:80], checksum=sha256(b'autre chose'))
+    assert error.value.status_code == 400
+    assert store.get(upload_id)['offset'] == 40
+    assert part_size(store, upload_id) == 40
+
+
+def test_missing_checksum_is_rejected(store, session):
+    with pytest.raises(ChunkedUploadError) as error:
+        store.write_chunk(session['uploadId'], 0, io.BytesIO(DATA[:40]), None)
+    assert error.value.status_code == 400
+    assert store.get(session['uploadId'])['offset'] == 0
+
+
+def test_chunk_beyond_announced_size_rolls_back(store, session):
+    upload_id = session['uploadId']
+    write(store, upload_id, 0, DATA[:80])
+    with pytest.raises(ChunkedUploadError) as error:
+        write(store, upload_id, 80, DATA[80:] + b'en trop')
+    assert error.value.status_code == 413
+    assert store.get(upload_id)['offset'] == 80
+    assert part_size(store, upload_id) == 80
+
+
+def test_oversized_file_is_refused(store):
+    with pytest.raises(ChunkedUploadError) as error:
+        store.create('enorme.zip', 2048, {})
+    assert error.value.status_code == 413
+
+
+def test_assemble_incomplete_upload(store, session):
+    write(store, session['uploadId'], 0, DATA[:40])
+    with pytest.raises(ChunkedUploadError) as error:
+        store.assemble(session['uploadId'])
+    assert error.value.status_code == 409
+
+
+def test_assemble_returns_path_and_digest(store, session):
+    upload_id = session['uploadId']
+    upload_all(store, upload_id)
+    file_path, digest = store.assemble(upload_id)
+    assert digest == sha256(DATA)
+    assert os.path.basename(file_path) == 'couche.geojson'
+    with open(file_path, 'rb') as f:
+        assert f.read() == DATA
+    # Nouvel appel à /complete (file d'import saturée) : même résultat
+    assert store.assemble(upload_id) == (file_path, digest)
+
+
+def test_assemble_with_wrong_file_digest(store):
+    session = store.create('couche.geojson', len(DATA), {}, sha256=sha256(b'autre fichier'))
+    upload_all(store, session['uploadId'])
+    with pytest.raises(ChunkedUploadError) as error:
+        store.assemble(session['uploadId'])
+    assert error.value.status_code == 400
+
+
+def test_chunks_after_assembly_are_refused(store, session):
+    upload_id = session['uploadId']
+    upload_all(store, upload_id)
+    store.assemble(upload_id)
+    with pytest.raises(ChunkedUploadError) as error:
+        write(store, upload_id, len(DATA), b'x')
+    assert error.value.status_code == 409
+
+
+def test_claim_moves_the_file_out_of_the_session(store, session):
+    upload_id = session['uploadId']
+    upload_all(store, upload_id)
+    store.assemble(upload_id)
+    job_path, job_dir = store.claim(upload_id)
+    assert os.path.dirname(job_path) == job_dir
+    assert not job_dir.startswith(store.session_dir(upload_id))
+    with open(job_path, 'rb') as f:
+        assert f.read() == DATA
+
+    # Le job supprime son dossier : la session reste consultable
+    shutil.rmtree(job_dir)
+    assert store.get(upload_id)['claimed']
+
+
+def test_second_complete_is_refused_with_job_id(store, session):
+    upload_id = session['uploadId']
+    upload_all(store, upload_id)
+    store.assemble(upload_id)
+    store.claim(upload_id)
+    with pytest.raises(ChunkedUploadError) as error:
+        store.claim(upload_id)
+    assert error.value.status_code == 409
+    assert error.value.job_id is None
+
+    store.record_job(upload_id, 42)
+    with pytest.raises(ChunkedUploadError) as error:
+        store.assemble(upload_id)
+    assert error.value.status_code == 409
+    assert error.value.job_id == 42
+
+
+def test_unclaim_allows_a_new_complete(store, session):
+    upload_id = session['uploadId']
+    upload_all(store, upload_id)
+    store.assemble(upload_id)
+    job_path, job_dir = store.claim(upload_id)
+    store.unclaim(upload_id, job_path)
+    assert not os.path.exists(job_dir)
+
+    file_path, digest = store.assemble(upload_id)
+    assert digest == sha256(DATA)
+    job_path, _ = store.claim(upload_id)
+    with open(job_path, 'rb') as f:
+        assert f.read() == DATA
+
+
+def test_claim_requires_assembly(store, session):
+    upload_all(store, session['uploadId'])
+    with pytest.raises(ChunkedUploadError) as error:
+        store.claim(session['uploadId'])
+    assert error.value.status_code == 409
+
+
+def test_invalid_upload_id(store):
+    with pytest.raises(ChunkedUploadError) as error:
+        store.get('../../etc')
+    assert error.value.status_code == 404
+
+
+def test_purge_expired_uses_directory_age(store, session):
+    upload_id = session['uploadId']
+    upload_all(store, upload_id)
+    store.assemble(upload_id)
+    _, job_dir = store.claim(upload_id)
+    active = store.create('autre.geojson', len(DATA), {})
+    # Session transmise et dossier de job abandonné, inactifs depuis longtemps
+    session_dir = store.session_dir(upload_id)
+    expired = time.time() - store.SESSION_TTL_SECONDS - 60
+    for path in (session_dir, job_dir):
+        os.utime(path, (expired, expired))
+
+    store.purge_expired()
+    assert not os.path.exists(session_dir)
+    assert not os.path.exists(job_dir)
+    assert store.get(active['uploadId'])['offset'] == 0
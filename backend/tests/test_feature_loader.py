@@ -0,0 +1,40 @@
+"""Préparation des lots de features pour PostGIS (feature_loader)"""
+
+import csv
+import json
+
+import pytest
+
+gpd = pytest.importorskip('geopandas')
+pytest.importorskip('sqlalchemy')
+
+from shapely.geometry import Point
+
+from src.services.feature_loader import copy_csv, feature_properties_json
+
+
+def test_properties_one_entry_per_feature():
+    batch = gpd.GeoDataFrame(
+        {'name': ['A', 'B\nbis'], 'depth': [12.5, None]},
+        geometry=[Point(9.4, 0.4), Point(11.2, -1.6)], crs='EPSG:4326'
+    )
+    properties = [json.loads(value) for value in feature_properties_json(batch)]
+    assert properties == [{'name': 'A', 'depth': 12.5}, {'name': 'B\nbis', 'depth': None}]
+
+
+def test_properties_of_geometry_only_batch():
+    # GeoJSON dont les features n'ont pas d'attributs
+    batch = gpd.GeoDataFrame(geometry=[Point(9.4, 0.4), Point(11.2, -1.6), Point(10, 0)], crs='EPSG:4326')
+    assert feature_properties_json(batch) == ['{}', '{}', '{}']
+
+
+@pytest.mark.parametrize('columns', [{}, {'name': ['A', 'B']}])
+def test_copy_csv_writes_every_feature(columns):
+    batch = gpd.GeoDataFrame(columns, geometry=[Point(9.4, 0.4), Point(11.2, -1.6)], crs='EPSG:4326')
+    rows = list(csv.reader(copy_csv(7, batch, 100)))
+    assert len(rows) == len(batch)
+    assert [row[:3] for row in rows] == [['7', '100', 'POINT'], ['7', '101', 'POINT']]
+    assert [json.loads(row[4]) for row in rows] == [
+        {key: values[i] for key, values in columns.items()} for i in range(len(batch))
+    ]
+    assert [float(value) for value in rows[1][5:]] == [11.2, -1.6, 11.2, -1.6]
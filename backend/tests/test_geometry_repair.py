@@ -0,0 +1,58 @@
+"""Réparation vectorisée des géométries (repair_geometries)"""
+
+import pytest
+
+gpd = pytest.importorskip('geopandas')
+shapely = pytest.importorskip('shapely')
+
+from shapely.geometry import Point, Polygon, box
+
+from src.services.geometry_repair import repair_geometries, merge_repair_stats, empty_repair_stats
+
+BOWTIE = Polygon([(0, 0), (1, 1), (1, 0), (0, 1)])
+COLLAPSED = Polygon([(0, 0), (1, 1), (2, 2), (0, 0)])
+
+
+def frame(geometries):
+    return gpd.GeoDataFrame({'id': range(len(geometries))}, geometry=geometries, crs='EPSG:4326')
+
+
+def test_valid_geometries_are_untouched():
+    gdf = frame([box(0, 0, 1, 1), Point(9.4, 0.4)])
+    repaired, stats = repair_geometries(gdf)
+    assert stats == {'repaired': 0, 'dropped': 0, 'empty': 0}
+    assert repaired is gdf
+
+
+def test_invalid_polygon_is_repaired_not_dropped():
+    repaired, stats = repair_geometries(frame([box(0, 0, 1, 1), BOWTIE]))
+    assert stats == {'repaired': 1, 'dropped': 0, 'empty': 0}
+    assert list(repaired['id']) == [0, 1]
+    assert repaired.geometry.is_valid.all()
+    # La réparation conserve la dimension d'origine (surface)
+    assert repaired.geometry.iloc[1].geom_type in ('Polygon', 'MultiPolygon')
+    assert repaired.geometry.iloc[1].area == pytest.approx(0.5)
+
+
+def test_collapsed_polygon_is_dropped():
+    repaired, stats = repair_geometries(frame([COLLAPSED, box(0, 0, 1, 1)]))
+    assert stats == {'repaired': 0, 'dropped': 1, 'empty': 0}
+    assert list(repaired['id']) == [1]
+
+
+def test_missing_and_empty_geometries_are_counted():
+    repaired, stats = repair_geometries(frame([None, Polygon(), box(0, 0, 1, 1)]))
+    assert stats == {'repaired': 0, 'dropped': 0, 'empty': 2}
+    assert list(repaired['id']) == [2]
+
+
+def test_input_frame_is_not_modified():
+    gdf = frame([BOWTIE])
+    repair_geometries(gdf)
+    assert not gdf.geometry.iloc[0].is_valid
+
+
+def test_merge_repair_stats():
+    total = merge_repair_stats(empty_repair_stats(), {'repaired': 2, 'dropped': 1, 'empty': 0})
+    merge_repair_stats(total, {'repaired': 1, 'dropped': 0, 'empty': 3})
+    assert total == {'repaired': 3, 'dropped': 1, 'empty': 3}
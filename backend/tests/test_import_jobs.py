@@ -0,0 +1,34 @@
+"""File d'attente des imports (ImportJobQueue)"""
+
+import pytest
+
+pytest.importorskip('flask_cors')
+pytest.importorskip('geopandas')
+pytest.importorskip('geoalchemy2')
+
+from flask import Flask
+
+from src.services import import_jobs
+from src.services.import_jobs import ImportJobQueue
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    queue = ImportJobQueue(max_workers=3, max_queue_size=5)
+    monkeypatch.setattr(import_jobs, '_import_job_queue', queue)
+    yield queue
+    queue.shutdown()
+
+
+def test_stats_of_idle_queue(queue):
+    assert queue.stats() == {'maxWorkers': 3, 'maxQueueSize': 5, 'activeJobs': 0, 'queuedJobs': 0}
+
+
+def test_import_queue_route(queue):
+    from src.routes.geospatial_import import geospatial_import_bp
+
+    app = Flask(__name__)
+    app.register_blueprint(geospatial_import_bp, url_prefix='/api/geospatial')
+    response = app.test_client().get('/api/geospatial/import-queue')
+    assert response.status_code == 200
+    assert response.get_json() == {'success': True, 'data': queue.stats()}
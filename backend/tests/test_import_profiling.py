@@ -0,0 +1,93 @@
+"""Chronométrage des étapes d'import (ImportProfiler)"""
+
+import pytest
+
+from src.services import import_profiling
+from src.services.import_profiling import ImportProfiler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(import_profiling.time, 'perf_counter', clock)
+    return clock
+
+
+def test_nested_stage_pauses_parent(clock):
+    profiler = ImportProfiler(trace_memory=False)
+    with profiler.stage('parse'):
+        clock.advance(1.0)
+        with profiler.stage('standardize'):
+            clock.advance(2.0)
+        clock.advance(0.5)
+    assert profiler.stages == {'parse': 1.5, 'standardize': 2.0}
+
+
+def test_repeated_stages_accumulate(clock):
+    profiler = ImportProfiler(trace_memory=False)
+    for _ in range(3):
+        with profiler.stage('db_insert'):
+            clock.advance(0.25)
+    assert profiler.stages['db_insert'] == pytest.approx(0.75)
+
+
+def test_stage_closed_on_exception(clock):
+    profiler = ImportProfiler(trace_memory=False)
+    with pytest.raises(RuntimeError):
+        with profiler.stage('parse'):
+            clock.advance(1.0)
+            with profiler.stage('validate'):
+                clock.advance(1.0)
+                raise RuntimeError('lecture impossible')
+    assert profiler.stages == {'parse': 1.0, 'validate': 1.0}
+    assert profiler._stack == []
+
+
+def test_iter_stage_times_production_only(clock):
+    profiler = ImportProfiler(trace_memory=False)
+
+    def batches():
+        for batch in range(2):
+            clock.advance(1.0)
+            yield batch
+
+    with profiler.stage('db_insert'):
+        for _ in profiler.iter_stage('parse', batches()):
+            clock.advance(0.5)
+    assert profiler.stages == {'parse': 2.0, 'db_insert': 1.0}
+
+
+def test_profile_orders_known_stages(clock):
+    profiler = ImportProfiler(trace_memory=False)
+    profiler.start()
+    profiler.add('custom', 0.1)
+    profiler.add('commit', 0.2)
+    profiler.add('upload_write', 0.3)
+    profiler.add_geometry_timings({'reproject': 1.0, 'repair': 0.5})
+    profiler.add_geometry_timings({'repair': 0.5})
+    clock.advance(3.0)
+    profile = profiler.stop()
+    assert list(profile['stages']) == ['upload_write', 'commit', 'custom']
+    assert profile['geometryStages'] == {'reproject': 1.0, 'repair': 1.0}
+    assert profile['totalSeconds'] == 3.0
+    assert profile['memoryPeakBytes'] is None
+
+
+def test_memory_peak_is_recorded():
+    profiler = ImportProfiler()
+    profiler.start()
+    data = [bytes(1024) for _ in range(100)]
+    profile = profiler.stop()
+    assert len(data) == 100
+    assert profile['memoryPeakBytes'] > 100 * 1024
@@ -0,0 +1,95 @@
+"""Pagination par curseur (keyset)"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip('flask_sqlalchemy')
+
+from flask import Flask
+from werkzeug.datastructures import MultiDict
+
+from src.models.mining_data import db
+from src.services.keyset_pagination import (
+    MAX_PAGE_SIZE, encode_cursor, decode_cursor, keyset_page, paginate_request
+)
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+
+
+class PaginationItem(db.Model):
+    __tablename__ = 'test_pagination_items'
+
+    id = db.Column(db.Integer, primary_key=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+
+
+@pytest.fixture
+def items():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        PaginationItem.__table__.create(db.engine)
+        # Deux lignes par horodatage : l'id départage les égalités
+        db.session.add_all(
+            PaginationItem(id=i, created_at=START + timedelta(minutes=i // 2)) for i in range(1, 26)
+        )
+        db.session.commit()
+        yield PaginationItem
+        db.session.remove()
+
+
+def test_cursor_round_trip():
+    position = datetime(2024, 3, 5, 8, 30, 15, 123456)
+    cursor = encode_cursor(position, 42)
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == (position, 42)
+
+
+@pytest.mark.parametrize('cursor', ['', 'pas-un-curseur', encode_cursor(START, 1)[:-3], 'WzEsMiwzXQ'])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_keyset_pages_cover_every_row_once(items):
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = keyset_page(items.query, items.created_at, items.id, cursor, 10)
+        seen.extend(item.id for item in page)
+        if cursor is None:
+            break
+    assert seen == list(range(25, 0, -1))
+
+
+def test_last_full_page_has_no_cursor(items):
+    page, cursor = keyset_page(items.query.filter(items.id <= 20), items.created_at, items.id, None, 20)
+    assert len(page) == 20
+    assert cursor is None
+
+
+def test_paginate_request_with_cursor(items):
+    page, pagination = paginate_request(items.query, items.created_at, items.id, MultiDict({'per_page': '10'}))
+    assert [item.id for item in page] == list(range(25, 15, -1))
+    assert pagination['has_next'] and not pagination['has_prev']
+
+    args = MultiDict({'per_page': '10', 'cursor': pagination['next_cursor']})
+    page, pagination = paginate_request(items.query, items.created_at, items.id, args)
+    assert [item.id for item in page] == list(range(15, 5, -1))
+    assert pagination['has_prev']
+
+
+def test_per_page_is_capped(items):
+    _, pagination = paginate_request(items.query, items.created_at, items.id, MultiDict({'per_page': '1000'}))
+    assert pagination['per_page'] == MAX_PAGE_SIZE
+
+
+def test_page_parameter_keeps_offset_pagination(items):
+    page, pagination = paginate_request(
+        items.query, items.created_at, items.id, MultiDict({'page': '2', 'per_page': '10'})
+    )
+    assert [item.id for item in page] == list(range(15, 5, -1))
+    assert pagination['total'] == 25
+    assert pagination['pages'] == 3
@@ -0,0 +1,110 @@
+"""Cache des réponses cartographiques (LRU et invalidation par étiquette)"""
+
+import os
+
+import pytest
+
+pytest.importorskip('flask_sqlalchemy')
+pytest.importorskip('geoalchemy2')
+
+from src.services.response_cache import ResponseCache, MemoryCacheBackend, DiskCacheBackend
+
+
+@pytest.fixture(params=['memory', 'disk'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryCacheBackend(max_bytes=30)
+    return DiskCacheBackend(str(tmp_path / 'cache'), max_bytes=30)
+
+
+def touch(backend, key, age):
+    # Le backend disque ordonne les entrées par date de modification
+    if isinstance(backend, DiskCacheBackend):
+        path = backend._entry_path(key)
+        mtime = os.path.getmtime(path) - age
+        os.utime(path, (mtime, mtime))
+
+
+def test_least_recently_used_entry_is_evicted(backend):
+    backend.set('a', b'x' * 10, set())
+    touch(backend, 'a', 30)
+    backend.set('b', b'x' * 10, set())
+    touch(backend, 'b', 20)
+    backend.set('c', b'x' * 10, set())
+    touch(backend, 'c', 10)
+
+    # Lecture de 'a' : 'b' devient la plus ancienne
+    assert backend.get('a') == b'x' * 10
+    assert backend.set('d', b'x' * 10, set()) == 1
+    assert backend.get('b') is None
+    assert backend.get('a') is not None
+    assert backend.usage() == (3, 30)
+
+
+def test_value_larger_than_cache_is_not_stored(backend):
+    assert backend.set('big', b'x' * 31, set()) == 0
+    assert backend.get('big') is None
+
+
+def test_invalidate_by_tag(backend):
+    backend.set('tile', b'1', {'layer:1', 'deposits'})
+    backend.set('geojson', b'2', {'layer:1', 'layer:2'})
+    backend.set('other', b'3', {'layer:3'})
+
+    assert backend.invalidate('layer:1') == 2
+    assert backend.get('tile') is None
+    assert backend.get('geojson') is None
+    assert backend.get('other') == b'3'
+    assert backend.invalidate('deposits') == 0
+
+
+def test_cache_counters():
+    cache = ResponseCache(MemoryCacheBackend(max_bytes=10))
+    key = ResponseCache.make_key('tiles', {'z': 5}, [(1, '2024-01-01T00:00:00')])
+    assert cache.get(key) is None
+    cache.set(key, b'tile', ResponseCache.layer_tags([1], ['deposits']))
+    assert cache.get(key) == b'tile'
+    cache.set('other', b'x' * 10, set())
+    assert cache.invalidate_source('deposits') == 0
+    assert cache.invalidate_layer(1) == 0
+
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['evictions'] == 1
+    assert stats['entries'] == 1
+
+
+def test_invalidate_layer_counts_removed_entries():
+    cache = ResponseCache(MemoryCacheBackend(max_bytes=100))
+    cache.set('a', b'1', ResponseCache.layer_tags([7]))
+    cache.set('b', b'2', ResponseCache.layer_tags([7, 8], ['deposits']))
+    assert cache.invalidate_layer(7) == 2
+    assert cache.stats()['invalidations'] == 2
+
+
+def test_make_key_depends_on_data_version():
+    params = {'bbox': '8,-4,15,3', 'zoom': 6}
+    key = ResponseCache.make_key('geojson', params, [(1, '2024-01-01T00:00:00')])
+    assert key == ResponseCache.make_key('geojson', dict(reversed(params.items())), [(1, '2024-01-01T00:00:00')])
+    assert key != ResponseCache.make_key('geojson', params, [(1, '2024-02-01T00:00:00')])
+
+
+def test_disabled_cache_always_misses():
+    cache = ResponseCache()
+    cache.set('a', b'1', set())
+    assert cache.get('a') is None
+    assert cache.invalidate_layer(1) == 0
+    assert cache.stats()['backend'] is None
+
+
+def test_import_evicts_collection_responses():
+    cache = ResponseCache(MemoryCacheBackend(max_bytes=100))
+    # Collection /geojson calculée avant l'import : couches 1 et 2
+    cache.set('collection', b'{}', ResponseCache.layer_tags([1, 2], collection=True))
+    cache.set('layer-1', b'{}', ResponseCache.layer_tags([1]))
+
+    # Invalidation faite après l'import de la couche 3
+    assert cache.invalidate_layer(3) == 1
+    assert cache.get('collection') is None
+    assert cache.get('layer-1') == b'{}'
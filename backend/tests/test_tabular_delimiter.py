@@ -0,0 +1,57 @@
+"""Détection du délimiteur des fichiers CSV/TXT (_sniff_delimiter)"""
+
+import pytest
+
+pytest.importorskip('geopandas')
+pytest.importorskip('pyogrio')
+pytest.importorskip('flask_sqlalchemy')
+pytest.importorskip('geoalchemy2')
+
+from src.services.geospatial_import import GeospatialImportService
+from src.services.geometry_pool import GeometryProcessPool
+from src.services.upload_cache import UploadCache
+
+
+@pytest.fixture
+def service(tmp_path):
+    # Cache et pool dédiés : les singletons de l'application ne sont pas créés
+    service = GeospatialImportService(
+        upload_cache=UploadCache(str(tmp_path / 'cache')),
+        geometry_pool=GeometryProcessPool(max_workers=0)
+    )
+    yield service
+    service.cleanup()
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_comma_delimiter(service, tmp_path):
+    path = write(tmp_path, 'points.csv', 'name,latitude,longitude\nA,0.5,9.4\nB,-1.2,13.1\n')
+    assert service._sniff_delimiter(path, 'CSV') == ','
+
+
+def test_semicolon_with_decimal_commas(service, tmp_path):
+    # Les virgules décimales varient d'une ligne à l'autre, pas le point-virgule
+    path = write(tmp_path, 'points.csv', 'name;latitude;longitude\nA;0,5;9,4\nB;-1;13,15\n')
+    assert service._sniff_delimiter(path, 'CSV') == ';'
+
+
+def test_tab_delimited_txt(service, tmp_path):
+    path = write(tmp_path, 'points.txt', 'name\tlatitude\tlongitude\nA\t0.5\t9.4\n')
+    assert service._sniff_delimiter(path, 'TXT') == '\t'
+
+
+def test_ragged_rows_fall_back_to_header(service, tmp_path):
+    # Nombre de colonnes variable : délimiteur le plus fréquent dans l'en-tête
+    path = write(tmp_path, 'points.csv', 'name|latitude|longitude\nA|0.5\nB|-1.2|13.1\n')
+    assert service._sniff_delimiter(path, 'CSV') == '|'
+
+
+def test_unrecognized_format(service, tmp_path):
+    path = write(tmp_path, 'points.csv', 'no delimiter here\nnor here\n')
+    with pytest.raises(ValueError):
+        service._sniff_delimiter(path, 'CSV')
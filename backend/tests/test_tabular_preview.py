@@ -0,0 +1,68 @@
+"""Aperçu rapide des CSV/TXT (_fast_preview_tabular)"""
+
+import pytest
+
+pytest.importorskip('geopandas')
+pytest.importorskip('pyogrio')
+pytest.importorskip('flask_sqlalchemy')
+pytest.importorskip('geoalchemy2')
+
+from src.services.geospatial_import import GeospatialImportService
+from src.services.geometry_pool import GeometryProcessPool
+from src.services.upload_cache import UploadCache
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = GeospatialImportService(
+        upload_cache=UploadCache(str(tmp_path / 'cache')),
+        geometry_pool=GeometryProcessPool(max_workers=0)
+    )
+    yield service
+    service.cleanup()
+
+
+@pytest.fixture
+def points_csv(tmp_path):
+    # Longitudes croissantes : la première et la dernière ligne fixent l'emprise
+    lines = ['name,latitude,longitude']
+    lines += [f'site{i:05d},{-1 + i / 10000:.4f},{9 + i / 10000:.4f}' for i in range(20000)]
+    path = tmp_path / 'points.csv'
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return str(path)
+
+
+def test_small_file_is_read_entirely(service, points_csv):
+    preview = service._fast_preview_tabular(points_csv, 'CSV')
+    assert preview['featureCount'] == 20000
+    assert not preview['featureCountEstimated']
+    assert not preview['boundsSampled']
+    assert preview['bounds'] == pytest.approx([9.0, -1.0, 10.9999, 0.9999])
+
+
+def test_large_file_is_sampled(service, points_csv, monkeypatch):
+    monkeypatch.setattr(GeospatialImportService, 'PREVIEW_TABULAR_SAMPLE_BYTES', 32 * 1024)
+    preview = service._fast_preview_tabular(points_csv, 'CSV')
+    assert preview['featureCountEstimated']
+    assert preview['boundsSampled']
+    assert preview['featureCount'] == pytest.approx(20000, rel=0.01)
+    # Lignes de fin de fichier incluses dans l'emprise
+    assert preview['bounds'] == pytest.approx([9.0, -1.0, 10.9999, 0.9999])
+    assert preview['sampleSize'] == GeospatialImportService.PREVIEW_SAMPLE_SIZE
+
+
+def test_pandas_fallback_resumes_by_record(service, tmp_path, monkeypatch):
+    # Champs multilignes après un début de fichier simple : pyarrow échoue sur
+    # un bloc tardif, pandas reprend après les enregistrements déjà produits
+    lines = ['name,latitude,longitude,description']
+    lines += [f'site{i},0.{i % 10},9.{i % 10},simple' for i in range(2000)]
+    lines += [f'site{i},0.{i % 10},9.{i % 10},"ligne 1\nligne 2"' for i in range(2000, 2500)]
+    path = tmp_path / 'points.csv'
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    monkeypatch.setattr(GeospatialImportService, 'TABULAR_BLOCK_SIZE', 16 * 1024)
+    monkeypatch.setattr(GeospatialImportService, 'STREAMING_BATCH_SIZE', 300)
+
+    frames = list(service._iter_tabular_frames(str(path), ',', ('longitude', 'latitude')))
+    names = [name for frame in frames for name in frame['name']]
+    assert names == [f'site{i}' for i in range(2500)]
+    assert frames[-1]['description'].iloc[-1] == 'ligne 1\nligne 2'
@@ -0,0 +1,38 @@
+"""Cache d'upload partagé par /preview et /upload"""
+
+import pytest
+
+gpd = pytest.importorskip('geopandas')
+pytest.importorskip('pyarrow')
+pytest.importorskip('flask_sqlalchemy')
+pytest.importorskip('geoalchemy2')
+
+from shapely.geometry import Point
+
+from src.services.geospatial_import import GeospatialImportService
+from src.services.upload_cache import UploadCache
+
+CONTENT_HASH = 'a' * 64
+
+
+def test_cache_key_depends_on_format():
+    csv_key = GeospatialImportService._cache_key(CONTENT_HASH, 'CSV')
+    txt_key = GeospatialImportService._cache_key(CONTENT_HASH, 'TXT')
+    assert csv_key != txt_key
+    assert csv_key.startswith(CONTENT_HASH)
+
+
+def test_cache_key_depends_on_raster_options():
+    key = GeospatialImportService._cache_key(CONTENT_HASH, 'TIFF')
+    assert GeospatialImportService._cache_key(CONTENT_HASH, 'TIFF', {'band': 1}) != key
+    assert (GeospatialImportService._cache_key(CONTENT_HASH, 'TIFF', {'band': 1, 'nodata': 0})
+            == GeospatialImportService._cache_key(CONTENT_HASH, 'TIFF', {'nodata': 0, 'band': 1}))
+
+
+def test_entries_are_isolated_by_format(tmp_path):
+    cache = UploadCache(str(tmp_path))
+    gdf = gpd.GeoDataFrame({'name': ['A']}, geometry=[Point(9.4, 0.4)], crs='EPSG:4326')
+    assert cache.put(GeospatialImportService._cache_key(CONTENT_HASH, 'CSV'), gdf, metadata={'geometry_repair': {}})
+    assert cache.contains(GeospatialImportService._cache_key(CONTENT_HASH, 'CSV'))
+    assert not cache.contains(GeospatialImportService._cache_key(CONTENT_HASH, 'TXT'))
+    assert list(cache.get(GeospatialImportService._cache_key(CONTENT_HASH, 'CSV'))['name']) == ['A']
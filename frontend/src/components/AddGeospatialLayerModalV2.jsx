@@ -401,7 +401,7 @@ const AddGeospatialLayerModalV2 = ({ onLayerAdded, trigger }) => {
               selectedFile={selectedFile}
               supportedFormats={{
                 extensions: ['.kml', '.kmz', '.geojson', '.json', '.shp', '.csv', '.tiff', '.tif'],
-                max_features: 10000,
+                max_features: null,
               }}
               maxFileSize={100 * 1024 * 1024} // 100MB
               className="min-h-[200px]"
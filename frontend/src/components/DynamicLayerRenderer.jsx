@@ -146,7 +146,7 @@ const DynamicLayerRenderer = ({
   const createLeafletLayer = useCallback(async (layer) => {
     try {
       // Récupérer les données GeoJSON de la couche
-      const response = await fetch(`/api/geospatial/layers/${layer.id}?include_geojson=true`);
+      const response = await fetch(`/api/geospatial/layers/${layer.id}?features=true`);
       const result = await response.json();
 
       if (!result.success || !result.data.geojson) {
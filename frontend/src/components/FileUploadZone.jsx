@@ -343,7 +343,11 @@ const FileUploadZone = ({
               <li>• Pour les CSV, incluez des colonnes 'latitude' et 'longitude'</li>
               <li>• Les fichiers Shapefile doivent inclure les fichiers .shx et .dbf</li>
               <li>• Évitez les caractères spéciaux dans les noms de fichiers</li>
-              <li>• Maximum {supportedFormats.max_features?.toLocaleString() || '10,000'} features par fichier</li>
+              {supportedFormats.max_features ? (
+                <li>• Maximum {supportedFormats.max_features.toLocaleString()} features par fichier</li>
+              ) : (
+                <li>• Les fichiers volumineux sont importés par lots, sans limite de features</li>
+              )}
             </ul>
           </CardContent>
         </Card>
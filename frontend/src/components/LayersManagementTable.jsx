@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback, useMemo } from 'react';
+import React, { useState, useEffect, useCallback, useMemo, useRef } from 'react';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
@@ -70,7 +70,7 @@ const LayersManagementTable = ({
   const [sortBy, setSortBy] = useState('created_at');
   const [sortOrder, setSortOrder] = useState('desc');
   const [currentPage, setCurrentPage] = useState(1);
-  const [totalPages, setTotalPages] = useState(1);
+  const [hasNextPage, setHasNextPage] = useState(false);
   const [totalLayers, setTotalLayers] = useState(0);
   const [selectedRows, setSelectedRows] = useState(new Set());
   const [deleteDialog, setDeleteDialog] = useState({ open: false, layer: null });
@@ -78,6 +78,14 @@ const LayersManagementTable = ({
   const [isExpanded, setIsExpanded] = useState(false);
 
   const itemsPerPage = 10;
+  // Curseur de chaque page déjà parcourue (la première n'en a pas)
+  const pageCursors = useRef([null]);
+
+  // Retour à la première page (filtres modifiés, rafraîchissement)
+  const resetPagination = useCallback(() => {
+    pageCursors.current = [null];
+    setCurrentPage(1);
+  }, []);
 
   // Options de filtrage
   const statusOptions = [
@@ -103,11 +111,14 @@ const LayersManagementTable = ({
 
     try {
       const params = new URLSearchParams({
-        page: currentPage.toString(),
         per_page: itemsPerPage.toString(),
-        include_geojson: 'false'
+        include_geojson: 'false',
+        with_total: 'true'
       });
 
+      const cursor = pageCursors.current[currentPage - 1];
+      if (cursor) params.append('cursor', cursor);
+
       if (searchTerm) params.append('search', searchTerm);
       if (statusFilter !== 'all') params.append('status', statusFilter);
       if (typeFilter !== 'all') params.append('layer_type', typeFilter);
@@ -117,8 +128,9 @@ const LayersManagementTable = ({
 
       if (result.success) {
         setLayers(result.data);
-        setTotalPages(result.pagination.pages);
-        setTotalLayers(result.pagination.total);
+        pageCursors.current[currentPage] = result.pagination.next_cursor;
+        setHasNextPage(result.pagination.has_next);
+        setTotalLayers(result.pagination.estimated_total ?? result.data.length);
       } else {
         throw new Error(result.error || 'Erreur lors du chargement');
       }
@@ -174,7 +186,7 @@ const LayersManagementTable = ({
       ];
 
       setLayers(demoLayers);
-      setTotalPages(1);
+      setHasNextPage(false);
       setTotalLayers(demoLayers.length);
       setError('');
     } finally {
@@ -191,9 +203,9 @@ const LayersManagementTable = ({
   // Rafraîchissement déclenché par le parent
   useEffect(() => {
     if (!refreshTrigger) return;
-    setCurrentPage(1);
+    resetPagination();
     fetchLayers();
-  }, [refreshTrigger, fetchLayers]);
+  }, [refreshTrigger, fetchLayers, resetPagination]);
 
   // Rafraîchissement
   const handleRefresh = useCallback(() => {
@@ -204,7 +216,7 @@ const LayersManagementTable = ({
   // Recherche avec debounce
   useEffect(() => {
     const timer = setTimeout(() => {
-      setCurrentPage(1);
+      resetPagination();
       fetchLayers();
     }, 500);
 
@@ -215,8 +227,8 @@ const LayersManagementTable = ({
   const handleFilterChange = useCallback((type, value) => {
     if (type === 'status') setStatusFilter(value);
     if (type === 'type') setTypeFilter(value);
-    setCurrentPage(1);
-  }, []);
+    resetPagination();
+  }, [resetPagination]);
 
   // Sélection de lignes
   const handleRowSelect = useCallback((layerId, checked) => {
@@ -678,12 +690,12 @@ const LayersManagementTable = ({
       </Card>
 
       {/* Pagination */}
-      {totalPages > 1 && (
+      {(currentPage > 1 || hasNextPage) && (
         <Card>
           <CardContent className="p-4">
             <div className="flex items-center justify-between">
               <div className="text-sm text-gray-500">
-                Page {currentPage} sur {totalPages} ({totalLayers} éléments)
+                Page {currentPage} (environ {totalLayers} éléments)
               </div>
               <div className="flex space-x-2">
                 <Button
@@ -697,8 +709,8 @@ const LayersManagementTable = ({
                 <Button
                   variant="outline"
                   size="sm"
-                  onClick={() => setCurrentPage(Math.min(totalPages, currentPage + 1))}
-                  disabled={currentPage === totalPages}
+                  onClick={() => setCurrentPage(currentPage + 1)}
+                  disabled={!hasNextPage}
                 >
                   Suivant
                 </Button>
@@ -107,7 +107,7 @@ export class GeospatialLayerService {
           try {
             const response = JSON.parse(xhr.responseText);
             if (xhr.status >= 200 && xhr.status < 300) {
-              resolve(response);
+              resolve(this.waitForUpload(response));
             } else {
               reject(new Error(response.error || `Erreur HTTP: ${xhr.status}`));
             }
@@ -126,7 +126,112 @@ export class GeospatialLayerService {
     }
 
     // Sinon utiliser fetch classique
-    return ApiClient.post(`${API_BASE_URL}/upload`, formData);
+    const response = await ApiClient.post(`${API_BASE_URL}/upload`, formData);
+    return this.waitForUpload(response);
+  }
+
+  /**
+   * Upload par morceaux avec reprise, pour les fichiers au-delà de la limite de /upload.
+   * Après une erreur réseau, l'envoi reprend à l'offset confirmé par le serveur.
+   * @param {File} file - Fichier à uploader
+   * @param {Object} config - Configuration de la couche
+   * @param {Function} onProgress - Callback de progression (optionnel)
+   * @param {number} maxRetries - Tentatives par morceau
+   * @returns {Promise<Object>} Résultat de l'upload
+   */
+  static async uploadFileChunked(file, config, onProgress = null, maxRetries = 5) {
+    const session = await ApiClient.post(`${API_BASE_URL}/uploads`, {
+      filename: file.name,
+      size: file.size,
+      name: config.name,
+      description: config.description || '',
+      layer_type: config.layer_type,
+      status: config.status
+    });
+    const { uploadId, chunkSize } = session.data;
+    let offset = session.data.offset;
+    let retries = 0;
+
+    while (offset < file.size) {
+      const chunk = file.slice(offset, offset + chunkSize);
+      try {
+        const buffer = await chunk.arrayBuffer();
+        const digest = await crypto.subtle.digest('SHA-256', buffer);
+        const checksum = Array.from(new Uint8Array(digest))
+          .map(byte => byte.toString(16).padStart(2, '0'))
+          .join('');
+
+        const result = await ApiClient.request(`${API_BASE_URL}/uploads/${uploadId}/chunks`, {
+          method: 'PUT',
+          headers: {
+            'Content-Type': 'application/octet-stream',
+            'Upload-Offset': String(offset),
+            'Content-SHA256': checksum
+          },
+          body: buffer
+        });
+        offset = result.data.offset;
+        retries = 0;
+        if (onProgress) {
+          onProgress((offset / file.size) * 100);
+        }
+      } catch (error) {
+        if (++retries > maxRetries) {
+          throw error;
+        }
+        // Reprise à l'offset connu du serveur
+        const status = await ApiClient.get(`${API_BASE_URL}/uploads/${uploadId}`);
+        offset = status.data.offset;
+      }
+    }
+
+    const response = await ApiClient.post(`${API_BASE_URL}/uploads/${uploadId}/complete`, {});
+    return this.waitForUpload(response);
+  }
+
+  /**
+   * Attend la fin d'un import asynchrone en interrogeant son statut
+   * @param {Object} response - Réponse de /upload (contient data.jobId si l'import est planifié)
+   * @param {number} interval - Intervalle de polling en ms
+   * @returns {Promise<Object>} Résultat final ({ success, message, data: { layer, geojson } })
+   */
+  static async waitForUpload(response, interval = 1000) {
+    const jobId = response?.data?.jobId;
+    if (!jobId) {
+      return response;
+    }
+
+    for (;;) {
+      const result = await this.getUploadStatus(jobId);
+      const status = result.data.status;
+
+      if (status === 'success') {
+        return {
+          success: true,
+          message: `Import réussi: ${result.data.upload.featuresCount} features importées`,
+          data: {
+            layer: result.data.layer,
+            geojson: result.data.geojson,
+            layers: result.data.layers,
+            datasets: result.data.datasets
+          }
+        };
+      }
+      if (status === 'error') {
+        throw new Error(result.data.upload.errorMessage || 'Erreur lors de l\'import');
+      }
+
+      await new Promise(resolve => setTimeout(resolve, interval));
+    }
+  }
+
+  /**
+   * Récupère le statut d'un job d'import
+   * @param {number} jobId - ID du job (historique d'upload)
+   * @returns {Promise<Object>} Statut (pending, processing, success, error)
+   */
+  static async getUploadStatus(jobId) {
+    return ApiClient.get(`${API_BASE_URL}/upload-history/${jobId}`);
   }
 
   /**
@@ -146,13 +251,12 @@ export class GeospatialLayerService {
   }
 
   /**
-   * Récupère la liste des couches géospatiales
-   * @param {Object} filters - Filtres de recherche
+   * Récupère la liste des couches géospatiales (pagination par curseur)
+   * @param {Object} filters - Filtres de recherche ; cursor : pagination.next_cursor de la page précédente
    * @returns {Promise<Object>} Liste des couches avec pagination
    */
   static async getLayers(filters = {}) {
     const params = {
-      page: filters.page || 1,
       per_page: filters.per_page || 20,
       include_geojson: filters.include_geojson || false,
       ...filters
@@ -201,6 +305,19 @@ export class GeospatialLayerService {
     return ApiClient.get(`${API_BASE_URL}/layers/${layerId}/export/${format}`);
   }
 
+  /**
+   * URL d'export binaire d'une couche, à télécharger ou à lire directement
+   * (FlatGeobuf par requêtes Range, GeoParquet, Arrow IPC)
+   * @param {number} layerId - ID de la couche
+   * @param {string} format - fgb, parquet ou arrow
+   * @param {string[]} fields - Propriétés à conserver (optionnel)
+   * @returns {string} URL de l'export
+   */
+  static getBinaryExportUrl(layerId, format, fields = null) {
+    const query = fields && fields.length ? `?fields=${encodeURIComponent(fields.join(','))}` : '';
+    return `${API_BASE_URL}/layers/${layerId}/export/${format}${query}`;
+  }
+
   /**
    * Télécharge une couche exportée
    * @param {number} layerId - ID de la couche
@@ -209,6 +326,17 @@ export class GeospatialLayerService {
    */
   static async downloadLayer(layerId, format, filename = null) {
     try {
+      // Formats binaires : le navigateur télécharge directement le fichier
+      if (['fgb', 'parquet', 'arrow'].includes(format.toLowerCase())) {
+        const a = document.createElement('a');
+        a.href = this.getBinaryExportUrl(layerId, format.toLowerCase());
+        a.download = filename || `layer_${layerId}.${format.toLowerCase()}`;
+        document.body.appendChild(a);
+        a.click();
+        document.body.removeChild(a);
+        return { success: true, message: 'Téléchargement démarré' };
+      }
+
       const data = await this.exportLayer(layerId, format);
       
       // Créer le blob selon le format
@@ -264,19 +392,46 @@ export class GeospatialStatsService {
   }
 
   /**
-   * Récupère l'historique des uploads
-   * @param {Object} filters - Filtres de pagination
+   * Récupère l'historique des uploads (pagination par curseur)
+   * @param {Object} filters - Filtres de pagination (per_page, cursor : pagination.next_cursor de la page précédente)
    * @returns {Promise<Object>} Historique avec pagination
    */
   static async getUploadHistory(filters = {}) {
     const params = {
-      page: filters.page || 1,
-      per_page: filters.per_page || 20
+      per_page: filters.per_page || 20,
+      cursor: filters.cursor
     };
 
     return ApiClient.get(`${API_BASE_URL}/upload-history`, params);
   }
 
+  /**
+   * Récupère les couches visibles dans l'emprise de la carte (FeatureCollection)
+   * @param {Object} bounds - Emprise affichée ({ west, south, east, north }, WGS84)
+   * @param {number} zoom - Niveau de zoom (simplification à la taille d'un pixel)
+   * @param {Object} filters - Filtres (layer_type, status, ids, features, clip, precision, fields)
+   * @returns {Promise<Object>} FeatureCollection restreinte à l'emprise
+   */
+  static async getMapGeojson(bounds, zoom, filters = {}) {
+    const params = { ...filters, zoom };
+    if (bounds) {
+      params.bbox = [bounds.west, bounds.south, bounds.east, bounds.north].join(',');
+    }
+    return ApiClient.get(`${API_BASE_URL}/geojson`, params);
+  }
+
+  /**
+   * URL des tuiles vectorielles (MVT), avec {z}/{x}/{y} à substituer par la carte
+   * @param {Object} filters - Filtres (sources, layer_type, status, ids)
+   * @returns {string} Gabarit d'URL des tuiles
+   */
+  static getVectorTileUrl(filters = {}) {
+    const query = new URLSearchParams(
+      Object.entries(filters).filter(([, value]) => value !== undefined && value !== null && value !== '')
+    ).toString();
+    return `${API_BASE_URL}/tiles/{z}/{x}/{y}.mvt${query ? `?${query}` : ''}`;
+  }
+
   /**
    * Récupère les formats supportés
    * @returns {Promise<Object>} Formats et limites